@@ -0,0 +1,310 @@
+"""
+Analítica incremental para monitor.csv y estadísticas de NEAT.
+
+sacargrafica.py y plot_stats cargan y dibujan todos los puntos. Aquí los
+ficheros se leen en modo "tail" a medida que crecen y cada serie mantiene
+agregados con memoria O(1): media (Welford), media móvil exponencial,
+media móvil de ventana fija, cuantiles por el algoritmo P² y una envolvente
+min/máx de tamaño fijo para dibujar millones de episodios al instante.
+
+Uso:
+    python analitica.py monitor <monitor.csv> [--seguir] [--salida grafica.png]
+    python analitica.py neat <stats.pkl> [--salida grafica.png]
+"""
+import argparse
+import math
+import os
+import pickle
+import time
+from collections import deque
+
+
+class P2Quantile:
+    """
+    Estimador de un cuantil en streaming (algoritmo P² de Jain y Chlamtac).
+    Usa 5 marcadores, sin guardar las observaciones.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []                       # Alturas de los marcadores
+        self.n = [0, 1, 2, 3, 4]          # Posiciones reales
+        self.np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]   # Posiciones deseadas
+        self.dn = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        if len(self.q) < 5:
+            self.q.append(x)
+            self.q.sort()
+            return
+
+        q, n = self.q, self.n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        for i in range(1, 4):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self._parabolic(i, d)
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        if not self.q:
+            return float("nan")
+        if len(self.q) < 5:
+            # Pocos datos: cuantil exacto sobre lo que hay
+            idx = min(int(round(self.p * (len(self.q) - 1))), len(self.q) - 1)
+            return self.q[idx]
+        return self.q[2]
+
+
+class MinMaxEnvelope:
+    """
+    Envolvente min/máx de tamaño fijo.
+
+    Mantiene como máximo `n_buckets` cubos; cuando se llenan, se fusionan de
+    dos en dos y se duplica la anchura, así la memoria no depende del número
+    de puntos y la gráfica conserva los picos.
+    """
+
+    def __init__(self, n_buckets=1000):
+        self.n_buckets = n_buckets
+        self.width = 1
+        self.buckets = []     # [x_inicio, min, max, suma, cuenta]
+        self.count = 0
+
+    def add(self, y):
+        if not self.buckets or self.buckets[-1][4] >= self.width:
+            if len(self.buckets) >= self.n_buckets:
+                self._merge()
+            if not self.buckets or self.buckets[-1][4] >= self.width:
+                self.buckets.append([self.count, y, y, 0.0, 0])
+        b = self.buckets[-1]
+        b[1] = min(b[1], y)
+        b[2] = max(b[2], y)
+        b[3] += y
+        b[4] += 1
+        self.count += 1
+
+    def _merge(self):
+        merged = []
+        for i in range(0, len(self.buckets), 2):
+            pair = self.buckets[i:i + 2]
+            merged.append([pair[0][0], min(b[1] for b in pair), max(b[2] for b in pair),
+                           sum(b[3] for b in pair), sum(b[4] for b in pair)])
+        self.buckets = merged
+        self.width *= 2
+
+    def arrays(self):
+        """(x, min, max, media) de cada cubo."""
+        xs = [b[0] + (b[4] - 1) / 2 for b in self.buckets]
+        return xs, [b[1] for b in self.buckets], [b[2] for b in self.buckets], \
+            [b[3] / b[4] for b in self.buckets]
+
+
+class RollingSeries:
+    """
+    Agregados en streaming de una serie con memoria acotada.
+
+    Args:
+        window: Tamaño de la media móvil de ventana fija
+        alpha: Factor de la media móvil exponencial
+        quantiles: Cuantiles a estimar con P²
+        n_buckets: Resolución de la envolvente para dibujar
+    """
+
+    def __init__(self, name, window=100, alpha=0.01, quantiles=(0.1, 0.5, 0.9), n_buckets=1000):
+        self.name = name
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.alpha = alpha
+        self.ewma = None
+        self._window = deque(maxlen=window)
+        self._window_sum = 0.0
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+        self.envelope = MinMaxEnvelope(n_buckets)
+        self.moving_envelope = MinMaxEnvelope(n_buckets)
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+
+        if len(self._window) == self._window.maxlen:
+            self._window_sum -= self._window[0]
+        self._window.append(x)
+        self._window_sum += x
+
+        for q in self.quantiles.values():
+            q.add(x)
+        self.envelope.add(x)
+        self.moving_envelope.add(self.moving_average)
+
+    @property
+    def moving_average(self):
+        return self._window_sum / len(self._window) if self._window else float("nan")
+
+    @property
+    def stdev(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def summary(self):
+        quant = ", ".join(f"p{int(p * 100)}={q.value():.2f}" for p, q in self.quantiles.items())
+        return (f"{self.name}: n={self.count} media={self.mean:.2f} sd={self.stdev:.2f} "
+                f"min={self.min:.2f} max={self.max:.2f} media_movil={self.moving_average:.2f} {quant}")
+
+
+class MonitorTail:
+    """
+    Lee un monitor.csv de SB3 a medida que crece.
+
+    Solo procesa líneas completas nuevas desde la última lectura; si el
+    fichero se trunca (nuevo entrenamiento), vuelve a empezar.
+    """
+
+    def __init__(self, path, **series_kwargs):
+        self.path = path
+        self._series_kwargs = series_kwargs
+        self.offset = 0
+        self.columns = None
+        self.series = {
+            "r": RollingSeries("recompensa", **series_kwargs),
+            "l": RollingSeries("longitud", **series_kwargs),
+        }
+
+    def poll(self):
+        """Procesa las líneas nuevas y devuelve cuántos episodios se añadieron."""
+        if not os.path.exists(self.path):
+            return 0
+        if os.path.getsize(self.path) < self.offset:
+            self.__init__(self.path, **self._series_kwargs)
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                # Línea a medio escribir: se leerá completa en la siguiente llamada
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                raw = line.decode("utf-8").strip()
+                # Primera línea: comentario JSON con metadatos; segunda: cabecera
+                if not raw or raw.startswith("#"):
+                    continue
+                fields = raw.split(",")
+                if self.columns is None:
+                    self.columns = fields
+                    continue
+                row = dict(zip(self.columns, fields))
+                for key, series in self.series.items():
+                    if key in row:
+                        series.add(float(row[key]))
+                added += 1
+        return added
+
+
+def plot_series(series_list, filename=None, view=False, title=None):
+    """Dibuja la envolvente min/máx y la media móvil de cada serie."""
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(series_list), 1, figsize=(10, 4 * len(series_list)), squeeze=False)
+    for ax, series in zip(axes[:, 0], series_list):
+        x, lo, hi, mean = series.envelope.arrays()
+        ax.fill_between(x, lo, hi, alpha=0.3, label="min/máx")
+        ax.plot(x, mean, linewidth=1, label="media por cubo")
+        mx, _, _, mmean = series.moving_envelope.arrays()
+        ax.plot(mx, mmean, linewidth=2, label=f"media móvil ({series._window.maxlen})")
+        ax.set_ylabel(series.name)
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="best")
+    axes[-1, 0].set_xlabel("Episodio")
+    if title:
+        fig.suptitle(title)
+    fig.tight_layout()
+    if filename:
+        fig.savefig(filename)
+    if view:
+        plt.show()
+    plt.close(fig)
+
+
+def neat_series(stats):
+    """Series de un StatisticsReporter (o de cualquier objeto con la misma interfaz)."""
+    best = RollingSeries("mejor fitness", window=10)
+    mean = RollingSeries("fitness medio", window=10)
+    for genome in stats.most_fit_genomes:
+        best.add(genome.fitness)
+    for value in stats.get_fitness_mean():
+        mean.add(value)
+    return [best, mean]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analítica incremental de entrenamientos")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("monitor")
+    p.add_argument("path")
+    p.add_argument("--seguir", action="store_true", help="Seguir leyendo mientras crece el fichero")
+    p.add_argument("--intervalo", type=float, default=5.0)
+    p.add_argument("--salida", default=None, help="Fichero de imagen de salida")
+
+    p = sub.add_parser("neat")
+    p.add_argument("path", help="stats.pkl de neat_train.py")
+    p.add_argument("--salida", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "monitor":
+        tail = MonitorTail(args.path)
+        salida = args.salida or os.path.join(os.path.dirname(os.path.abspath(args.path)), "analitica.png")
+        try:
+            while True:
+                added = tail.poll()
+                if added:
+                    for series in tail.series.values():
+                        print(series.summary())
+                    plot_series(list(tail.series.values()), filename=salida)
+                if not args.seguir:
+                    break
+                time.sleep(args.intervalo)
+        except KeyboardInterrupt:
+            pass
+        print(f"Gráfica guardada en {salida}")
+    else:
+        with open(args.path, "rb") as f:
+            stats = pickle.load(f)
+        series = neat_series(stats)
+        for s in series:
+            print(s.summary())
+        salida = args.salida or os.path.join(os.path.dirname(os.path.abspath(args.path)), "analitica.png")
+        plot_series(series, filename=salida, title="Evolución del fitness")
+        print(f"Gráfica guardada en {salida}")
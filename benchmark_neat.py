@@ -0,0 +1,275 @@
+"""
+Micro-benchmarks del motor NEAT sobre el ejemplo XOR.
+
+evolve-feedforward.py es la única carga que ejecuta NEAT sin simulador, así
+que sirve para medir el propio motor. Cada caso (tamaño de población x
+profundidad de red) evoluciona XOR un número fijo de generaciones y reparte
+el tiempo de cada generación en:
+
+    evaluacion    eval_genomes de evolve-feedforward.py
+    reproduccion  DefaultReproduction.reproduce sin contar las mutaciones
+    mutacion      DefaultGenome.mutate de los hijos
+    especiacion   DefaultSpeciesSet.speciate
+    informes      llamadas a los reporters (StdOutReporter y StatisticsReporter)
+
+La profundidad es el número de capas ocultas (de --ancho nodos, conectadas
+capa a capa) con que empieza cada genoma; con 0 es el XOR original.
+
+Los resultados se guardan en JSON junto con el commit, para comparar entre
+versiones:
+    python benchmark_neat.py [--poblaciones 150 1000] [--profundidades 0 2 4] [--generaciones 10]
+                             [--salida bench.json] [--comparar bench_anterior.json]
+                             [--perfil bench.prof]
+
+--perfil guarda las estadísticas de cProfile de todo el benchmark (se pueden
+ver con `python -m pstats`, snakeviz o convertir a flame graph con flameprof).
+"""
+import argparse
+import contextlib
+import cProfile
+import importlib.metadata
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+import neat
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(ROOT_DIR, "config-feedforward.txt")
+PHASES = ("evaluacion", "reproduccion", "mutacion", "especiacion", "informes")
+REPORTER_METHODS = ("start_generation", "end_generation", "post_evaluate", "post_reproduction",
+                    "complete_extinction", "found_solution", "species_stagnant", "info")
+
+
+def _load_xor_example():
+    """evolve-feedforward.py como módulo (el guion no es importable por su nombre)."""
+    spec = importlib.util.spec_from_file_location("evolve_feedforward",
+                                                  os.path.join(ROOT_DIR, "evolve-feedforward.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class PhaseTimer:
+    """Acumula el tiempo de cada fase y lo cierra por generación."""
+
+    def __init__(self):
+        self.current = defaultdict(float)
+        self.generations = []
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[phase] += time.perf_counter() - start
+
+    def end_generation(self):
+        # La mutación ocurre dentro de reproduce: se descuenta para no contarla dos veces
+        record = {phase: self.current.get(phase, 0.0) for phase in PHASES}
+        record["reproduccion"] -= record["mutacion"]
+        self.generations.append(record)
+        self.current = defaultdict(float)
+
+
+def _timed_types(timer, depth, width):
+    """Subclases de los tipos por defecto que miden su fase en `timer`."""
+
+    class Genome(neat.DefaultGenome):
+        def configure_new(self, config):
+            super().configure_new(config)
+            if depth == 0:
+                return
+            # Capas ocultas conectadas capa a capa en lugar de entradas -> salidas.
+            # Todos los genomas usan las mismas claves de nodo para que sus genes sean
+            # homólogos (con get_new_node_key cada genoma acabaría en su propia especie).
+            self.connections = {}
+            previous = list(config.input_keys)
+            next_key = max(config.output_keys) + 1
+            for _ in range(depth):
+                layer = list(range(next_key, next_key + width))
+                next_key += width
+                for key in layer:
+                    self.nodes[key] = self.create_node(config, key)
+                self._connect(config, previous, layer)
+                previous = layer
+            self._connect(config, previous, list(config.output_keys))
+
+        def _connect(self, config, sources, targets):
+            for i in sources:
+                for o in targets:
+                    self.connections[(i, o)] = self.create_connection(config, i, o)
+
+        def mutate(self, config):
+            with timer.measure("mutacion"):
+                super().mutate(config)
+
+    class Reproduction(neat.DefaultReproduction):
+        def reproduce(self, config, species, pop_size, generation):
+            with timer.measure("reproduccion"):
+                return super().reproduce(config, species, pop_size, generation)
+
+    class SpeciesSet(neat.DefaultSpeciesSet):
+        def speciate(self, config, population, generation):
+            with timer.measure("especiacion"):
+                super().speciate(config, population, generation)
+
+    # neat.Config lee las secciones por el nombre de la clase
+    Genome.__name__ = "DefaultGenome"
+    Reproduction.__name__ = "DefaultReproduction"
+    SpeciesSet.__name__ = "DefaultSpeciesSet"
+    return Genome, Reproduction, SpeciesSet
+
+
+def _time_reporters(reporters, timer):
+    """Sustituye los métodos del ReporterSet por versiones cronometradas."""
+    for name in REPORTER_METHODS:
+        method = getattr(reporters, name)
+
+        def timed(*args, _method=method, _name=name, **kwargs):
+            with timer.measure("informes"):
+                _method(*args, **kwargs)
+            if _name == "end_generation":
+                timer.end_generation()
+
+        setattr(reporters, name, timed)
+
+
+def run_case(config_file, pop_size, depth, width, generations, seed):
+    """Un caso del benchmark; devuelve su resumen como diccionario."""
+    xor = _load_xor_example()
+    timer = PhaseTimer()
+    genome_type, reproduction_type, species_set_type = _timed_types(timer, depth, width)
+    config = neat.Config(genome_type, reproduction_type, species_set_type, neat.DefaultStagnation, config_file)
+    config.pop_size = pop_size
+    config.no_fitness_termination = True
+
+    def eval_genomes(genomes, config):
+        with timer.measure("evaluacion"):
+            xor.eval_genomes(genomes, config)
+
+    random.seed(seed)
+    p = neat.Population(config)
+    initial_speciation = timer.current.pop("especiacion")
+    _time_reporters(p.reporters, timer)
+    p.add_reporter(neat.StdOutReporter(True))
+    p.add_reporter(neat.StatisticsReporter())
+
+    start = time.perf_counter()
+    # El StdOutReporter se mide igual, pero su salida no interesa
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = p.run(eval_genomes, generations)
+    total = time.perf_counter() - start
+
+    per_generation = {phase: [g[phase] for g in timer.generations] for phase in PHASES}
+    genomes = list(p.population.values())
+    return {
+        "pop_size": pop_size,
+        "depth": depth,
+        "width": width,
+        "generations": len(timer.generations),
+        "total_s": total,
+        "initial_speciation_s": initial_speciation,
+        "best_fitness": best.fitness,
+        "final_species": len(p.species.species),
+        "mean_nodes": float(np.mean([len(g.nodes) for g in genomes])),
+        "mean_connections": float(np.mean([len(g.connections) for g in genomes])),
+        "phases": {phase: {"mean_ms": 1000 * float(np.mean(values)) if values else 0.0,
+                           "total_s": float(np.sum(values)),
+                           "per_generation_ms": [1000 * v for v in values]}
+                   for phase, values in per_generation.items()},
+    }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return result.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(config_file, pop_sizes, depths, width, generations, seed):
+    meta = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "neat": importlib.metadata.version("neat-python"),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "config": os.path.abspath(config_file),
+        "seed": seed,
+    }
+    results = []
+    for pop_size in pop_sizes:
+        for depth in depths:
+            case = run_case(config_file, pop_size, depth, width, generations, seed)
+            results.append(case)
+            phases = "  ".join(f"{p}={case['phases'][p]['mean_ms']:.1f}" for p in PHASES)
+            print(f"población={pop_size:<6} profundidad={depth:<2} {phases}  (ms/gen)")
+    return {"meta": meta, "results": results}
+
+
+def _case_key(case):
+    return case["pop_size"], case["depth"], case["width"]
+
+
+def compare(current, baseline):
+    """Tabla de tiempos por fase frente a otro JSON del benchmark (>1 = ahora es más lento)."""
+    previous = {_case_key(c): c for c in baseline["results"]}
+    print(f"\nComparación con {baseline['meta'].get('commit')} ({baseline['meta'].get('date')}):")
+    print(f"{'población':>10}{'prof.':>6}" + "".join(f"{p:>14}" for p in PHASES))
+    for case in current["results"]:
+        old = previous.get(_case_key(case))
+        if old is None:
+            continue
+        ratios = []
+        for phase in PHASES:
+            before = old["phases"][phase]["mean_ms"]
+            now = case["phases"][phase]["mean_ms"]
+            ratios.append(f"{now / before:>13.2f}x" if before > 0 else f"{'-':>14}")
+        print(f"{case['pop_size']:>10}{case['depth']:>6}" + "".join(ratios))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks del motor NEAT sobre XOR")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--poblaciones", type=int, nargs="+", default=[150, 1000])
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--ancho", type=int, default=2, help="Nodos por capa oculta")
+    parser.add_argument("--generaciones", type=int, default=10)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="bench_neat.json")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    parser.add_argument("--perfil", help="Guardar estadísticas de cProfile en este fichero")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.perfil else None
+    if profiler:
+        profiler.enable()
+    report = run_benchmark(args.config, args.poblaciones, args.profundidades, args.ancho,
+                           args.generaciones, args.semilla)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.perfil)
+        print(f"Perfil guardado en {args.perfil}")
+
+    with open(args.salida, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            compare(report, json.load(f))
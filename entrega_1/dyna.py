@@ -0,0 +1,252 @@
+"""
+Entrenamiento basado en modelo (Dyna-Q) para el entorno discreto RoboboEnv.
+
+Cada paso real en el simulador cuesta segundos, pero con solo 14 estados x 6
+acciones el modelo de transiciones y recompensas cabe de sobra en memoria.
+Cada transición real se registra en arrays de conteo y, por cada paso real,
+se hacen muchas actualizaciones simuladas a partir del modelo aprendido.
+
+Uso: python dyna.py [episodios] [pasos_planificacion]
+"""
+import os
+import sys
+import json
+import numpy as np
+from datetime import datetime
+
+
+class ModeloTransiciones:
+    """
+    Modelo de conteo de transiciones y recompensas para un MDP discreto.
+
+    Guarda, para cada par (estado, acción):
+        - cuántas veces se ha llegado a cada estado siguiente
+        - la suma de recompensas obtenidas
+        - cuántas veces el episodio terminó (objetivo alcanzado)
+    """
+
+    def __init__(self, n_states, n_actions):
+        self.n_states = n_states
+        self.n_actions = n_actions
+
+        # Con 14 x 6 x 14 entradas un array denso ocupa menos que un dict de conteos
+        self.counts = np.zeros((n_states, n_actions, n_states), dtype=np.int32)
+        self.reward_sum = np.zeros((n_states, n_actions), dtype=np.float64)
+        self.terminal_counts = np.zeros((n_states, n_actions), dtype=np.int32)
+        self.visits = np.zeros((n_states, n_actions), dtype=np.int32)
+
+        # Seguimiento de la deriva entre predicción del modelo y realidad
+        self.drift_reward = []       # |recompensa predicha - recompensa real|
+        self.drift_prob = []         # probabilidad que el modelo daba al estado real
+
+    def update(self, state, action, reward, next_state, terminated):
+        """Registra una transición real en el modelo."""
+        # Antes de actualizar, medir cuánto se equivocaba el modelo
+        if self.visits[state, action] > 0:
+            probs = self.transition_probs(state, action)
+            self.drift_reward.append(abs(self.expected_reward(state, action) - reward))
+            self.drift_prob.append(float(probs[next_state]))
+
+        self.counts[state, action, next_state] += 1
+        self.reward_sum[state, action] += reward
+        self.terminal_counts[state, action] += int(terminated)
+        self.visits[state, action] += 1
+
+    def transition_probs(self, state, action):
+        """Distribución empírica de estados siguientes para (estado, acción)."""
+        n = self.visits[state, action]
+        if n == 0:
+            return np.full(self.n_states, 1.0 / self.n_states)
+        return self.counts[state, action] / n
+
+    def expected_reward(self, state, action):
+        """Recompensa media observada para (estado, acción)."""
+        n = self.visits[state, action]
+        return self.reward_sum[state, action] / n if n > 0 else 0.0
+
+    def terminal_prob(self, state, action):
+        """Probabilidad empírica de terminar el episodio tras (estado, acción)."""
+        n = self.visits[state, action]
+        return self.terminal_counts[state, action] / n if n > 0 else 0.0
+
+    def sample(self, state, action, rng):
+        """Simula una transición a partir del modelo aprendido."""
+        next_state = rng.choice(self.n_states, p=self.transition_probs(state, action))
+        terminated = rng.random() < self.terminal_prob(state, action)
+        return self.expected_reward(state, action), next_state, terminated
+
+    def visited_pairs(self):
+        """Pares (estado, acción) observados al menos una vez."""
+        return np.argwhere(self.visits > 0)
+
+    def drift_summary(self, window=50):
+        """Resumen de la deriva del modelo en las últimas transiciones."""
+        if not self.drift_reward:
+            return {"reward_error": None, "next_state_prob": None}
+        return {
+            "reward_error": float(np.mean(self.drift_reward[-window:])),
+            "next_state_prob": float(np.mean(self.drift_prob[-window:])),
+        }
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            counts=self.counts,
+            reward_sum=self.reward_sum,
+            terminal_counts=self.terminal_counts,
+            visits=self.visits,
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        n_states, n_actions = data["visits"].shape
+        model = cls(n_states, n_actions)
+        model.counts = data["counts"]
+        model.reward_sum = data["reward_sum"]
+        model.terminal_counts = data["terminal_counts"]
+        model.visits = data["visits"]
+        return model
+
+
+class DynaQ:
+    """
+    Agente Dyna-Q tabular.
+
+    Args:
+        n_states: Número de estados discretos
+        n_actions: Número de acciones discretas
+        alpha: Tasa de aprendizaje
+        gamma: Factor de descuento (igual que en ppo.py)
+        epsilon: Probabilidad de exploración
+        planning_steps: Actualizaciones simuladas por cada paso real
+    """
+
+    def __init__(self, n_states, n_actions, alpha=0.1, gamma=0.90, epsilon=0.1,
+                 planning_steps=50, seed=None):
+        self.q = np.zeros((n_states, n_actions), dtype=np.float64)
+        self.model = ModeloTransiciones(n_states, n_actions)
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.planning_steps = planning_steps
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, state, deterministic=False):
+        """Política epsilon-greedy sobre la tabla Q."""
+        if not deterministic and self.rng.random() < self.epsilon:
+            return int(self.rng.integers(self.q.shape[1]))
+        # Desempate aleatorio entre acciones con el mismo valor
+        best = np.flatnonzero(self.q[state] == self.q[state].max())
+        return int(self.rng.choice(best))
+
+    def _q_update(self, state, action, reward, next_state, terminated):
+        target = reward if terminated else reward + self.gamma * self.q[next_state].max()
+        self.q[state, action] += self.alpha * (target - self.q[state, action])
+
+    def learn(self, state, action, reward, next_state, terminated):
+        """Actualización con la transición real + planificación con el modelo."""
+        self._q_update(state, action, reward, next_state, terminated)
+        self.model.update(state, action, reward, next_state, terminated)
+        self.plan(self.planning_steps)
+
+    def plan(self, n):
+        """Realiza n actualizaciones simuladas sobre pares ya visitados."""
+        pairs = self.model.visited_pairs()
+        if len(pairs) == 0:
+            return
+        for idx in self.rng.integers(len(pairs), size=n):
+            s, a = pairs[idx]
+            r, s2, term = self.model.sample(s, a, self.rng)
+            self._q_update(s, a, r, s2, term)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "q_table.npy"), self.q)
+        self.model.save(os.path.join(directory, "modelo.npz"))
+
+
+def train_dyna(env, agent, n_episodes=20, log_path=None):
+    """
+    Entrena el agente Dyna-Q en el entorno real.
+
+    Args:
+        env: Entorno RoboboEnv (u otro con observaciones discretas)
+        agent: Agente DynaQ
+        n_episodes: Número de episodios reales
+        log_path: Fichero .jsonl donde guardar las métricas por episodio
+
+    Returns:
+        Lista de diccionarios con las métricas de cada episodio
+    """
+    history = []
+    real_steps = 0
+
+    for episode in range(n_episodes):
+        state, _ = env.reset()
+        episode_reward = 0.0
+        done = False
+        terminated = False
+        steps = 0
+
+        while not done:
+            action = agent.act(state)
+            next_state, reward, terminated, truncated, _ = env.step(action)
+            agent.learn(state, action, reward, next_state, terminated)
+
+            episode_reward += reward
+            state = next_state
+            steps += 1
+            real_steps += 1
+            done = terminated or truncated
+
+        entry = {
+            "episode": episode + 1,
+            "reward": float(episode_reward),
+            "steps": steps,
+            "success": bool(terminated),
+            "real_steps": real_steps,
+            "planning_updates": real_steps * agent.planning_steps,
+            **agent.model.drift_summary(),
+        }
+        history.append(entry)
+
+        successes = sum(h["success"] for h in history)
+        print(f"\nEpisodio {episode + 1}/{n_episodes} - Recompensa: {episode_reward:.2f} - "
+              f"Pasos: {steps} - Éxitos: {successes}/{len(history)}")
+        print(f"Deriva del modelo: {entry['reward_error']} (error recompensa), "
+              f"{entry['next_state_prob']} (prob. estado real)")
+
+        if log_path is not None:
+            with open(log_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    return history
+
+
+if __name__ == "__main__":
+    from main import RoboboEnv
+
+    n_episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    planning_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_dir = f"./robobo_logs/{timestamp}/dyna/"
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"Directorio de logs: {log_dir}")
+
+    env = RoboboEnv()
+    agent = DynaQ(env.observation_space.n, env.action_space.n, planning_steps=planning_steps)
+
+    try:
+        history = train_dyna(env, agent, n_episodes, log_path=f"{log_dir}episodios.jsonl")
+        total_steps = history[-1]["real_steps"] if history else 0
+        successes = sum(h["success"] for h in history)
+        print(f"\nEntrenamiento completado con {total_steps} pasos reales")
+        print(f"Éxitos: {successes}/{n_episodes}")
+    except KeyboardInterrupt:
+        print("\nEntrenamiento interrumpido por el usuario")
+    finally:
+        agent.save(log_dir)
+        print(f"Tabla Q y modelo guardados en {log_dir}")
+        env.close()
@@ -0,0 +1,196 @@
+"""
+Evaluación de políticas en paralelo sobre varios simuladores con intervalos
+de confianza.
+
+Los N episodios se reparten entre K trabajadores (un RoboboSim por host).
+Cada episodio devuelve éxito, recompensa y pasos; con ellos se calculan
+intervalos de confianza (Wilson para la tasa de éxito, bootstrap para el
+resto) y, opcionalmente, se para en cuanto el intervalo de la métrica
+elegida es más estrecho que epsilon.
+"""
+import math
+import multiprocessing as mp
+import queue
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+METRICS = ("success", "reward", "steps")
+
+
+def bootstrap_ci(values, n_boot=2000, alpha=0.05, rng=None):
+    """
+    Intervalo de confianza bootstrap (percentil) de la media.
+
+    Returns:
+        (media, límite inferior, límite superior)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return float("nan"), float("nan"), float("nan")
+    rng = rng or np.random.default_rng()
+    samples = rng.choice(values, size=(n_boot, len(values)), replace=True).mean(axis=1)
+    lo, hi = np.percentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return float(values.mean()), float(lo), float(hi)
+
+
+def wilson_ci(values, alpha=0.05):
+    """
+    Intervalo de Wilson de una proporción. A diferencia del bootstrap, no se
+    queda en anchura 0 cuando todos los episodios dan el mismo resultado.
+
+    Returns:
+        (proporción, límite inferior, límite superior)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return float("nan"), float("nan"), float("nan")
+    p = values.mean()
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    denom = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    return float(p), float(max(0.0, center - half)), float(min(1.0, center + half))
+
+
+def metric_ci(metric, values, n_boot=2000, alpha=0.05, rng=None):
+    """Intervalo de una métrica: Wilson para `success` (binaria), bootstrap para las demás."""
+    if metric == "success":
+        return wilson_ci(values, alpha)
+    return bootstrap_ci(values, n_boot, alpha, rng)
+
+
+def run_episode(env, model, max_steps=None):
+    """Ejecuta un episodio determinista y devuelve sus métricas."""
+    obs, _ = env.reset()
+    total_reward = 0.0
+    steps = 0
+    terminated = truncated = False
+    start = time.time()
+    while not (terminated or truncated):
+        action, _ = model.predict(obs, deterministic=True)
+        obs, reward, terminated, truncated, _ = env.step(action)
+        total_reward += reward
+        steps += 1
+        if max_steps is not None and steps >= max_steps:
+            break
+    return {"success": bool(terminated), "reward": float(total_reward), "steps": steps,
+            "duration": time.time() - start}
+
+
+def _worker(host, model_path, episodes, results, stop):
+    """Proceso de un simulador: ejecuta episodios hasta vaciar la cola o recibir la parada."""
+    from main import RoboboEnv
+    from test import load_model
+
+    env = None
+    try:
+        model = load_model(model_path)
+        env = RoboboEnv(host=host)
+        while not stop.is_set():
+            try:
+                episode = episodes.get_nowait()
+            except queue.Empty:
+                break
+            result = run_episode(env, model)
+            result.update({"episode": episode, "host": host})
+            results.put(result)
+    except Exception as e:
+        results.put({"error": str(e), "host": host})
+    finally:
+        if env is not None:
+            env.close()
+        results.put({"done": host})
+
+
+def summarize(results, n_boot=2000, alpha=0.05, seed=0):
+    """Media e intervalo de confianza de cada métrica."""
+    rng = np.random.default_rng(seed)
+    return {m: metric_ci(m, [r[m] for r in results], n_boot, alpha, rng) for m in METRICS}
+
+
+def print_summary(results, summary, alpha=0.05):
+    print(f"\n{'='*50}")
+    print("ESTADÍSTICAS FINALES")
+    print(f"{'='*50}")
+    print(f"Episodios completados: {len(results)}")
+    labels = {"success": "Tasa de éxito", "reward": "Recompensa media", "steps": "Pasos medios"}
+    for m in METRICS:
+        mean, lo, hi = summary[m]
+        print(f"{labels[m]}: {mean:.3f}  IC {100 * (1 - alpha):.0f}% [{lo:.3f}, {hi:.3f}]")
+    hosts = {}
+    for r in results:
+        hosts[r["host"]] = hosts.get(r["host"], 0) + 1
+    print("Episodios por simulador: " + ", ".join(f"{h}={n}" for h, n in hosts.items()))
+
+
+def evaluate_parallel(model_path, hosts, n_episodes=20, epsilon=None, metric="success",
+                      min_episodes=5, alpha=0.05, n_boot=2000, poll=5.0):
+    """
+    Evalúa un modelo repartiendo episodios entre varios simuladores.
+
+    Args:
+        model_path: Modelo PPO (.zip) o política exportada (.npz)
+        hosts: Hosts con un RoboboSim cada uno
+        n_episodes: Máximo de episodios
+        epsilon: Si se indica, para cuando el IC de `metric` es más estrecho que epsilon
+        metric: "success", "reward" o "steps"
+        min_episodes: Episodios mínimos antes de considerar la parada
+        poll: Segundos entre comprobaciones de que los trabajadores siguen vivos
+
+    Returns:
+        (lista de resultados por episodio, resumen {métrica: (media, lo, hi)})
+    """
+    episodes = mp.Queue()
+    for i in range(n_episodes):
+        episodes.put(i)
+    results_queue = mp.Queue()
+    stop = mp.Event()
+
+    workers = [mp.Process(target=_worker, args=(host, model_path, episodes, results_queue, stop))
+               for host in hosts]
+    for w in workers:
+        w.start()
+
+    results = []
+    finished = 0
+    rng = np.random.default_rng(0)
+    while finished < len(workers):
+        # Si todos los procesos ya habían terminado antes de esperar, no llegará nada más
+        all_exited = not any(w.is_alive() for w in workers)
+        try:
+            msg = results_queue.get(timeout=poll)
+        except queue.Empty:
+            if all_exited:
+                codes = ", ".join(f"{h}: código {w.exitcode}" for h, w in zip(hosts, workers))
+                print(f"⚠️ Los trabajadores terminaron sin avisar ({codes}); se resume lo recibido")
+                break
+            continue
+        if "done" in msg:
+            finished += 1
+            continue
+        if "error" in msg:
+            print(f"Error en el simulador {msg['host']}: {msg['error']}")
+            continue
+
+        results.append(msg)
+        status = "éxito" if msg["success"] else "fallo"
+        print(f"[{msg['host']}] episodio {msg['episode'] + 1}: {status}, "
+              f"recompensa {msg['reward']:.2f}, pasos {msg['steps']}")
+
+        if epsilon is not None and len(results) >= min_episodes and not stop.is_set():
+            values = [r[metric] for r in results]
+            mean, lo, hi = metric_ci(metric, values, n_boot, alpha, rng)
+            # Sin variación el bootstrap da anchura 0 aunque haya pocos episodios
+            if hi - lo < epsilon and (metric == "success" or np.ptp(values) > 0):
+                print(f"IC de {metric} con anchura {hi - lo:.3f} < {epsilon}: parando")
+                stop.set()
+
+    for w in workers:
+        w.join()
+
+    summary = summarize(results, n_boot, alpha)
+    print_summary(results, summary, alpha)
+    return results, summary
@@ -0,0 +1,120 @@
+"""
+Exporta la MlpPolicy de un modelo PPO (.zip) a un .npz con sus pesos.
+
+El .npz se usa luego con politica_numpy.NumpyPolicy, sin cargar torch ni
+stable_baselines3. Para observaciones discretas (como los 14 estados de
+RoboboEnv) se guarda además la tabla de acciones precalculada.
+
+Uso: python exportar_politica.py <modelo.zip> [salida.npz]
+"""
+import os
+import sys
+import time
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from politica_numpy import NumpyPolicy
+
+ACTIVATION_NAMES = {"Tanh": "tanh", "ReLU": "relu", "Identity": "identity"}
+
+
+def export_policy(model_path, output_path=None):
+    """
+    Extrae los pesos de la red de política y los guarda en un .npz.
+
+    Args:
+        model_path: Ruta al modelo PPO guardado
+        output_path: Ruta de salida (por defecto, la misma con extensión .npz)
+
+    Returns:
+        Ruta del fichero .npz generado
+
+    Raises:
+        ValueError: Si las acciones del .npz no coinciden con las de SB3
+            (en ese caso se borra el .npz)
+    """
+    import torch
+
+    if output_path is None:
+        output_path = model_path[:-4] + ".npz" if model_path.endswith(".zip") else model_path + ".npz"
+
+    model = PPO.load(model_path, device="cpu")
+    policy = model.policy
+
+    layers = [m for m in policy.mlp_extractor.policy_net if isinstance(m, torch.nn.Linear)]
+    activation = ACTIVATION_NAMES[policy.activation_fn.__name__]
+
+    arrays = {
+        "n_layers": np.array(len(layers)),
+        "activation": np.array(activation),
+        "action_W": policy.action_net.weight.detach().numpy(),
+        "action_b": policy.action_net.bias.detach().numpy(),
+    }
+    for i, layer in enumerate(layers):
+        arrays[f"W{i}"] = layer.weight.detach().numpy()
+        arrays[f"b{i}"] = layer.bias.detach().numpy()
+
+    obs_space = model.observation_space
+    if isinstance(obs_space, spaces.Discrete):
+        arrays["obs_n"] = np.array(obs_space.n)
+        # Tabla de búsqueda: una acción determinista por estado
+        states = np.arange(obs_space.n)
+        lookup = np.array([model.predict(s, deterministic=True)[0] for s in states], dtype=np.int64)
+        arrays["lookup"] = lookup
+    else:
+        arrays["obs_n"] = np.array(0)
+
+    np.savez(output_path, **arrays)
+    print(f"Política exportada en {output_path}")
+
+    if not check_export(model, output_path):
+        # Un .npz que no reproduce la política no debe quedar a mano de test.py o torneo.py
+        os.remove(output_path)
+        raise ValueError(f"La política exportada no coincide con {model_path}; se ha borrado {output_path}")
+    return output_path
+
+
+def check_export(model, npz_path, n_samples=200):
+    """Comprueba que el forward en NumPy da las mismas acciones que SB3."""
+    policy = NumpyPolicy(npz_path)
+    obs_space = model.observation_space
+
+    if isinstance(obs_space, spaces.Discrete):
+        samples = list(range(obs_space.n))
+    else:
+        samples = [obs_space.sample() for _ in range(n_samples)]
+
+    mismatches = 0
+    for obs in samples:
+        sb3_action, _ = model.predict(obs, deterministic=True)
+        np_action = policy.logits(obs).argmax(axis=1)[0]
+        if int(sb3_action) != int(np_action):
+            mismatches += 1
+
+    print(f"Comprobación: {len(samples) - mismatches}/{len(samples)} acciones coinciden")
+
+    # Latencia por acción
+    start = time.perf_counter()
+    for obs in samples:
+        model.predict(obs, deterministic=True)
+    sb3_time = (time.perf_counter() - start) / len(samples)
+
+    start = time.perf_counter()
+    for obs in samples:
+        policy.predict(obs)
+    np_time = (time.perf_counter() - start) / len(samples)
+
+    print(f"Latencia por acción: SB3 {sb3_time * 1e6:.1f} us - NumPy {np_time * 1e6:.1f} us")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python exportar_politica.py <modelo.zip> [salida.npz]")
+        sys.exit(1)
+
+    try:
+        export_policy(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -1,6 +1,7 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
+import time
 from robobopy.Robobo import Robobo
 from robobopy.utils.IR import IR
 from robobopy.utils.BlobColor import BlobColor
@@ -12,12 +13,19 @@ class RoboboEnv(gym.Env):
     """
     metadata = {"render_modes": ["human"]}
 
-    def __init__(self, max_steps=50, host="localhost"):
+    def __init__(self, max_steps=50, host="localhost", backend=None):
+        """
+        backend: par (robobo, sim) que sustituye a Robobo/RoboboSim, por
+        ejemplo tablas_sensores.table_backend(...) para trabajar sin simulador.
+        """
         super(RoboboEnv, self).__init__()
         
         # Conexión con el robot
-        self.robobo = Robobo(host)
-        self.sim = RoboboSim(host) 
+        if backend is not None:
+            self.robobo, self.sim = backend
+        else:
+            self.robobo = Robobo(host)
+            self.sim = RoboboSim(host) 
         self.robobo.connect()
         self.sim.connect()
         
@@ -33,6 +41,7 @@ class RoboboEnv(gym.Env):
         self.state = None
         self.steps = 0
         self.max_steps = max_steps
+        self.sim_time = 0.0  # Segundos acumulados en reset/step (tiempo de simulador)
         
         # Constantes para detección
         self.OBSTACLE_THRESHOLD_FRONT = 30
@@ -48,6 +57,7 @@ class RoboboEnv(gym.Env):
     def reset(self, *, seed=None):
         """Reinicia el entorno y retorna el estado inicial."""
         super().reset(seed=seed)
+        start = time.perf_counter()
         self.steps = 0
         
         # Reiniciar simulación
@@ -59,6 +69,7 @@ class RoboboEnv(gym.Env):
         self.robobo.setActiveBlobs(red=True, green=False, blue=False, custom=False)
         
         self.state = self._get_state()
+        self.sim_time += time.perf_counter() - start
         return self.state, {}
 
 
@@ -129,6 +140,7 @@ class RoboboEnv(gym.Env):
         4: Girar derecha (fuerte)
         5: Girar 180 grados
         """
+        start = time.perf_counter()
         self.steps += 1
         
         # Verificar y evitar obstáculos antes de la acción
@@ -188,9 +200,36 @@ class RoboboEnv(gym.Env):
         if truncated:
             print("** Tiempo máximo alcanzado - Episodio truncado")
 
-        return self.state, reward, terminated, truncated, {}
+        # Lecturas en bruto de los sensores (para registrar trayectorias)
+        info = {
+            "ir_front_c": distancia,
+            "blob_size": blob.size,
+            "blob_posx": blob.posx,
+        }
+
+        self.sim_time += time.perf_counter() - start
+        return self.state, reward, terminated, truncated, info
+
 
 
+    def save_state(self):
+        """
+        Instantánea del episodio en curso (mundo simulado, pasos y
+        observación). Solo con un backend local que lo permita, como el de
+        tablas_sensores.py: RoboboSim no puede guardar su estado.
+        """
+        if not hasattr(self.sim, "save_state"):
+            raise NotImplementedError("El simulador no permite guardar su estado; usa un backend local (tablas_sensores.py)")
+        return {"sim": self.sim.save_state(), "steps": self.steps, "state": self.state}
+
+    def load_state(self, snapshot):
+        """Continúa desde una instantánea de save_state (en lugar de reset); devuelve (obs, info)."""
+        start = time.perf_counter()
+        self.sim.load_state(snapshot["sim"])
+        self.steps = snapshot["steps"]
+        self.state = snapshot["state"]
+        self.sim_time += time.perf_counter() - start
+        return self.state, {}
 
     def _get_state(self):
         """
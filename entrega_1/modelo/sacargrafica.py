@@ -1,28 +1,39 @@
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# Cargar CSV (omite la primera línea con el diccionario JSON)
-df = pd.read_csv("C:\\Users\\jesus\\Desktop\\practica-robotica\\robobo_logs\\finalultimo4\\monitor.csv", comment="#")
 
-# Número de episodios = índice
-df["episode"] = range(1, len(df)+1)
+def plot_monitor(csv_path):
+    """Dibuja la recompensa y la longitud por episodio de un monitor.csv."""
+    # Cargar CSV (omite la primera línea con el diccionario JSON)
+    df = pd.read_csv(csv_path, comment="#")
 
-# Gráfica de recompensa por episodio
-plt.figure(figsize=(10, 5))
-plt.plot(df["episode"], df["r"], marker="o", label="Recompensa")
-plt.xlabel("Episodio")
-plt.ylabel("Recompensa total (r)")
-plt.title("Evolución de la recompensa por episodio")
-plt.legend()
-plt.grid(True)
-plt.show()
+    # Número de episodios = índice
+    df["episode"] = range(1, len(df)+1)
 
-# Gráfica de longitud por episodio
-plt.figure(figsize=(10, 5))
-plt.plot(df["episode"], df["l"], marker="o", color="orange", label="Longitud")
-plt.xlabel("Episodio")
-plt.ylabel("Longitud del episodio (steps)")
-plt.title("Evolución de la longitud de episodios")
-plt.legend()
-plt.grid(True)
-plt.show()
+    # Gráfica de recompensa por episodio
+    plt.figure(figsize=(10, 5))
+    plt.plot(df["episode"], df["r"], marker="o", label="Recompensa")
+    plt.xlabel("Episodio")
+    plt.ylabel("Recompensa total (r)")
+    plt.title("Evolución de la recompensa por episodio")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+    # Gráfica de longitud por episodio
+    plt.figure(figsize=(10, 5))
+    plt.plot(df["episode"], df["l"], marker="o", color="orange", label="Longitud")
+    plt.xlabel("Episodio")
+    plt.ylabel("Longitud del episodio (steps)")
+    plt.title("Evolución de la longitud de episodios")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    csv_path = "C:\\Users\\jesus\\Desktop\\practica-robotica\\robobo_logs\\finalultimo4\\monitor.csv"
+    if len(sys.argv) > 1:
+        csv_path = sys.argv[1]
+    plot_monitor(csv_path)
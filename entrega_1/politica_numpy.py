@@ -0,0 +1,61 @@
+"""
+Inferencia con NumPy puro para políticas PPO exportadas con exportar_politica.py.
+
+No necesita stable_baselines3 ni torch: solo carga un .npz con los pesos de la
+MlpPolicy (o la tabla de acciones precalculada) y hace el forward a mano.
+"""
+import numpy as np
+
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "identity": lambda x: x,
+}
+
+
+class NumpyPolicy:
+    """
+    Política determinista equivalente a `model.predict(obs, deterministic=True)`.
+
+    Args:
+        path: Ruta al .npz generado por exportar_politica.py
+    """
+
+    def __init__(self, path):
+        data = np.load(path)
+        self.n_layers = int(data["n_layers"])
+        self.weights = [data[f"W{i}"] for i in range(self.n_layers)]
+        self.biases = [data[f"b{i}"] for i in range(self.n_layers)]
+        self.action_W = data["action_W"]
+        self.action_b = data["action_b"]
+        self.activation = ACTIVATIONS[str(data["activation"])]
+        self.obs_n = int(data["obs_n"])  # 0 si la observación es continua
+
+        # Para observaciones discretas basta con una tabla de búsqueda
+        self.lookup = data["lookup"] if "lookup" in data.files else None
+
+    def _preprocess(self, obs):
+        obs = np.asarray(obs)
+        if self.obs_n > 0:
+            # Igual que SB3: one-hot de la observación discreta
+            return np.eye(self.obs_n, dtype=np.float32)[obs.astype(np.int64).reshape(-1)]
+        return obs.reshape(-1, self.weights[0].shape[1]).astype(np.float32)
+
+    def logits(self, obs):
+        """Salida de action_net para un lote de observaciones."""
+        x = self._preprocess(obs)
+        for W, b in zip(self.weights, self.biases):
+            x = self.activation(x @ W.T + b)
+        return x @ self.action_W.T + self.action_b
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """
+        Misma firma que PPO.predict para poder sustituirlo en test.py.
+        Siempre devuelve la acción determinista (argmax de los logits).
+        """
+        scalar = np.ndim(obs) == 0 if self.obs_n > 0 else np.ndim(obs) == 1
+        if self.lookup is not None:
+            actions = self.lookup[np.asarray(obs, dtype=np.int64).reshape(-1)]
+        else:
+            actions = self.logits(obs).argmax(axis=1)
+        return (actions[0] if scalar else actions), state
@@ -4,9 +4,14 @@ from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback
 from stable_baselines3.common.vec_env import DummyVecEnv
 import os
+import sys
 from datetime import datetime
 from main import RoboboEnv
 
+# registro.py está en la raíz del repositorio
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from registro import RunRegistry
+
 # Configuración de directorios
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 log_dir = f"./robobo_logs/{timestamp}/"
@@ -24,9 +29,7 @@ base_env = RoboboEnv()
 env = Monitor(base_env, log_dir)
 
 # Configuración del modelo PPO con hiperparámetros optimizados
-model = PPO(
-    policy="MlpPolicy",
-    env=env,
+ppo_params = dict(
     learning_rate=3e-4,
     n_steps=128, 
     batch_size=64,
@@ -37,8 +40,13 @@ model = PPO(
     ent_coef=0.01, # Coeficiente de entropía para exploración
     vf_coef=0.5, # Coeficiente de value function
     max_grad_norm=0.5, # Gradient clipping
+)
+model = PPO(
+    policy="MlpPolicy",
+    env=env,
     verbose=1,
     tensorboard_log=tensorboard_dir,
+    **ppo_params,
 )
 
 # Callback para guardar checkpoints periódicos
@@ -69,6 +77,17 @@ print(f"Total de timesteps: {TOTAL_TIMESTEPS}")
 print(f"Pasos por episodio: {base_env.max_steps}")
 print(f"Episodios aproximados: {TOTAL_TIMESTEPS // base_env.max_steps}")
 
+# Registrar la ejecución
+registry = RunRegistry()
+run_id = registry.start_run(
+    "ppo", log_dir,
+    dict(ppo_params, total_timesteps=TOTAL_TIMESTEPS, max_steps=base_env.max_steps),
+    artifacts={"models": os.path.abspath(models_dir), "tensorboard": os.path.abspath(tensorboard_dir),
+               "monitor": os.path.abspath(f"{log_dir}monitor.csv"),
+               "evaluations": os.path.abspath(f"{log_dir}evaluations.npz")},
+)
+run_status = "error"
+
 try:
     model.learn(
         total_timesteps=TOTAL_TIMESTEPS,
@@ -89,11 +108,13 @@ try:
     print(f" - Logs: {log_dir}")
     print(f" - Modelos: {models_dir}")
     print(f" - TensorBoard: tensorboard --logdir={tensorboard_dir}")
+    run_status = "completada"
 
 except KeyboardInterrupt:
     print("\nEntrenamiento interrumpido por el usuario")
     model.save(f"{models_dir}ppo_robobo_interrupted")
     print(f"Modelo guardado en {models_dir}ppo_robobo_interrupted")
+    run_status = "interrumpida"
 
 except Exception as e:
     print(f"\nError durante el entrenamiento: {e}")
@@ -104,4 +125,15 @@ finally:
     env.close()
     print("\nEntorno cerrado")
 
+    metrics = {"timesteps": model.num_timesteps}
+    if eval_callback.best_mean_reward > -float("inf"):
+        metrics["best_mean_reward"] = eval_callback.best_mean_reward
+    rewards = env.get_episode_rewards()
+    if rewards:
+        metrics["episodes"] = len(rewards)
+        metrics["mean_reward"] = sum(rewards) / len(rewards)
+    registry.end_run(run_id, status=run_status, metrics=metrics, sim_time=base_env.sim_time)
+    registry.close()
+    print(f"Ejecución {run_id} registrada en {registry.path}")
+
 
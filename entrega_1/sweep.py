@@ -0,0 +1,303 @@
+"""
+Barrido de hiperparámetros de PPO en paralelo sobre varios simuladores.
+
+Cada simulador (un RoboboSim en un host distinto) tiene su propio proceso
+trabajador que saca pruebas de una cola común en cuanto termina la anterior,
+así ningún simulador se queda parado mientras quedan pruebas pendientes.
+Las pruebas flojas se podan pronto a partir de los resultados intermedios del
+EvalCallback (regla de la mediana) y todo se guarda en un CSV local.
+
+Uso: python sweep.py espacio.json --hosts localhost 192.168.1.20 [--trials 20]
+
+Ejemplo de espacio.json:
+    {
+        "gamma": [0.9, 0.95, 0.99],
+        "learning_rate": {"log": [1e-5, 1e-3]},
+        "ent_coef": {"uniform": [0.0, 0.05]},
+        "n_steps": [64, 128, 256]
+    }
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+import traceback
+from datetime import datetime
+
+# Hiperparámetros de ppo.py, usados para todo lo que no se barre
+DEFAULT_PPO_KWARGS = {
+    "learning_rate": 3e-4,
+    "n_steps": 128,
+    "batch_size": 64,
+    "n_epochs": 10,
+    "gamma": 0.90,
+    "gae_lambda": 0.95,
+    "clip_range": 0.2,
+    "ent_coef": 0.01,
+    "vf_coef": 0.5,
+    "max_grad_norm": 0.5,
+}
+
+RESULT_FIELDS = ["trial", "host", "status", "best_mean_reward", "last_mean_reward",
+                 "n_evals", "timesteps", "duration_s", "params", "intermediate"]
+
+
+def sample_params(space, rng):
+    """
+    Elige un valor para cada hiperparámetro del espacio de búsqueda.
+
+    Cada entrada puede ser una lista (elección discreta),
+    {"uniform": [lo, hi]} o {"log": [lo, hi]} (uniforme en escala logarítmica).
+    """
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            params[name] = rng.choice(spec)
+        elif "uniform" in spec:
+            lo, hi = spec["uniform"]
+            params[name] = rng.uniform(lo, hi)
+        elif "log" in spec:
+            lo, hi = spec["log"]
+            params[name] = math.exp(rng.uniform(math.log(lo), math.log(hi)))
+        else:
+            raise ValueError(f"Especificación no válida para {name}: {spec}")
+    return params
+
+
+class MedianPruner:
+    """
+    Poda una prueba si su recompensa en la evaluación k queda por debajo de la
+    mediana de las demás pruebas en esa misma evaluación.
+
+    Args:
+        shared: Diccionario compartido entre procesos {trial: [recompensas]}
+        n_warmup_evals: Evaluaciones que se dejan pasar antes de podar
+        min_trials: Pruebas con datos necesarias para comparar
+    """
+
+    def __init__(self, shared, n_warmup_evals=1, min_trials=3):
+        self.shared = shared
+        self.n_warmup_evals = n_warmup_evals
+        self.min_trials = min_trials
+
+    def report(self, trial, value):
+        values = self.shared.get(trial, [])
+        values.append(value)
+        # Reasignar para que el Manager propague el cambio
+        self.shared[trial] = values
+        return len(values) - 1
+
+    def should_prune(self, trial, step):
+        if step < self.n_warmup_evals:
+            return False
+        others = [v[step] for t, v in self.shared.items() if t != trial and len(v) > step]
+        if len(others) < self.min_trials - 1:
+            return False
+        others.sort()
+        mid = len(others) // 2
+        median = others[mid] if len(others) % 2 else (others[mid - 1] + others[mid]) / 2
+        return self.shared[trial][step] < median
+
+
+def _make_prune_callback(pruner, trial):
+    """Callback para `EvalCallback(callback_after_eval=...)` que aplica la poda."""
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    class PruneCallback(BaseCallback):
+        def __init__(self):
+            super().__init__()
+            self.pruned = False
+
+        def _on_step(self):
+            step = pruner.report(trial, float(self.parent.last_mean_reward))
+            if pruner.should_prune(trial, step):
+                print(f"[prueba {trial}] podada en la evaluación {step}")
+                self.pruned = True
+                return False
+            return True
+
+    return PruneCallback()
+
+
+def run_trial(trial, params, host, pruner, log_root, total_timesteps, eval_freq, n_eval_episodes):
+    """Entrena un PPO con los hiperparámetros dados contra el simulador `host`."""
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.monitor import Monitor
+    from stable_baselines3.common.callbacks import EvalCallback
+    from main import RoboboEnv
+
+    log_dir = os.path.join(log_root, f"trial_{trial:03d}")
+    os.makedirs(log_dir, exist_ok=True)
+
+    env = Monitor(RoboboEnv(host=host), log_dir)
+    kwargs = {**DEFAULT_PPO_KWARGS, **params}
+    model = PPO(policy="MlpPolicy", env=env, verbose=0, **kwargs)
+
+    prune_callback = _make_prune_callback(pruner, trial)
+    eval_callback = EvalCallback(
+        env,
+        best_model_save_path=log_dir,
+        log_path=log_dir,
+        eval_freq=eval_freq,
+        n_eval_episodes=n_eval_episodes,
+        deterministic=True,
+        render=False,
+        callback_after_eval=prune_callback,
+    )
+
+    try:
+        model.learn(total_timesteps=total_timesteps, callback=eval_callback)
+    finally:
+        env.close()
+
+    return {
+        "status": "podada" if prune_callback.pruned else "completa",
+        "best_mean_reward": float(eval_callback.best_mean_reward),
+        "last_mean_reward": float(eval_callback.last_mean_reward),
+        "timesteps": int(model.num_timesteps),
+    }
+
+
+def _worker(host, trials, results, shared, log_root, opts):
+    """Proceso asociado a un simulador: ejecuta pruebas hasta vaciar la cola."""
+    pruner = MedianPruner(shared, opts["n_warmup_evals"], opts["min_trials"])
+    while True:
+        item = trials.get()
+        if item is None:
+            break
+        trial, params = item
+        start = time.time()
+        print(f"[{host}] prueba {trial}: {params}")
+        try:
+            row = run_trial(trial, params, host, pruner, log_root, opts["total_timesteps"],
+                            opts["eval_freq"], opts["n_eval_episodes"])
+        except Exception as e:
+            traceback.print_exc()
+            row = {"status": f"error: {e}", "best_mean_reward": float("nan"),
+                   "last_mean_reward": float("nan"), "timesteps": 0}
+        row.update({
+            "trial": trial,
+            "host": host,
+            "duration_s": round(time.time() - start, 1),
+            "params": json.dumps(params),
+            "intermediate": json.dumps(shared.get(trial, [])),
+            "n_evals": len(shared.get(trial, [])),
+        })
+        results.put(row)
+
+
+def run_sweep(space, hosts, n_trials=20, total_timesteps=2000, eval_freq=500,
+              n_eval_episodes=5, n_warmup_evals=1, min_trials=3, seed=None, log_root=None, poll=5.0):
+    """
+    Lanza el barrido y devuelve las filas de resultados ordenadas por recompensa.
+
+    Args:
+        space: Espacio de búsqueda (ver sample_params)
+        hosts: Lista de hosts con un RoboboSim cada uno
+        n_trials: Número de configuraciones a probar
+        total_timesteps: Pasos de entrenamiento por prueba
+        eval_freq: Pasos entre evaluaciones (puntos de poda)
+        n_eval_episodes: Episodios por evaluación
+        log_root: Directorio donde se guarda results.csv y los logs de cada prueba
+        poll: Segundos entre comprobaciones de que los trabajadores siguen vivos
+    """
+    if log_root is None:
+        log_root = f"./sweeps/{datetime.now().strftime('%Y%m%d_%H%M%S')}/"
+    os.makedirs(log_root, exist_ok=True)
+    results_path = os.path.join(log_root, "results.csv")
+
+    rng = random.Random(seed)
+    with open(os.path.join(log_root, "space.json"), "w") as f:
+        json.dump({"space": space, "hosts": hosts, "n_trials": n_trials, "seed": seed}, f, indent=2)
+
+    manager = mp.Manager()
+    shared = manager.dict()
+    trials = mp.Queue()
+    results = mp.Queue()
+
+    sampled = {trial: sample_params(space, rng) for trial in range(n_trials)}
+    for trial, params in sampled.items():
+        trials.put((trial, params))
+    for _ in hosts:
+        trials.put(None)  # Una señal de parada por trabajador
+
+    opts = {
+        "total_timesteps": total_timesteps,
+        "eval_freq": eval_freq,
+        "n_eval_episodes": n_eval_episodes,
+        "n_warmup_evals": n_warmup_evals,
+        "min_trials": min_trials,
+    }
+    workers = [mp.Process(target=_worker, args=(host, trials, results, shared, log_root, opts))
+               for host in hosts]
+    for w in workers:
+        w.start()
+
+    rows = []
+    with open(results_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        while len(rows) < n_trials:
+            # Si todos los procesos ya habían terminado antes de esperar, no llegará nada más
+            all_exited = not any(w.is_alive() for w in workers)
+            try:
+                row = results.get(timeout=poll)
+            except queue.Empty:
+                if all_exited:
+                    break
+                continue
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+            print(f"Prueba {row['trial']} ({row['status']}) en {row['host']}: "
+                  f"mejor recompensa {row['best_mean_reward']:.2f} "
+                  f"[{len(rows)}/{n_trials}]")
+
+        # Pruebas que se llevó un trabajador muerto (proceso matado, fallo fuera de run_trial...)
+        done = {row["trial"] for row in rows}
+        lost = [trial for trial in sampled if trial not in done]
+        if lost:
+            codes = ", ".join(f"{h}: código {w.exitcode}" for h, w in zip(hosts, workers))
+            print(f"⚠️ Trabajadores terminados ({codes}); pruebas sin resultado: {lost}")
+        for trial in lost:
+            row = {"trial": trial, "host": "", "status": "error: trabajador terminado",
+                   "best_mean_reward": float("nan"), "last_mean_reward": float("nan"), "timesteps": 0,
+                   "duration_s": 0.0, "params": json.dumps(sampled[trial]), "intermediate": "[]", "n_evals": 0}
+            writer.writerow(row)
+            rows.append(row)
+
+    for w in workers:
+        w.join()
+
+    # Las pruebas con error (NaN) van al final
+    rows.sort(key=lambda r: (math.isnan(r["best_mean_reward"]), -r["best_mean_reward"]))
+    print(f"\nResultados guardados en {results_path}")
+    print(f"\n{'='*50}")
+    print("MEJORES PRUEBAS")
+    print(f"{'='*50}")
+    for row in rows[:5]:
+        print(f"{row['best_mean_reward']:8.2f}  {row['status']:9s}  {row['params']}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de hiperparámetros de PPO")
+    parser.add_argument("space", help="Fichero JSON con el espacio de búsqueda")
+    parser.add_argument("--hosts", nargs="+", default=["localhost"])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--timesteps", type=int, default=2000)
+    parser.add_argument("--eval-freq", type=int, default=500)
+    parser.add_argument("--eval-episodes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.space) as f:
+        space = json.load(f)
+
+    run_sweep(space, args.hosts, n_trials=args.trials, total_timesteps=args.timesteps,
+              eval_freq=args.eval_freq, n_eval_episodes=args.eval_episodes, seed=args.seed)
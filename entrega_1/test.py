@@ -2,16 +2,32 @@
 Script para probar el modelo PPO entrenado con el robot Robobo.
 """
 import gymnasium as gym
-from stable_baselines3 import PPO
 from main import RoboboEnv
+import os
 import sys
 
+# evaluacion_lotes.py y tablas_sensores.py están en la raíz del repositorio
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def load_model(model_path):
+    """
+    Carga el modelo a probar.
+    Los .npz exportados con exportar_politica.py se cargan sin torch ni SB3.
+    """
+    if model_path.endswith(".npz"):
+        from politica_numpy import NumpyPolicy
+        return NumpyPolicy(model_path)
+
+    from stable_baselines3 import PPO
+    return PPO.load(model_path)
+
 def test_model(model_path, n_episodes=3, render=True):
     """
     Prueba un modelo entrenado en el entorno Robobo.
     
     Args:
-        model_path: Ruta al modelo guardado
+        model_path: Ruta al modelo guardado (.zip de SB3 o .npz exportado)
         n_episodes: Número de episodios a ejecutar
         render: Si mostrar información durante la ejecución
     """
@@ -19,7 +35,7 @@ def test_model(model_path, n_episodes=3, render=True):
     
     try:
         # Cargar modelo
-        model = PPO.load(model_path)
+        model = load_model(model_path)
         
         # Crear entorno
         env = RoboboEnv()
@@ -84,19 +100,72 @@ def test_model(model_path, n_episodes=3, render=True):
     except Exception as e:
         print(f"Error al cargar o ejecutar el modelo: {e}")
 
+def test_model_batched(model_path, n_episodes=5, hosts=("localhost",), sensor_table=None, robots=1):
+    """
+    Prueba un modelo con varios robots a la vez (evaluacion_lotes.py): en
+    cada tick se llama una sola vez a model.predict con las observaciones
+    de todos los robots activos y los robots se mueven en paralelo.
+
+    Args:
+        hosts: Un RoboboSim por robot
+        sensor_table: Si se indica, `robots` entornos locales con la tabla de
+            tablas_sensores.py en lugar de los simuladores de hosts
+    """
+    from evaluacion_lotes import run_batched, print_batched_summary
+
+    print(f"Cargando modelo desde: {model_path}")
+    model = load_model(model_path)
+    if sensor_table is not None:
+        from tablas_sensores import table_backend
+        envs = [RoboboEnv(backend=table_backend(sensor_table, seed=i)) for i in range(robots)]
+    else:
+        envs = [RoboboEnv(host=host) for host in hosts]
+
+    def report(result):
+        status = "éxito" if result["success"] else "fallo"
+        print(f"[robot {result['env']}] episodio {result['episode'] + 1}: {status}, "
+              f"recompensa {result['reward']:.2f}, pasos {result['steps']}")
+
+    try:
+        results, stats = run_batched(envs, lambda obs: model.predict(obs, deterministic=True)[0],
+                                     n_episodes, on_episode=report)
+    finally:
+        for env in envs:
+            env.close()
+    print_batched_summary(results, stats, len(envs))
+    return results
+
 def main():
     """Función principal."""
+    import argparse
+
     # Cambiar esta ruta al modelo que se quiera probar
     model_path = "C:\\Users\\jesus\\Desktop\\practica-robotica\\robobo_logs\\finalultimo4\\ppo_robobo_final.zip"
-    
-    # Si se proporciona ruta como argumento
-    if len(sys.argv) > 1:
-        model_path = sys.argv[1]
-    
-    # Número de episodios de prueba
-    n_episodes = 5
-    
-    test_model(model_path, n_episodes=n_episodes, render=True)
+
+    parser = argparse.ArgumentParser(description="Probar un modelo PPO en Robobo")
+    parser.add_argument("model_path", nargs="?", default=model_path)
+    parser.add_argument("-n", "--episodes", type=int, default=5, help="Número de episodios de prueba")
+    parser.add_argument("--hosts", nargs="+", default=None,
+                        help="Simuladores para evaluar en paralelo (con intervalos de confianza)")
+    parser.add_argument("--epsilon", type=float, default=None,
+                        help="Parar cuando el IC de la métrica sea más estrecho que epsilon")
+    parser.add_argument("--metric", choices=["success", "reward", "steps"], default="success")
+    parser.add_argument("--lotes", action="store_true",
+                        help="Un solo proceso: acciones de todos los robots en una llamada por paso")
+    parser.add_argument("--tabla-sensores", metavar="DIR",
+                        help="Con --lotes, robots locales con una tabla de tablas_sensores.py")
+    parser.add_argument("--robots", type=int, default=4, help="Robots locales con --tabla-sensores")
+    args = parser.parse_args()
+
+    if args.lotes:
+        test_model_batched(args.model_path, n_episodes=args.episodes, hosts=args.hosts or ["localhost"],
+                           sensor_table=args.tabla_sensores, robots=args.robots)
+    elif args.hosts or args.epsilon is not None:
+        from evaluacion import evaluate_parallel
+        evaluate_parallel(args.model_path, args.hosts or ["localhost"], n_episodes=args.episodes,
+                          epsilon=args.epsilon, metric=args.metric)
+    else:
+        test_model(args.model_path, n_episodes=args.episodes, render=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Torneo de checkpoints PPO con eliminación sucesiva a la mitad.
+
+Carga una sola vez todos los modelos guardados (checkpoints, best_model,
+final...), les da unos pocos episodios de evaluación y en cada ronda elimina
+la peor mitad, duplicando los episodios de los que siguen. Así el tiempo de
+simulador se gasta en los candidatos que importan.
+
+Uso: python torneo.py <directorio_modelos> [--episodios 2] [--csv ranking.csv]
+"""
+import argparse
+import csv
+import glob
+import os
+
+import numpy as np
+
+from evaluacion import bootstrap_ci, run_episode
+
+
+def _is_policy_npz(path):
+    """Solo los .npz de exportar_politica.py (no evaluations.npz ni las cachés de eventos_tb.py)."""
+    try:
+        with np.load(path) as data:
+            return "n_layers" in data.files
+    except (OSError, ValueError):
+        return False
+
+
+def find_models(directory):
+    """Todos los modelos .zip (y políticas .npz) bajo `directory`."""
+    paths = glob.glob(os.path.join(directory, "**", "*.zip"), recursive=True)
+    npz = glob.glob(os.path.join(directory, "**", "*.npz"), recursive=True)
+    # Una política exportada junto a su .zip es el mismo modelo: se queda el .zip
+    npz = [p for p in npz if not os.path.exists(os.path.splitext(p)[0] + ".zip") and _is_policy_npz(p)]
+    return sorted(paths + npz)
+
+
+def score(results):
+    """Clave de orden: primero tasa de éxito, después recompensa media."""
+    if not results:
+        return (-np.inf, -np.inf)
+    return (np.mean([r["success"] for r in results]), np.mean([r["reward"] for r in results]))
+
+
+def run_tournament(model_paths, env, episodes_per_round=2, eta=2):
+    """
+    Ejecuta el torneo y devuelve la clasificación.
+
+    Args:
+        model_paths: Rutas de los modelos a comparar
+        env: Entorno RoboboEnv compartido
+        episodes_per_round: Episodios de cada modelo en la primera ronda
+        eta: Factor de reducción (2 = se queda la mitad en cada ronda)
+
+    Returns:
+        Lista de diccionarios ordenada del mejor al peor
+    """
+    from test import load_model
+
+    print(f"Cargando {len(model_paths)} modelos...")
+    models = {path: load_model(path) for path in model_paths}
+    results = {path: [] for path in model_paths}
+    eliminated = {}
+
+    alive = list(model_paths)
+    round_idx = 0
+    budget = episodes_per_round
+    # Con un solo modelo se juega igualmente la primera ronda
+    while len(alive) > 1 or round_idx == 0:
+        round_idx += 1
+        print(f"\n{'='*50}")
+        print(f"Ronda {round_idx}: {len(alive)} modelos, {budget} episodios cada uno")
+        print(f"{'='*50}")
+
+        for path in alive:
+            for _ in range(budget):
+                results[path].append(run_episode(env, models[path]))
+            s, r = score(results[path])
+            print(f"{os.path.basename(path)}: éxito {s * 100:.0f}%, recompensa {r:.2f} "
+                  f"({len(results[path])} episodios)")
+
+        alive.sort(key=lambda p: score(results[p]), reverse=True)
+        keep = max(1, len(alive) // eta)
+        for path in alive[keep:]:
+            eliminated[path] = round_idx
+        alive = alive[:keep]
+        budget *= eta
+
+    ranking = []
+    order = alive + sorted(eliminated, key=lambda p: (eliminated[p], score(results[p])), reverse=True)
+    for path in order:
+        res = results[path]
+        mean, lo, hi = bootstrap_ci([r["reward"] for r in res])
+        ranking.append({
+            "model": path,
+            "eliminated_round": eliminated.get(path, "-"),
+            "episodes": len(res),
+            "success_rate": float(np.mean([r["success"] for r in res])) if res else float("nan"),
+            "mean_reward": mean,
+            "reward_ci_low": lo,
+            "reward_ci_high": hi,
+            "mean_steps": float(np.mean([r["steps"] for r in res])) if res else float("nan"),
+        })
+    return ranking
+
+
+def print_ranking(ranking):
+    # Rutas relativas a la carpeta común (puede haber varios ppo_robobo_final.zip)
+    paths = [row["model"] for row in ranking]
+    base = os.path.commonpath(paths) if len(paths) > 1 else os.path.dirname(paths[0])
+    print(f"\n{'='*90}")
+    print("CLASIFICACIÓN")
+    print(f"{'='*90}")
+    print(f"{'#':>3}  {'Modelo':<42}{'Ronda':>6}{'Ep.':>5}{'Éxito':>8}{'Recompensa':>12}{'IC 95%':>20}")
+    for i, row in enumerate(ranking, 1):
+        ci = f"[{row['reward_ci_low']:.1f}, {row['reward_ci_high']:.1f}]"
+        print(f"{i:>3}  {os.path.relpath(row['model'], base):<42}{str(row['eliminated_round']):>6}"
+              f"{row['episodes']:>5}{row['success_rate'] * 100:>7.0f}%{row['mean_reward']:>12.2f}{ci:>20}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Torneo de checkpoints PPO")
+    parser.add_argument("directory", help="Directorio con los modelos (p. ej. modelo/models)")
+    parser.add_argument("--episodios", type=int, default=2, help="Episodios por modelo en la primera ronda")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--csv", default=None, help="Guardar la clasificación en CSV")
+    args = parser.parse_args()
+
+    paths = find_models(args.directory)
+    if not paths:
+        print(f"No se encontraron modelos en {args.directory}")
+        raise SystemExit(1)
+
+    from main import RoboboEnv
+    env = RoboboEnv(host=args.host)
+    try:
+        ranking = run_tournament(paths, env, episodes_per_round=args.episodios)
+    finally:
+        env.close()
+
+    print_ranking(ranking)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(ranking[0]))
+            writer.writeheader()
+            writer.writerows(ranking)
+        print(f"\nClasificación guardada en {args.csv}")
@@ -0,0 +1,115 @@
+"""
+Evaluación por lotes de varios robots/entornos a la vez.
+
+test.py y neat_test.py eligen la acción de una observación cada vez y
+esperan a que termine cada paso antes de pasar al siguiente robot. Aquí
+todos los entornos avanzan al mismo ritmo (tick):
+
+1. se juntan las observaciones de los entornos activos en un array,
+2. la política elige todas las acciones con una sola llamada
+   (PPO.predict, NumpyPolicy.predict o BatchedNetwork.activate_batch),
+3. cada entorno ejecuta su acción en su propio hilo, a la vez que los demás
+   (moveWheelsByTime bloquea esperando al simulador, no a la CPU).
+
+Cuando un entorno termina su episodio se reinicia si quedan episodios por
+repartir; si no, deja de participar en los ticks siguientes.
+
+Uso:
+    envs = [RoboboEnv(host=h) for h in hosts]
+    results, stats = run_batched(envs, lambda obs: model.predict(obs, deterministic=True)[0], n_episodes=20)
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def run_batched(envs, select_actions, n_episodes, max_steps=None, on_episode=None):
+    """
+    Ejecuta n_episodes repartidos entre envs, con acciones elegidas por lotes.
+
+    Args:
+        envs: Entornos ya creados (uno por robot o simulador)
+        select_actions: Recibe un array [n_activos, ...] de observaciones y devuelve n acciones
+        n_episodes: Episodios en total
+        max_steps: Corte opcional de pasos por episodio (además del truncado del entorno)
+        on_episode: Se llama con el resultado de cada episodio al terminar
+
+    Returns:
+        (resultados por episodio, estadísticas de los ticks)
+    """
+    results = []
+    obs = [None] * len(envs)
+    current = [None] * len(envs)   # Episodio en curso de cada entorno
+    started = 0
+    stats = {"ticks": 0, "policy_time": 0.0, "step_time": 0.0, "reset_time": 0.0}
+
+    with ThreadPoolExecutor(max_workers=len(envs), thread_name_prefix="robot") as pool:
+
+        def start_episodes(indices):
+            nonlocal started
+            indices = indices[:max(0, n_episodes - started)]
+            t0 = time.perf_counter()
+            futures = [(i, pool.submit(envs[i].reset)) for i in indices]
+            for i, future in futures:
+                obs[i], _ = future.result()
+                current[i] = {"episode": started, "env": i, "reward": 0.0, "steps": 0,
+                              "start": time.perf_counter()}
+                started += 1
+            stats["reset_time"] += time.perf_counter() - t0
+
+        start_episodes(list(range(len(envs))))
+        while True:
+            active = [i for i in range(len(envs)) if current[i] is not None]
+            if not active:
+                break
+
+            t0 = time.perf_counter()
+            actions = select_actions(np.stack([np.asarray(obs[i]) for i in active]))
+            t1 = time.perf_counter()
+            futures = [pool.submit(envs[i].step, action) for i, action in zip(active, actions)]
+            outcomes = [future.result() for future in futures]
+            stats["policy_time"] += t1 - t0
+            stats["step_time"] += time.perf_counter() - t1
+            stats["ticks"] += 1
+
+            finished = []
+            for i, (next_obs, reward, terminated, truncated, _) in zip(active, outcomes):
+                obs[i] = next_obs
+                episode = current[i]
+                episode["reward"] += float(reward)
+                episode["steps"] += 1
+                if terminated or truncated or (max_steps is not None and episode["steps"] >= max_steps):
+                    result = {"episode": episode["episode"], "env": i, "success": bool(terminated),
+                              "reward": episode["reward"], "steps": episode["steps"],
+                              "duration": time.perf_counter() - episode["start"]}
+                    results.append(result)
+                    if on_episode is not None:
+                        on_episode(result)
+                    current[i] = None
+                    finished.append(i)
+            if finished:
+                start_episodes(finished)
+
+    return results, stats
+
+
+def print_batched_summary(results, stats, n_envs):
+    """Resumen de los episodios y del reparto de tiempo por tick."""
+    print(f"\n{'='*50}")
+    print("ESTADÍSTICAS FINALES")
+    print(f"{'='*50}")
+    n = len(results)
+    if n == 0:
+        print("No se completó ningún episodio")
+        return
+    rewards = [r["reward"] for r in results]
+    successes = sum(r["success"] for r in results)
+    print(f"Episodios completados: {n} en {n_envs} entornos")
+    print(f"Éxitos: {successes}/{n} ({successes / n * 100:.1f}%)")
+    print(f"Recompensa promedio: {np.mean(rewards):.2f}")
+    print(f"Recompensa máxima: {max(rewards):.2f}")
+    print(f"Recompensa mínima: {min(rewards):.2f}")
+    ticks = max(stats["ticks"], 1)
+    print(f"Ticks: {stats['ticks']}  política {1000 * stats['policy_time'] / ticks:.2f} ms/tick, "
+          f"pasos {1000 * stats['step_time'] / ticks:.1f} ms/tick")
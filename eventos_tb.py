@@ -0,0 +1,304 @@
+"""
+Lector ligero de ficheros de eventos de TensorBoard.
+
+Sacar rollout/ep_rew_mean de un events.out.tfevents.* con TensorBoard obliga
+a cargar todo su stack. Aquí el fichero se recorre registro a registro
+(formato TFRecord) y se decodifica a mano la parte del protobuf Event que
+escribe SB3 (wall_time, step y los valores escalares del Summary).
+
+El resultado se guarda junto al fichero de eventos en <eventos>.scalars.npz
+(una columna por serie: step, wall_time y value) y se invalida cuando cambian
+el tamaño o la fecha de modificación del fichero de eventos. Los .npz se leen
+con memoria mapeada, igual que evaluations.npz de EvalCallback.
+
+Uso:
+    python eventos_tb.py tags <carpeta_o_fichero>
+    python eventos_tb.py plot <carpeta> [<carpeta> ...] [--tag rollout/ep_rew_mean] [--salida comparacion.png]
+"""
+import argparse
+import glob
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+CACHE_SUFFIX = ".scalars.npz"
+
+# DataType de TensorProto
+DT_FLOAT = 1
+DT_DOUBLE = 2
+
+
+# --- Protobuf mínimo ---
+
+def _varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf):
+    """Recorre los campos de un mensaje protobuf: (número, tipo, valor)."""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _varint(buf, pos)
+        elif wire == 1:
+            value = buf[pos:pos + 8]
+            pos += 8
+        elif wire == 2:
+            length, pos = _varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire == 5:
+            value = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Tipo de campo protobuf no soportado: {wire}")
+        yield field, wire, value
+
+
+def _tensor_value(buf):
+    """Primer valor de un TensorProto escalar (add_scalar con new_style=True)."""
+    dtype = None
+    for field, wire, value in _fields(buf):
+        if field == 1:
+            dtype = value
+        elif field == 4 and value:
+            fmt = "<f" if dtype == DT_FLOAT else "<d" if dtype == DT_DOUBLE else None
+            if fmt is not None:
+                return struct.unpack_from(fmt, value)[0]
+        elif field == 5:
+            return struct.unpack_from("<f", value)[0] if wire == 5 else np.frombuffer(value, "<f4")[0]
+        elif field == 6:
+            return struct.unpack_from("<d", value)[0]
+    return None
+
+
+def _summary_values(buf):
+    """(tag, valor) de cada Summary.Value escalar."""
+    for field, _, value in _fields(buf):
+        if field != 1:
+            continue
+        tag = None
+        scalar = None
+        for vfield, _, vvalue in _fields(value):
+            if vfield == 1:
+                tag = bytes(vvalue).decode("utf-8")
+            elif vfield == 2:
+                scalar = struct.unpack("<f", vvalue)[0]
+            elif vfield == 8:
+                scalar = _tensor_value(vvalue)
+        if tag is not None and scalar is not None:
+            yield tag, scalar
+
+
+def _records(data):
+    """Registros TFRecord: longitud u64, crc u32, datos, crc u32 (sin verificar los crc)."""
+    pos = 0
+    end = len(data)
+    while pos + 12 <= end:
+        (length,) = struct.unpack_from("<Q", data, pos)
+        start = pos + 12
+        if start + length + 4 > end:
+            break  # Registro a medio escribir (entrenamiento en curso)
+        yield data[start:start + length]
+        pos = start + length + 4
+
+
+def parse_events(path):
+    """
+    Extrae las series escalares de un fichero de eventos.
+
+    Returns:
+        {tag: (steps, wall_times, values)} como arrays de numpy
+    """
+    series = {}
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+    for record in _records(data):
+        wall_time = 0.0
+        step = 0
+        summary = None
+        for field, _, value in _fields(record):
+            if field == 1:
+                wall_time = struct.unpack("<d", value)[0]
+            elif field == 2:
+                step = value
+            elif field == 5:
+                summary = value
+        if summary is None:
+            continue
+        for tag, scalar in _summary_values(summary):
+            columns = series.setdefault(tag, ([], [], []))
+            columns[0].append(step)
+            columns[1].append(wall_time)
+            columns[2].append(scalar)
+    return {tag: (np.array(s, dtype=np.int64), np.array(w, dtype=np.float64), np.array(v, dtype=np.float64))
+            for tag, (s, w, v) in series.items()}
+
+
+# --- .npz con memoria mapeada ---
+
+def load_npz_mmap(path):
+    """
+    Abre un .npz sin comprimir (np.savez, EvalCallback) con cada array como
+    memmap de solo lectura. Los miembros comprimidos se leen normalmente.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # Cabecera local del zip: 30 bytes + nombre + campo extra
+            f.seek(info.header_offset)
+            local = f.read(30)
+            name_len, extra_len = struct.unpack_from("<HH", local, 26)
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                shape, dtype = None, None
+            # Arrays de objetos, vacíos o escalares: no compensa mapearlos
+            if dtype is None or dtype.hasobject or not shape or 0 in shape:
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                arrays[name] = np.lib.format.read_array(f)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran else "C")
+    return arrays
+
+
+def load_evaluations(path):
+    """evaluations.npz de EvalCallback (timesteps, results, ep_lengths...) con memoria mapeada."""
+    return load_npz_mmap(path)
+
+
+# --- Caché ---
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def load_scalars(path, use_cache=True):
+    """
+    Series escalares de un fichero de eventos, usando la caché si sigue siendo válida.
+
+    Returns:
+        {tag: (steps, wall_times, values)}
+    """
+    cache = path + CACHE_SUFFIX
+    size, mtime = _stat_key(path)
+    if use_cache and os.path.exists(cache):
+        arrays = load_npz_mmap(cache)
+        if int(arrays["source_size"]) == size and int(arrays["source_mtime_ns"]) == mtime:
+            return {str(tag): (arrays[f"{i}_step"], arrays[f"{i}_wall_time"], arrays[f"{i}_value"])
+                    for i, tag in enumerate(arrays["tags"])}
+
+    series = parse_events(path)
+    if use_cache:
+        columns = {"tags": np.array(list(series), dtype=str),
+                   "source_size": np.int64(size), "source_mtime_ns": np.int64(mtime)}
+        for i, (steps, wall_times, values) in enumerate(series.values()):
+            columns[f"{i}_step"] = steps
+            columns[f"{i}_wall_time"] = wall_times
+            columns[f"{i}_value"] = values
+        # Escritura atómica: otro proceso puede estar leyendo la caché
+        tmp = cache + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, cache)
+    return series
+
+
+def find_event_files(path):
+    """Ficheros de eventos bajo `path` (o el propio fichero)."""
+    if os.path.isfile(path):
+        return [path]
+    return sorted(p for p in glob.glob(os.path.join(path, "**", "events.out.tfevents.*"), recursive=True)
+                  if not p.endswith(CACHE_SUFFIX) and not p.endswith(".tmp"))
+
+
+def load_run(path, tag):
+    """
+    Serie `tag` de una ejecución, concatenando sus ficheros de eventos
+    (PPO_1, PPO_2... si se reanudó) en orden de step.
+    """
+    steps, values = [], []
+    for event_file in find_event_files(path):
+        series = load_scalars(event_file)
+        if tag in series:
+            steps.append(series[tag][0])
+            values.append(series[tag][2])
+    if not steps:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    steps = np.concatenate(steps)
+    values = np.concatenate(values)
+    order = np.argsort(steps, kind="stable")
+    return steps[order], values[order]
+
+
+def plot_runs(paths, tag, filename=None, view=False):
+    """Compara la serie `tag` de varias ejecuciones en una sola gráfica."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    base = os.path.commonpath([os.path.abspath(p) for p in paths]) if len(paths) > 1 else None
+    for path in paths:
+        steps, values = load_run(path, tag)
+        if len(steps) == 0:
+            print(f"{path}: sin datos de {tag}")
+            continue
+        label = os.path.relpath(os.path.abspath(path), base) if base else os.path.basename(os.path.normpath(path))
+        ax.plot(steps, values, linewidth=1.5, label=label)
+    ax.set_xlabel("Timestep")
+    ax.set_ylabel(tag)
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc="best", fontsize="small")
+    fig.tight_layout()
+    if filename:
+        fig.savefig(filename)
+    if view:
+        plt.show()
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lector ligero de eventos de TensorBoard")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("tags", help="Series disponibles y número de puntos")
+    p.add_argument("path")
+
+    p = sub.add_parser("plot", help="Comparar una serie entre ejecuciones")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--tag", default="rollout/ep_rew_mean")
+    p.add_argument("--salida", default="comparacion.png")
+
+    args = parser.parse_args()
+
+    if args.command == "tags":
+        for event_file in find_event_files(args.path):
+            print(event_file)
+            for tag, (steps, _, values) in sorted(load_scalars(event_file).items()):
+                print(f"  {tag:<35} {len(steps):>6} puntos  último={values[-1]:.4g} (step {steps[-1]})")
+    else:
+        plot_runs(args.paths, args.tag, filename=args.salida)
+        print(f"Gráfica guardada en {args.salida}")
@@ -0,0 +1,186 @@
+"""
+Diario de evaluaciones de NEAT para reanudar generaciones interrumpidas.
+
+neat.Checkpointer solo guarda el estado al final de una generación: si el
+entrenamiento se corta (o se cuelga el simulador) a mitad de generación, se
+pierde todo lo evaluado desde el último checkpoint. Este diario añade una
+línea JSON por genoma en cuanto se evalúa:
+
+    {"generation": 7, "key": 1032, "hash": "3f1c...", "fitness": 12.5,
+     "steps": 50, "sim_time": 4.1, "error": false}
+
+y una marca cada vez que se guarda un checkpoint:
+
+    {"event": "checkpoint", "file": "neat-checkpoint-5", "generation": 5}
+
+Al reanudar desde un checkpoint, las evaluaciones escritas después de su
+marca se reutilizan (una vez cada una) para los genomas con el mismo hash en
+lugar de volver a simularlos. Como el checkpoint restaura también el estado de
+`random`, la evolución reanudada repite exactamente los mismos genomas hasta
+llegar al punto del corte. Las evaluaciones que fallaron no se reutilizan.
+
+Uso desde neat_train.py:
+    python robobo_cli.py evolve --resume neat_logs_2.1/<fecha>/models/neat-checkpoint-5
+"""
+import hashlib
+import inspect
+import json
+import os
+from collections import defaultdict, deque
+
+import neat
+from neat.reporting import BaseReporter
+
+
+def genome_hash(genome):
+    """Hash de la estructura y los parámetros de un genoma (no depende de su id)."""
+    h = hashlib.sha1()
+    for genes in (genome.nodes, genome.connections):
+        for key in sorted(genes):
+            gene = genes[key]
+            values = [getattr(gene, a.name) for a in gene._gene_attributes]
+            h.update(repr((key, values)).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class EvaluationJournal(BaseReporter):
+    """
+    Args:
+        path: Fichero del diario (JSON lines, solo se añade)
+        resume_from: Checkpoint desde el que se reanuda; se reutilizan las
+            evaluaciones escritas después de su marca
+    """
+
+    def __init__(self, path, resume_from=None):
+        self.path = path
+        self.generation = None
+        self.replayable = defaultdict(deque)   # hash -> fitness pendientes de reutilizar
+        self.replayed = 0
+        self.recorded = 0
+        if resume_from is not None:
+            self._load_replay(os.path.basename(resume_from))
+
+        # Si el último registro quedó a medias, la siguiente línea empieza limpia
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a")
+        if needs_newline:
+            self._file.write("\n")
+
+    @staticmethod
+    def read(path):
+        """Entradas del diario (se ignoran las líneas incompletas)."""
+        entries = []
+        if not os.path.exists(path):
+            return entries
+        with open(path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def _load_replay(self, checkpoint_name):
+        entries = self.read(self.path)
+        marks = [i for i, e in enumerate(entries)
+                 if e.get("event") == "checkpoint" and e.get("file") == checkpoint_name]
+        if not marks:
+            print(f"⚠️ {checkpoint_name} no aparece en el diario {self.path}: se evalúa todo de nuevo")
+            return
+        for entry in entries[marks[-1] + 1:]:
+            if "hash" in entry and not entry.get("error"):
+                self.replayable[entry["hash"]].append(entry["fitness"])
+        n = sum(len(q) for q in self.replayable.values())
+        print(f"📓 Diario: {n} evaluaciones reutilizables desde {checkpoint_name}")
+
+    def __getstate__(self):
+        # El species set guarda los reporters y se serializa en cada checkpoint
+        state = self.__dict__.copy()
+        state["_file"] = None
+        state["replayable"] = defaultdict(deque)
+        return state
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # --- Reporter ---
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def checkpoint_saved(self, filename, generation):
+        self._write({"event": "checkpoint", "file": os.path.basename(filename), "generation": generation})
+
+    # --- Evaluaciones ---
+
+    def replay(self, genome):
+        """Si el genoma ya se evaluó tras el checkpoint, le asigna ese fitness y devuelve True."""
+        if not self.replayable:
+            return False
+        pending = self.replayable.get(genome_hash(genome))
+        if not pending:
+            return False
+        genome.fitness = pending.popleft()
+        self.replayed += 1
+        return True
+
+    def record(self, genome, **stats):
+        """Añade la evaluación de un genoma (con su fitness ya asignado)."""
+        entry = {"generation": self.generation, "key": genome.key, "hash": genome_hash(genome),
+                 "fitness": genome.fitness}
+        entry.update(stats)
+        self._write(entry)
+        self.recorded += 1
+
+    def wrap(self, eval_function):
+        """
+        Envuelve una función de evaluación por lotes (p. ej. la distribuida):
+        solo recibe los genomas que no están en el diario. Si la función
+        acepta on_result, cada genoma se anota en cuanto llega su resultado;
+        si no, al terminar el lote.
+        """
+        per_genome = "on_result" in inspect.signature(eval_function).parameters
+
+        def eval_genomes(genomes, config):
+            pending = [(gid, g) for gid, g in genomes if not self.replay(g)]
+            if not pending:
+                return
+            recorded = set()
+
+            def on_result(genome):
+                self.record(genome)
+                recorded.add(genome.key)
+
+            if per_genome:
+                eval_function(pending, config, on_result=on_result)
+            else:
+                eval_function(pending, config)
+            for _, genome in pending:
+                if genome.key not in recorded:
+                    self.record(genome)
+
+        eval_genomes.__name__ = getattr(eval_function, "__name__", "eval_genomes")
+        return eval_genomes
+
+    def close(self):
+        self._file.close()
+
+
+class JournalCheckpointer(neat.Checkpointer):
+    """neat.Checkpointer que deja una marca en el diario tras guardar cada checkpoint."""
+
+    def __init__(self, journal, generation_interval=100, time_interval_seconds=300,
+                 filename_prefix='neat-checkpoint-'):
+        super().__init__(generation_interval, time_interval_seconds, filename_prefix)
+        self.journal = journal
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        super().save_checkpoint(config, population, species_set, generation)
+        self.journal.checkpoint_saved(f"{self.filename_prefix}{generation}", generation)
@@ -0,0 +1,409 @@
+"""
+Especiación de NEAT con caché de distancias genómicas.
+
+DefaultSpeciesSet.speciate recalcula cada generación las distancias entre
+representantes y genomas con dos bucles de Python sobre los genes. Aquí:
+
+- Cada genoma se convierte una vez a arrays (columnas de genes, bias,
+  response, peso, enabled...) y se reutiliza mientras siga en la población;
+  los genomas que no cambian de una generación a otra (élites,
+  representantes) no se vuelven a convertir.
+- Las distancias representante-genoma se guardan por id de genoma y solo se
+  invalidan las de genomas nuevos o modificados.
+- Las que faltan se calculan en bloque con numpy: un representante contra
+  todos los genomas pendientes de una vez, mirando solo las columnas de sus
+  genes.
+
+El reparto en especies es el mismo que el de DefaultSpeciesSet (mismo orden
+de recorrido y mismos desempates), así que una evolución con la misma
+semilla produce las mismas especies.
+
+Se asume, como en neat.DefaultReproduction, que un genoma no se modifica
+después de entrar en la población: los hijos mutan antes de recibir su id.
+Si se muta un genoma existente hay que llamar a invalidate(id).
+
+Uso en un entrenamiento:
+    config = neat.Config(..., neat.DefaultSpeciesSet, ..., config_file)
+    use_cached_speciation(config)
+    p = neat.Population(config)
+
+Benchmark frente a la especiación estándar sobre XOR:
+    python especiacion.py [--config ../config-feedforward.txt] [--poblaciones 150 2000] [--generaciones 20]
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+import neat
+from neat.math_util import mean, stdev
+from neat.six_util import iterkeys
+from neat.species import Species
+
+class GeneBuffer:
+    """
+    Genes (nodos o conexiones) de todos los genomas vivos en arrays planos.
+
+    Cada entrada tiene la clave seq * 2**32 + columna, donde seq es el número
+    de secuencia del genoma y columna el índice de la clave del gen. Los
+    genomas se añaden en orden de seq y sus genes ordenados por columna, así
+    que las claves quedan ordenadas y un gen de cualquier genoma se encuentra
+    con searchsorted. Los genomas que salen dejan huecos que se compactan
+    cuando ocupan más que los vivos.
+    """
+
+    SHIFT = np.int64(2 ** 32)
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = {name: np.zeros(0, dtype=dtype) for name, dtype in fields.items()}
+        self.dead = 0
+
+    def append(self, seqs, cols, values):
+        """Añade genes de genomas nuevos (seqs mayores que todos los existentes)."""
+        keys = np.asarray(seqs, dtype=np.int64) * self.SHIFT + np.asarray(cols, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.keys = np.concatenate([self.keys, keys[order]])
+        for name, dtype in self.fields.items():
+            self.values[name] = np.concatenate([self.values[name], np.asarray(values[name], dtype=dtype)[order]])
+
+    def compact(self, live_seqs, n_removed):
+        self.dead += n_removed
+        if self.dead <= len(self.keys) - self.dead:
+            return
+        keep = np.isin(self.keys // self.SHIFT, live_seqs)
+        self.keys = self.keys[keep]
+        for name in self.fields:
+            self.values[name] = self.values[name][keep]
+        self.dead = 0
+
+    def genome(self, seq):
+        """Columnas y valores de los genes de un genoma."""
+        lo, hi = np.searchsorted(self.keys, [seq * self.SHIFT, (seq + 1) * self.SHIFT])
+        return self.keys[lo:hi] - seq * self.SHIFT, {name: v[lo:hi] for name, v in self.values.items()}
+
+    def lookup(self, seqs, cols):
+        """
+        Genes en la rejilla genomas x columnas.
+
+        Returns:
+            (máscara de presencia, {campo: valores}) de forma (len(seqs), len(cols))
+        """
+        query = seqs[:, None] * self.SHIFT + cols[None, :]
+        pos = np.minimum(np.searchsorted(self.keys, query), max(len(self.keys) - 1, 0))
+        if len(self.keys) == 0:
+            return np.zeros(query.shape, dtype=bool), {name: np.zeros(query.shape, dtype=dtype)
+                                                         for name, dtype in self.fields.items()}
+        return self.keys[pos] == query, {name: v[pos] for name, v in self.values.items()}
+
+
+class GenomeStore:
+    """
+    Genes de los genomas de la población en arrays, para calcular la distancia
+    de un genoma a muchos otros de una vez. Un genoma se convierte al entrar y
+    se conserva mientras sigue en la población.
+    """
+
+    def __init__(self):
+        self.node_columns = {}
+        self.conn_columns = {}
+        self.functions = {}
+        self.genomes = {}   # id -> (genoma, seq, nº nodos, nº conexiones)
+        self.next_seq = 0
+        self.nodes = GeneBuffer({"bias": np.float64, "response": np.float64,
+                                 "activation": np.int64, "aggregation": np.int64})
+        self.conns = GeneBuffer({"weight": np.float64, "enabled": bool})
+
+    def add(self, genomes):
+        """Convierte en bloque [(id, genoma), ...]."""
+        if not genomes:
+            return
+        # dict.setdefault(clave, len(dict)): columna existente o la siguiente libre
+        nc, cc, fn = self.node_columns, self.conn_columns, self.functions
+        seqs = []
+        for key, genome in genomes:
+            self.genomes[key] = (genome, self.next_seq, len(genome.nodes), len(genome.connections))
+            seqs.append(self.next_seq)
+            self.next_seq += 1
+
+        nodes = [(seq, nc.setdefault(k, len(nc)), n.bias, n.response,
+                  fn.setdefault(n.activation, len(fn)), fn.setdefault(n.aggregation, len(fn)))
+                 for (_, genome), seq in zip(genomes, seqs) for k, n in genome.nodes.items()]
+        if nodes:
+            s, c, bias, response, activation, aggregation = zip(*nodes)
+            self.nodes.append(s, c, {"bias": bias, "response": response,
+                                     "activation": activation, "aggregation": aggregation})
+        conns = [(seq, cc.setdefault(k, len(cc)), c.weight, c.enabled)
+                 for (_, genome), seq in zip(genomes, seqs) for k, c in genome.connections.items()]
+        if conns:
+            s, c, weight, enabled = zip(*conns)
+            self.conns.append(s, c, {"weight": weight, "enabled": enabled})
+
+    def discard(self, keys):
+        """Descarta genomas; sus genes se borran al compactar."""
+        n_nodes = n_conns = 0
+        for k in keys:
+            entry = self.genomes.pop(k, None)
+            if entry is not None:
+                n_nodes += entry[2]
+                n_conns += entry[3]
+        if n_nodes or n_conns:
+            live = np.fromiter((entry[1] for entry in self.genomes.values()), np.int64, len(self.genomes))
+            self.nodes.compact(live, n_nodes)
+            self.conns.compact(live, n_conns)
+
+    def _component(self, buffer, ref_seq, seqs, n_ref, n_targets, numeric, flags,
+                   disjoint_coef, weight_coef):
+        """(suma de diferencias homólogas + coef * disjuntos) / max(nº genes), o 0 sin genes."""
+        cols, ref = buffer.genome(ref_seq)
+        homologous, values = buffer.lookup(seqs, cols)
+        diff = np.zeros(homologous.shape)
+        for name in numeric:
+            diff += np.abs(values[name] - ref[name])
+        for name in flags:
+            diff += values[name] != ref[name]
+        disjoint = n_targets + n_ref - 2 * homologous.sum(axis=1)
+        size = np.maximum(n_targets, n_ref)
+        total = np.where(homologous, diff * weight_coef, 0.0).sum(axis=1) + disjoint_coef * disjoint
+        return np.divide(total, size, out=np.zeros(len(size)), where=size > 0)
+
+    def distances(self, ref_key, target_keys, genome_config):
+        """Distancia genómica (la de DefaultGenome.distance) de ref_key a cada genoma de target_keys."""
+        _, ref_seq, ref_nodes, ref_conns = self.genomes[ref_key]
+        info = [self.genomes[k] for k in target_keys]
+        seqs = np.fromiter((e[1] for e in info), np.int64, len(info))
+        n_nodes = np.fromiter((e[2] for e in info), np.int64, len(info))
+        n_conns = np.fromiter((e[3] for e in info), np.int64, len(info))
+        coefs = (genome_config.compatibility_disjoint_coefficient,
+                 genome_config.compatibility_weight_coefficient)
+        return (self._component(self.nodes, ref_seq, seqs, ref_nodes, n_nodes,
+                                ("bias", "response"), ("activation", "aggregation"), *coefs)
+                + self._component(self.conns, ref_seq, seqs, ref_conns, n_conns,
+                                  ("weight",), ("enabled",), *coefs))
+
+
+class CachedSpeciesSet(neat.DefaultSpeciesSet):
+    """DefaultSpeciesSet con genes en arrays y caché de distancias entre generaciones."""
+
+    def __init__(self, config, reporters):
+        super().__init__(config, reporters)
+        self._reset_cache()
+
+    def _reset_cache(self):
+        self.store = GenomeStore()
+        self.distances = {}   # id representante -> {id genoma: distancia}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Los checkpoints no guardan la caché: se reconstruye al reanudar
+        state = self.__dict__.copy()
+        for name in ("store", "distances", "hits", "misses"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_cache()
+
+    def invalidate(self, genome_id):
+        """Olvida la fila y las distancias de un genoma modificado en sitio."""
+        self.store.discard([genome_id])
+        self.distances.pop(genome_id, None)
+        for cached in self.distances.values():
+            cached.pop(genome_id, None)
+
+    def _sync(self, genomes):
+        """Escribe en el almacén los genomas nuevos o sustituidos por otro objeto con el mismo id."""
+        new = []
+        for key, genome in genomes.items():
+            entry = self.store.genomes.get(key)
+            if entry is None or entry[0] is not genome:
+                if entry is not None:
+                    self.invalidate(key)
+                new.append((key, genome))
+        self.store.add(new)
+
+    def _distances_from(self, rep_key, target_keys, genome_config, used):
+        """Distancias de un representante a target_keys, calculando solo las que no están en caché."""
+        cached = self.distances.setdefault(rep_key, {})
+        missing = [k for k in target_keys if k not in cached] if cached else target_keys
+        if missing:
+            computed = self.store.distances(rep_key, missing, genome_config)
+            cached.update(zip(missing, computed.tolist()))
+            self.misses += len(missing)
+        self.hits += len(target_keys) - len(missing)
+        if missing and len(missing) == len(target_keys):
+            values = computed
+        else:
+            values = np.fromiter((cached[k] for k in target_keys), np.float64, len(target_keys))
+        used.append(values)
+        return values
+
+    def speciate(self, config, population, generation):
+        """Mismo reparto que DefaultSpeciesSet.speciate, con distancias en bloque y en caché."""
+        assert isinstance(population, dict)
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+        genome_config = config.genome_config
+
+        # Genomas implicados: la población y los representantes de la generación anterior
+        genomes = dict(population)
+        for s in self.species.values():
+            genomes.setdefault(s.representative.key, s.representative)
+        self._sync(genomes)
+        used = []
+
+        # Nuevo representante de cada especie: el genoma más cercano al anterior
+        # set(iterkeys(...)) y no set(population): la tabla hash, y con ella el
+        # orden de recorrido, depende de cómo se construye el conjunto
+        unspeciated = set(iterkeys(population))
+        new_representatives = {}
+        new_members = {}
+        for sid, s in self.species.items():
+            order = list(unspeciated)
+            d = self._distances_from(s.representative.key, order, genome_config, used)
+            new_rid = order[int(np.argmin(d))]
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated.remove(new_rid)
+
+        # Reparto: cada genoma (en el orden de set.pop) va a la especie con el
+        # representante más cercano si está por debajo del umbral, o funda una
+        # nueva. Con "<" estricto se conserva el primer mínimo, como min() en
+        # DefaultSpeciesSet.
+        order = list(unspeciated)
+        n = len(order)
+        sids = list(new_representatives)
+        best_d = np.full(n, np.inf)
+        best_j = np.zeros(n, dtype=np.int64)
+        for j, sid in enumerate(sids):
+            d = self._distances_from(new_representatives[sid], order, genome_config, used)
+            better = d < best_d
+            best_d[better] = d[better]
+            best_j[better] = j
+        best_d, best_j = best_d.tolist(), best_j.tolist()
+
+        # Lo mismo para las especies que se crean durante el reparto
+        created = []
+        created_d = np.full(n, np.inf)
+        created_j = np.zeros(n, dtype=np.int64)
+        for i, gid in enumerate(order):
+            d_new = created_d[i]
+            if best_d[i] <= d_new:
+                d, sid = best_d[i], sids[best_j[i]] if sids else None
+            else:
+                d, sid = d_new, created[created_j[i]]
+            if d < compatibility_threshold:
+                new_members[sid].append(gid)
+                continue
+
+            # Ninguna especie es lo bastante parecida: especie nueva con este representante
+            sid = next(self.indexer)
+            new_representatives[sid] = gid
+            new_members[sid] = [gid]
+            if i + 1 < n:
+                d = self._distances_from(gid, order[i + 1:], genome_config, used)
+                tail_d = created_d[i + 1:]
+                better = d < tail_d
+                tail_d[better] = d[better]
+                created_j[i + 1:][better] = len(created)
+            created.append(sid)
+
+        # Actualizar las especies (igual que DefaultSpeciesSet)
+        self.genome_to_species = {}
+        for sid, rid in new_representatives.items():
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+            members = new_members[sid]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+            s.update(population[rid], {gid: population[gid] for gid in members})
+
+        # La caché solo conserva lo que puede volver a usarse: representantes
+        # actuales contra genomas que pueden sobrevivir a la siguiente generación
+        self.distances = {rid: {k: d for k, d in self.distances.get(rid, {}).items() if k in population}
+                          for rid in new_representatives.values()}
+        self.store.discard([k for k in self.store.genomes if k not in population])
+
+        all_distances = np.concatenate(used) if used else np.zeros(0)
+        self.reporters.info('Mean genetic distance {0:.3f}, standard deviation {1:.3f}'.format(
+            mean(all_distances), stdev(all_distances)))
+
+
+def use_cached_speciation(config):
+    """
+    Cambia la especiación de un neat.Config ya cargado por CachedSpeciesSet.
+
+    Usa los mismos parámetros que DefaultSpeciesSet, así que el fichero de
+    configuración no cambia.
+    """
+    config.species_set_type = CachedSpeciesSet
+    return config
+
+
+# --- Benchmark sobre XOR ---
+
+XOR_INPUTS = [(0.0, 0.0), (0.0, 1.0), (1.0, 0.0), (1.0, 1.0)]
+XOR_OUTPUTS = [0.0, 1.0, 1.0, 0.0]
+
+
+def _eval_xor(genomes, config):
+    for _, genome in genomes:
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        genome.fitness = 4.0 - sum((net.activate(x)[0] - y) ** 2 for x, y in zip(XOR_INPUTS, XOR_OUTPUTS))
+
+
+def _timed_run(config_file, species_set_type, pop_size, generations, seed):
+    """Evoluciona XOR midiendo el tiempo de speciate; devuelve (tiempos, particiones)."""
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, config_file)
+    config.pop_size = pop_size
+    config.no_fitness_termination = True
+
+    times = []
+    partitions = []
+    cache = {"hits": 0, "misses": 0}
+
+    class Timed(species_set_type):
+        def speciate(self, config, population, generation):
+            start = time.perf_counter()
+            super().speciate(config, population, generation)
+            times.append(time.perf_counter() - start)
+            partitions.append(sorted((sid, tuple(sorted(s.members))) for sid, s in self.species.items()))
+            cache["hits"] = getattr(self, "hits", 0)
+            cache["misses"] = getattr(self, "misses", 0)
+
+    config.species_set_type = Timed
+    random.seed(seed)
+    p = neat.Population(config)
+    p.run(_eval_xor, generations)
+    return times, partitions, cache
+
+
+def benchmark(config_file, pop_sizes, generations, seed=0):
+    print(f"{'población':>10}{'estándar (ms/gen)':>20}{'caché (ms/gen)':>17}{'aceleración':>13}"
+          f"{'aciertos caché':>16}{'mismas especies':>17}")
+    for pop_size in pop_sizes:
+        stock_times, stock_parts, _ = _timed_run(config_file, neat.DefaultSpeciesSet, pop_size, generations, seed)
+        cached_times, cached_parts, cache = _timed_run(config_file, CachedSpeciesSet, pop_size, generations, seed)
+        stock_ms = 1000 * np.mean(stock_times)
+        cached_ms = 1000 * np.mean(cached_times)
+        same = "sí" if stock_parts == cached_parts else "no"
+        hit_rate = 100 * cache["hits"] / max(cache["hits"] + cache["misses"], 1)
+        print(f"{pop_size:>10}{stock_ms:>20.2f}{cached_ms:>17.2f}{stock_ms / cached_ms:>12.1f}x"
+              f"{hit_rate:>15.1f}%{same:>17}")
+
+
+if __name__ == "__main__":
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark de especiación con caché sobre XOR")
+    parser.add_argument("--config", default=os.path.join(local_dir, "..", "config-feedforward.txt"))
+    parser.add_argument("--poblaciones", type=int, nargs="+", default=[150, 500, 2000])
+    parser.add_argument("--generaciones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.config, args.poblaciones, args.generaciones, args.semilla)
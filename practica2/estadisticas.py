@@ -0,0 +1,226 @@
+"""
+Reporter de estadísticas compacto para NEAT.
+
+neat.StatisticsReporter guarda en memoria un genoma completo por generación
+(most_fit_genomes) y la lista de fitness de cada generación, y neat_train.py
+lo serializa entero en stats.pkl. Este reporter escribe por generación un
+resumen del fitness y los tamaños de especie en ficheros columnares de solo
+añadir, y mantiene en disco únicamente los k mejores genomas.
+
+Ofrece la misma interfaz que usan visualize.plot_stats/plot_species y
+neat_train.plot_stats (most_fit_genomes, get_fitness_mean,
+get_fitness_stdev, get_species_sizes).
+
+Estructura en disco:
+    <dir>/schema.json
+    <dir>/<columna>.bin           (una fila por generación)
+    <dir>/species_<columna>.bin   (una fila por especie y generación)
+    <dir>/top/genome_<id>.pkl     (los k mejores genomas)
+"""
+import json
+import os
+import pickle
+from collections import namedtuple
+
+import numpy as np
+from neat.reporting import BaseReporter
+
+GENERATION_COLUMNS = {
+    "generation": "<i4",
+    "best_fitness": "<f8",
+    "best_key": "<i8",
+    "mean": "<f8",
+    "stdev": "<f8",
+    "median": "<f8",
+    "min": "<f8",
+    "max": "<f8",
+    "n_genomes": "<i4",
+    "n_species": "<i4",
+}
+
+SPECIES_COLUMNS = {
+    "generation": "<i4",
+    "species_id": "<i4",
+    "size": "<i4",
+    "fitness": "<f8",
+}
+
+# Sustituto ligero de un genoma en most_fit_genomes: solo lo que se dibuja
+FitnessRecord = namedtuple("FitnessRecord", ["key", "fitness"])
+
+
+class StreamingStatisticsReporter(BaseReporter):
+    """
+    Args:
+        directory: Carpeta donde se escriben las columnas
+        top_k: Número de genomas que se conservan en disco
+    """
+
+    def __init__(self, directory, top_k=5):
+        # Ruta absoluta: stats.pkl guarda solo las rutas y se abre desde otras carpetas
+        self.directory = os.path.abspath(directory)
+        self.top_k = top_k
+        self.generation = None
+        self.top = []   # [(fitness, key, ruta)] ordenado de mejor a peor
+        os.makedirs(os.path.join(directory, "top"), exist_ok=True)
+        self._load_top()
+
+        schema_path = os.path.join(directory, "schema.json")
+        if not os.path.exists(schema_path):
+            with open(schema_path, "w") as f:
+                json.dump({"generation": GENERATION_COLUMNS, "species": SPECIES_COLUMNS}, f, indent=2)
+
+    def _load_top(self):
+        """Recupera el top-k de una ejecución anterior en la misma carpeta (al reanudar)."""
+        top_dir = os.path.join(self.directory, "top")
+        for name in os.listdir(top_dir):
+            path = os.path.join(top_dir, name)
+            with open(path, "rb") as f:
+                genome = pickle.load(f)
+            self.top.append((genome.fitness, genome.key, path))
+        self.top.sort(key=lambda t: t[0], reverse=True)
+        for _, _, evicted in self.top[self.top_k:]:
+            os.remove(evicted)
+        del self.top[self.top_k:]
+
+    def truncate(self, generation):
+        """
+        Descarta las filas de la generación `generation` en adelante. Al
+        reanudar desde un checkpoint esas generaciones se vuelven a ejecutar
+        y se escribirían repetidas.
+        """
+        for prefix, columns in (("", GENERATION_COLUMNS), ("species_", SPECIES_COLUMNS)):
+            # Copia en memoria: en Windows no se puede truncar un fichero que sigue mapeado
+            mapped = self.column("generation") if not prefix else self.species_column("generation")
+            gens = np.array(mapped)
+            del mapped
+            later = np.flatnonzero(gens >= generation)
+            n_rows = int(later[0]) if len(later) else len(gens)
+            for name, dtype in columns.items():
+                path = os.path.join(self.directory, f"{prefix}{name}.bin")
+                if os.path.exists(path):
+                    with open(path, "r+b") as f:
+                        f.truncate(n_rows * np.dtype(dtype).itemsize)
+
+    # --- Escritura ---
+
+    def _append(self, prefix, columns, values):
+        for name, dtype in columns.items():
+            path = os.path.join(self.directory, f"{prefix}{name}.bin")
+            with open(path, "ab") as f:
+                np.asarray(values[name], dtype=dtype).tofile(f)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = np.array([g.fitness for g in population.values()], dtype=np.float64)
+        self._append("", GENERATION_COLUMNS, {
+            "generation": [self.generation],
+            "best_fitness": [best_genome.fitness],
+            "best_key": [best_genome.key],
+            "mean": [fitnesses.mean()],
+            "stdev": [fitnesses.std()],
+            "median": [np.median(fitnesses)],
+            "min": [fitnesses.min()],
+            "max": [fitnesses.max()],
+            "n_genomes": [len(fitnesses)],
+            "n_species": [len(species.species)],
+        })
+
+        sids = sorted(species.species)
+        self._append("species_", SPECIES_COLUMNS, {
+            "generation": [self.generation] * len(sids),
+            "species_id": sids,
+            "size": [len(species.species[sid].members) for sid in sids],
+            "fitness": [np.mean([m.fitness for m in species.species[sid].members.values()])
+                        for sid in sids],
+        })
+
+        self._update_top(population)
+
+    def _update_top(self, population):
+        """Guarda en disco los genomas que entran en el top-k y borra los que salen."""
+        known = {key for _, key, _ in self.top}
+        for genome in population.values():
+            if genome.key in known:
+                continue
+            if len(self.top) < self.top_k or genome.fitness > self.top[-1][0]:
+                path = os.path.join(self.directory, "top", f"genome_{genome.key}.pkl")
+                with open(path, "wb") as f:
+                    pickle.dump(genome, f)
+                self.top.append((genome.fitness, genome.key, path))
+                self.top.sort(key=lambda t: t[0], reverse=True)
+                known.add(genome.key)
+                if len(self.top) > self.top_k:
+                    _, _, evicted = self.top.pop()
+                    os.remove(evicted)
+
+    # --- Lectura (interfaz de StatisticsReporter) ---
+
+    def column(self, name):
+        """Columna por generación como array (memmap de solo lectura)."""
+        path = os.path.join(self.directory, f"{name}.bin")
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=GENERATION_COLUMNS[name])
+        return np.memmap(path, dtype=GENERATION_COLUMNS[name], mode="r")
+
+    def species_column(self, name):
+        path = os.path.join(self.directory, f"species_{name}.bin")
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=SPECIES_COLUMNS[name])
+        return np.memmap(path, dtype=SPECIES_COLUMNS[name], mode="r")
+
+    @property
+    def most_fit_genomes(self):
+        """Mejor fitness de cada generación (registros ligeros, no genomas)."""
+        return [FitnessRecord(int(k), float(f))
+                for k, f in zip(self.column("best_key"), self.column("best_fitness"))]
+
+    def get_fitness_mean(self):
+        return list(self.column("mean"))
+
+    def get_fitness_stdev(self):
+        return list(self.column("stdev"))
+
+    def get_fitness_median(self):
+        return list(self.column("median"))
+
+    def get_species_sizes(self):
+        """Lista por generación con el tamaño de cada especie (0 si no existe)."""
+        gens = np.asarray(self.species_column("generation"))
+        sids = np.asarray(self.species_column("species_id"))
+        sizes = np.asarray(self.species_column("size"))
+        n_gens = len(self.column("generation"))
+        if n_gens == 0:
+            return []
+        first_gen = int(self.column("generation")[0])
+        table = np.zeros((n_gens, int(sids.max()) if len(sids) else 0), dtype=int)
+        table[gens - first_gen, sids - 1] = sizes
+        return table.tolist()
+
+    def get_species_fitness(self, null_value=''):
+        gens = np.asarray(self.species_column("generation"))
+        sids = np.asarray(self.species_column("species_id"))
+        fitness = np.asarray(self.species_column("fitness"))
+        n_gens = len(self.column("generation"))
+        if n_gens == 0:
+            return []
+        first_gen = int(self.column("generation")[0])
+        n_species = int(sids.max()) if len(sids) else 0
+        table = [[null_value] * n_species for _ in range(n_gens)]
+        for g, s, f in zip(gens, sids, fitness):
+            table[g - first_gen][s - 1] = float(f)
+        return table
+
+    def best_genomes(self, n):
+        """Los n mejores genomas guardados en disco."""
+        genomes = []
+        for _, _, path in self.top[:n]:
+            with open(path, "rb") as f:
+                genomes.append(pickle.load(f))
+        return genomes
+
+    def best_genome(self):
+        best = self.best_genomes(1)
+        return best[0] if best else None
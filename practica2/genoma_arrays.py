@@ -0,0 +1,588 @@
+"""
+Genomas NEAT como estructura de arrays.
+
+neat.DefaultGenome guarda un objeto de Python por gen y DefaultReproduction
+cruza y muta gen a gen, así que el coste de cada generación crece con el
+trabajo de Python por conexión. Aquí una generación entera de genomas se
+guarda en columnas de numpy (formato CSR: genes ordenados por genoma):
+
+    nodos:      owner, key, bias, response, activation, aggregation
+    conexiones: owner, in, out, weight, enabled
+
+La clave (in, out) de una conexión es su número de innovación, como en
+neat-python. El cruce alinea los genes de los dos padres por innovación con
+searchsorted y la mutación de pesos, bias, response, enabled y funciones se
+hace con una sola llamada vectorizada para toda la generación. Las
+mutaciones estructurales (añadir/quitar nodo o conexión) se aplican en bloque
+salvo añadir conexión, que necesita comprobar ciclos genoma a genoma.
+
+Se admiten los genes por defecto (DefaultNodeGene y DefaultConnectionGene) y
+se convierte de/a neat.DefaultGenome, así que las configuraciones, la
+evaluación y los checkpoints no cambian. ArrayReproduction sustituye a
+DefaultReproduction usando este formato para crear los hijos:
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, ...)
+    use_array_reproduction(config)
+    p = neat.Population(config)
+
+Benchmark de reproducción sobre XOR:
+    python genoma_arrays.py [--poblaciones 150 2000 10000] [--generaciones 5]
+"""
+import argparse
+import math
+import os
+import random
+import time
+from itertools import count
+
+import numpy as np
+import neat
+from neat.graphs import creates_cycle
+from neat.math_util import mean
+from neat.six_util import iteritems, itervalues
+
+NODE_FIELDS = {"owner": np.int64, "key": np.int64, "bias": np.float64, "response": np.float64,
+               "activation": np.int64, "aggregation": np.int64}
+CONN_FIELDS = {"owner": np.int64, "in": np.int64, "out": np.int64, "weight": np.float64, "enabled": bool}
+
+
+def _ranges(starts, counts):
+    """Índices de varios tramos [start, start + count) concatenados."""
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - (np.cumsum(counts) - counts), counts)
+    return offsets + np.arange(total)
+
+
+def _pick_one(owners, n_owners, rng):
+    """Para cada dueño con alguna fila en `owners` (ordenado), la posición de una fila al azar."""
+    counts = np.bincount(owners, minlength=n_owners)
+    has = np.flatnonzero(counts)
+    starts = np.cumsum(counts) - counts
+    return has, starts[has] + (rng.random(len(has)) * counts[has]).astype(np.int64)
+
+
+class GenomeBatch:
+    """
+    Un conjunto de genomas en columnas.
+
+    Args:
+        keys: Id de cada genoma
+        fitness: Fitness de cada genoma (nan si no está evaluado)
+        nodes, conns: {campo: array} con los genes de todos los genomas
+        functions: Nombres de las funciones de activación/agregación (los
+            genes guardan su índice)
+    """
+
+    def __init__(self, keys, fitness, nodes, conns, functions):
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.fitness = np.asarray(fitness, dtype=np.float64)
+        self.functions = functions
+        self._codes = {name: i for i, name in enumerate(functions)}
+        self.nodes = {name: np.asarray(nodes[name], dtype=dtype) for name, dtype in NODE_FIELDS.items()}
+        self.conns = {name: np.asarray(conns[name], dtype=dtype) for name, dtype in CONN_FIELDS.items()}
+        self._sort()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _sort(self):
+        order = np.lexsort((self.nodes["key"], self.nodes["owner"]))
+        self.nodes = {name: v[order] for name, v in self.nodes.items()}
+        order = np.lexsort((self.conns["out"], self.conns["in"], self.conns["owner"]))
+        self.conns = {name: v[order] for name, v in self.conns.items()}
+        self.node_count = np.bincount(self.nodes["owner"], minlength=len(self))
+        self.node_start = np.cumsum(self.node_count) - self.node_count
+        self.conn_count = np.bincount(self.conns["owner"], minlength=len(self))
+        self.conn_start = np.cumsum(self.conn_count) - self.conn_count
+
+    def code(self, name):
+        """Índice de una función de activación/agregación (se añade si es nueva)."""
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.functions)
+            self.functions.append(name)
+        return code
+
+    # --- Conversión ---
+
+    @classmethod
+    def from_genomes(cls, genomes, functions=None):
+        """Convierte una lista de neat.DefaultGenome."""
+        functions = list(functions or [])
+        codes = {name: i for i, name in enumerate(functions)}
+        nodes = [(i, k, n.bias, n.response, codes.setdefault(n.activation, len(codes)),
+                  codes.setdefault(n.aggregation, len(codes)))
+                 for i, g in enumerate(genomes) for k, n in g.nodes.items()]
+        conns = [(i, k[0], k[1], c.weight, c.enabled)
+                 for i, g in enumerate(genomes) for k, c in g.connections.items()]
+        functions = sorted(codes, key=codes.get)
+        return cls([g.key for g in genomes],
+                   [np.nan if g.fitness is None else g.fitness for g in genomes],
+                   dict(zip(NODE_FIELDS, zip(*nodes))) if nodes else {f: [] for f in NODE_FIELDS},
+                   dict(zip(CONN_FIELDS, zip(*conns))) if conns else {f: [] for f in CONN_FIELDS},
+                   functions)
+
+    def to_genomes(self, genome_config, genome_type=neat.DefaultGenome):
+        """Crea los neat.DefaultGenome equivalentes (sin fitness)."""
+        node_gene = genome_config.node_gene_type
+        conn_gene = genome_config.connection_gene_type
+        functions = self.functions
+        n = self.nodes
+        node_rows = zip(n["key"].tolist(), n["bias"].tolist(), n["response"].tolist(),
+                        n["activation"].tolist(), n["aggregation"].tolist())
+        c = self.conns
+        conn_rows = zip(c["in"].tolist(), c["out"].tolist(), c["weight"].tolist(), c["enabled"].tolist())
+
+        genomes = []
+        for key, n_nodes, n_conns in zip(self.keys.tolist(), self.node_count.tolist(), self.conn_count.tolist()):
+            genome = genome_type(key)
+            for _ in range(n_nodes):
+                k, bias, response, activation, aggregation = next(node_rows)
+                gene = node_gene(k)
+                gene.bias = bias
+                gene.response = response
+                gene.activation = functions[activation]
+                gene.aggregation = functions[aggregation]
+                genome.nodes[k] = gene
+            for _ in range(n_conns):
+                i, o, weight, enabled = next(conn_rows)
+                gene = conn_gene((i, o))
+                gene.weight = weight
+                gene.enabled = enabled
+                genome.connections[(i, o)] = gene
+            genomes.append(genome)
+        return genomes
+
+    # --- Cruce ---
+
+    def crossover(self, parent1, parent2, child_keys, rng):
+        """
+        Cruza pares de genomas de este lote alineando los genes por innovación.
+
+        Igual que DefaultGenome.configure_crossover: el hijo hereda los genes del
+        padre con más fitness (el segundo si empatan); en los genes homólogos
+        cada atributo sale al azar de uno de los dos padres.
+
+        Args:
+            parent1, parent2: Índices (en este lote) de los padres de cada hijo
+            child_keys: Id de cada hijo
+
+        Returns:
+            GenomeBatch con los hijos
+        """
+        parent1 = np.asarray(parent1, dtype=np.int64)
+        parent2 = np.asarray(parent2, dtype=np.int64)
+        first = self.fitness[parent1] > self.fitness[parent2]
+        primary = np.where(first, parent1, parent2)
+        other = np.where(first, parent2, parent1)
+
+        nodes = self._inherit(self.nodes, ("key",), self.node_start, self.node_count,
+                              primary, other, ("bias", "response", "activation", "aggregation"), rng)
+        conns = self._inherit(self.conns, ("in", "out"), self.conn_start, self.conn_count,
+                              primary, other, ("weight", "enabled"), rng)
+        return GenomeBatch(child_keys, np.full(len(child_keys), np.nan), nodes, conns, list(self.functions))
+
+    def _inherit(self, table, key_fields, starts, counts, primary, other, attributes, rng):
+        # Índice denso de cada clave de gen, en el mismo orden que la tabla
+        if len(key_fields) == 1:
+            _, gene_id = np.unique(table[key_fields[0]], return_inverse=True)
+        else:
+            _, gene_id = np.unique(np.stack([table[f] for f in key_fields], axis=1), axis=0,
+                                   return_inverse=True)
+        gene_id = gene_id.reshape(-1)
+        n_ids = int(gene_id.max()) + 1 if len(gene_id) else 1
+        # Claves (dueño, gen) ordenadas: un gen de cualquier genoma se busca con searchsorted
+        composite = table["owner"] * n_ids + gene_id
+
+        idx = _ranges(starts[primary], counts[primary])
+        child = np.repeat(np.arange(len(primary)), counts[primary])
+        query = other[child] * n_ids + gene_id[idx]
+        pos = np.minimum(np.searchsorted(composite, query), max(len(composite) - 1, 0))
+        homologous = composite[pos] == query if len(composite) else np.zeros(len(idx), dtype=bool)
+
+        result = {name: table[name][idx] for name in key_fields}
+        result["owner"] = child
+        for name in attributes:
+            values = table[name][idx]
+            take_other = homologous & ~(rng.random(len(idx)) > 0.5)
+            values[take_other] = table[name][pos[take_other]]
+            result[name] = values
+        return result
+
+    # --- Mutación ---
+
+    def mutate(self, config, rng):
+        """Muta todos los genomas del lote como DefaultGenome.mutate (estructural y después atributos)."""
+        n = len(self)
+        probs = [config.node_add_prob, config.node_delete_prob, config.conn_add_prob, config.conn_delete_prob]
+        if config.single_structural_mutation:
+            div = max(1, sum(probs))
+            op = np.searchsorted(np.cumsum(probs) / div, rng.random(n), side="right")
+            plan = [op == i for i in range(4)]
+        else:
+            plan = [rng.random(n) < p for p in probs]
+
+        self._add_nodes(config, np.flatnonzero(plan[0]), rng)
+        self._delete_nodes(config, np.flatnonzero(plan[1]), rng)
+        self._add_connections(config, np.flatnonzero(plan[2]), rng)
+        self._delete_connections(np.flatnonzero(plan[3]), rng)
+
+        c = self.conns
+        c["weight"] = _mutate_float(c["weight"], config, "weight", rng)
+        c["enabled"] = _mutate_bool(c["enabled"], config, "enabled", rng)
+        nd = self.nodes
+        nd["bias"] = _mutate_float(nd["bias"], config, "bias", rng)
+        nd["response"] = _mutate_float(nd["response"], config, "response", rng)
+        nd["activation"] = self._mutate_function(nd["activation"], config, "activation", rng)
+        nd["aggregation"] = self._mutate_function(nd["aggregation"], config, "aggregation", rng)
+
+    def _append(self, nodes=None, conns=None):
+        for table, new in ((self.nodes, nodes), (self.conns, conns)):
+            if new:
+                for name in table:
+                    table[name] = np.concatenate([table[name], np.asarray(new[name], dtype=table[name].dtype)])
+        self._sort()
+
+    def _remove(self, node_mask=None, conn_mask=None):
+        if node_mask is not None:
+            self.nodes = {name: v[~node_mask] for name, v in self.nodes.items()}
+        if conn_mask is not None:
+            self.conns = {name: v[~conn_mask] for name, v in self.conns.items()}
+        self._sort()
+
+    def _new_nodes(self, config, owners, rng):
+        """Genes de nodo nuevos (ids de config.node_indexer y atributos iniciales)."""
+        if config.node_indexer is None:
+            start = int(self.nodes["key"].max()) + 1 if len(self.nodes["key"]) else 0
+            config.node_indexer = count(start)
+        k = len(owners)
+        return {
+            "owner": owners,
+            "key": [next(config.node_indexer) for _ in range(k)],
+            "bias": _init_float(config, "bias", k, rng),
+            "response": _init_float(config, "response", k, rng),
+            "activation": self._init_function(config, "activation", k, rng),
+            "aggregation": self._init_function(config, "aggregation", k, rng),
+        }
+
+    def _add_nodes(self, config, genomes, rng):
+        """Divide una conexión al azar con un nodo nuevo (mutate_add_node)."""
+        if not len(genomes):
+            return
+        has_conns = self.conn_count[genomes] > 0
+        empty = genomes[~has_conns]
+        genomes = genomes[has_conns]
+        if len(genomes):
+            split = self.conn_start[genomes] + (rng.random(len(genomes)) * self.conn_count[genomes]).astype(np.int64)
+            c = self.conns
+            c["enabled"][split] = False
+            new_nodes = self._new_nodes(config, genomes, rng)
+            new_keys = np.asarray(new_nodes["key"], dtype=np.int64)
+            k = len(genomes)
+            new_conns = {
+                "owner": np.concatenate([genomes, genomes]),
+                "in": np.concatenate([c["in"][split], new_keys]),
+                "out": np.concatenate([new_keys, c["out"][split]]),
+                "weight": np.concatenate([np.ones(k), c["weight"][split]]),
+                "enabled": np.ones(2 * k, dtype=bool),
+            }
+            self._append(new_nodes, new_conns)
+        if len(empty) and config.check_structural_mutation_surer():
+            self._add_connections(config, empty, rng)
+
+    def _delete_nodes(self, config, genomes, rng):
+        """Borra un nodo oculto al azar y sus conexiones (mutate_delete_node)."""
+        if not len(genomes):
+            return
+        selected = np.zeros(len(self), dtype=bool)
+        selected[genomes] = True
+        nd = self.nodes
+        candidates = np.flatnonzero(selected[nd["owner"]] & ~np.isin(nd["key"], config.output_keys))
+        if not len(candidates):
+            return
+        owners, picks = _pick_one(nd["owner"][candidates], len(self), rng)
+        deleted = candidates[picks]
+        # Clave borrada por genoma; los genomas sin borrado usan un valor que no es clave de ningún nodo
+        removed_key = np.full(len(self), np.iinfo(np.int64).min)
+        removed_key[owners] = nd["key"][deleted]
+        node_mask = np.zeros(len(nd["key"]), dtype=bool)
+        node_mask[deleted] = True
+        c = self.conns
+        target = removed_key[c["owner"]]
+        self._remove(node_mask, (c["in"] == target) | (c["out"] == target))
+
+    def _add_connections(self, config, genomes, rng):
+        """Conexión nueva entre dos nodos al azar (mutate_add_connection)."""
+        if not len(genomes):
+            return
+        nd, c = self.nodes, self.conns
+        outputs = set(config.output_keys)
+        new = {name: [] for name in CONN_FIELDS}
+        for g in genomes.tolist():
+            node_keys = nd["key"][self.node_start[g]:self.node_start[g] + self.node_count[g]].tolist()
+            lo, hi = self.conn_start[g], self.conn_start[g] + self.conn_count[g]
+            conn_keys = list(zip(c["in"][lo:hi].tolist(), c["out"][lo:hi].tolist()))
+            out_node = node_keys[int(rng.integers(len(node_keys)))]
+            inputs = node_keys + config.input_keys
+            in_node = inputs[int(rng.integers(len(inputs)))]
+            key = (in_node, out_node)
+            if key in conn_keys:
+                if config.check_structural_mutation_surer():
+                    c["enabled"][lo + conn_keys.index(key)] = True
+                continue
+            if in_node in outputs and out_node in outputs:
+                continue
+            if config.feed_forward and creates_cycle(conn_keys, key):
+                continue
+            new["owner"].append(g)
+            new["in"].append(in_node)
+            new["out"].append(out_node)
+        k = len(new["owner"])
+        if k:
+            new["weight"] = _init_float(config, "weight", k, rng)
+            new["enabled"] = _init_bool(config, "enabled", k, rng)
+            self._append(conns=new)
+
+    def _delete_connections(self, genomes, rng):
+        """Borra una conexión al azar (mutate_delete_connection)."""
+        genomes = genomes[self.conn_count[genomes] > 0]
+        if not len(genomes):
+            return
+        picks = self.conn_start[genomes] + (rng.random(len(genomes)) * self.conn_count[genomes]).astype(np.int64)
+        mask = np.zeros(len(self.conns["owner"]), dtype=bool)
+        mask[picks] = True
+        self._remove(conn_mask=mask)
+
+    def _init_function(self, config, name, k, rng):
+        default = getattr(config, f"{name}_default")
+        if default.lower() in ("none", "random"):
+            options = getattr(config, f"{name}_options")
+            return np.array([self.code(options[i]) for i in rng.integers(len(options), size=k)], dtype=np.int64)
+        return np.full(k, self.code(default), dtype=np.int64)
+
+    def _mutate_function(self, codes, config, name, rng):
+        rate = getattr(config, f"{name}_mutate_rate")
+        if rate <= 0 or not len(codes):
+            return codes
+        options = np.array([self.code(o) for o in getattr(config, f"{name}_options")], dtype=np.int64)
+        mask = rng.random(len(codes)) < rate
+        codes = codes.copy()
+        codes[mask] = options[rng.integers(len(options), size=int(mask.sum()))]
+        return codes
+
+
+def _init_float(config, name, k, rng):
+    """FloatAttribute.init_value para k genes."""
+    mean_ = getattr(config, f"{name}_init_mean")
+    stdev = getattr(config, f"{name}_init_stdev")
+    lo = getattr(config, f"{name}_min_value")
+    hi = getattr(config, f"{name}_max_value")
+    init_type = getattr(config, f"{name}_init_type").lower()
+    if "gauss" in init_type or "normal" in init_type:
+        return np.clip(rng.normal(mean_, stdev, k), lo, hi)
+    if "uniform" in init_type:
+        return rng.uniform(max(lo, mean_ - 2 * stdev), min(hi, mean_ + 2 * stdev), k)
+    raise RuntimeError(f"Unknown init_type {init_type!r} for {name}_init_type")
+
+
+def _init_bool(config, name, k, rng):
+    """BoolAttribute.init_value para k genes."""
+    default = str(getattr(config, f"{name}_default")).lower()
+    if default in ("1", "on", "yes", "true"):
+        return np.ones(k, dtype=bool)
+    if default in ("0", "off", "no", "false"):
+        return np.zeros(k, dtype=bool)
+    return rng.random(k) < 0.5
+
+
+def _mutate_float(values, config, name, rng):
+    """FloatAttribute.mutate_value vectorizado: perturbación gaussiana o reemplazo."""
+    rate = getattr(config, f"{name}_mutate_rate")
+    replace_rate = getattr(config, f"{name}_replace_rate")
+    r = rng.random(len(values))
+    mutate = r < rate
+    replace = ~mutate & (r < replace_rate + rate)
+    values = values.copy()
+    values[mutate] = np.clip(values[mutate] + rng.normal(0.0, getattr(config, f"{name}_mutate_power"),
+                                                         int(mutate.sum())),
+                             getattr(config, f"{name}_min_value"), getattr(config, f"{name}_max_value"))
+    values[replace] = _init_float(config, name, int(replace.sum()), rng)
+    return values
+
+
+def _mutate_bool(values, config, name, rng):
+    """BoolAttribute.mutate_value vectorizado."""
+    rate = getattr(config, f"{name}_mutate_rate") + np.where(
+        values, getattr(config, f"{name}_rate_to_false_add"), getattr(config, f"{name}_rate_to_true_add"))
+    mask = rng.random(len(values)) < rate
+    values = values.copy()
+    values[mask] = rng.random(int(mask.sum())) < 0.5
+    return values
+
+
+class ArrayReproduction(neat.DefaultReproduction):
+    """
+    DefaultReproduction que crea todos los hijos de una generación en bloque
+    con GenomeBatch. La selección (estancamiento, fitness ajustado, élites y
+    elección de padres) es la de DefaultReproduction.
+    """
+
+    def __init__(self, config, reporters, stagnation):
+        super().__init__(config, reporters, stagnation)
+        self.functions = []
+
+    def reproduce(self, config, species, pop_size, generation):
+        all_fitnesses = []
+        remaining_species = []
+        for stag_sid, stag_s, stagnant in self.stagnation.update(species, generation):
+            if stagnant:
+                self.reporters.species_stagnant(stag_sid, stag_s)
+            else:
+                all_fitnesses.extend(m.fitness for m in itervalues(stag_s.members))
+                remaining_species.append(stag_s)
+
+        if not remaining_species:
+            species.species = {}
+            return {}
+
+        min_fitness = min(all_fitnesses)
+        max_fitness = max(all_fitnesses)
+        fitness_range = max(1.0, max_fitness - min_fitness)
+        for afs in remaining_species:
+            msf = mean([m.fitness for m in itervalues(afs.members)])
+            afs.adjusted_fitness = (msf - min_fitness) / fitness_range
+
+        adjusted_fitnesses = [s.adjusted_fitness for s in remaining_species]
+        self.reporters.info("Average adjusted fitness: {:.3f}".format(mean(adjusted_fitnesses)))
+
+        previous_sizes = [len(s.members) for s in remaining_species]
+        min_species_size = max(self.reproduction_config.min_species_size, self.reproduction_config.elitism)
+        spawn_amounts = self.compute_spawn(adjusted_fitnesses, previous_sizes, pop_size, min_species_size)
+
+        new_population = {}
+        species.species = {}
+        parents = {}        # id -> genoma padre
+        children = []       # (id hijo, id padre 1, id padre 2)
+        for spawn, s in zip(spawn_amounts, remaining_species):
+            spawn = max(spawn, self.reproduction_config.elitism)
+            old_members = list(iteritems(s.members))
+            s.members = {}
+            species.species[s.key] = s
+            old_members.sort(reverse=True, key=lambda x: x[1].fitness)
+
+            if self.reproduction_config.elitism > 0:
+                for i, m in old_members[:self.reproduction_config.elitism]:
+                    new_population[i] = m
+                    spawn -= 1
+            if spawn <= 0:
+                continue
+
+            repro_cutoff = int(math.ceil(self.reproduction_config.survival_threshold * len(old_members)))
+            old_members = old_members[:max(repro_cutoff, 2)]
+            while spawn > 0:
+                spawn -= 1
+                parent1_id, parent1 = random.choice(old_members)
+                parent2_id, parent2 = random.choice(old_members)
+                parents[parent1_id] = parent1
+                parents[parent2_id] = parent2
+                gid = next(self.genome_indexer)
+                children.append((gid, parent1_id, parent2_id))
+                self.ancestors[gid] = (parent1_id, parent2_id)
+
+        if children:
+            for genome in self.create_children(config.genome_config, parents, children):
+                new_population[genome.key] = genome
+        return new_population
+
+    def create_children(self, genome_config, parents, children):
+        """Cruza y muta todos los hijos en bloque; devuelve neat.DefaultGenome."""
+        parent_ids = list(parents)
+        batch = GenomeBatch.from_genomes([parents[k] for k in parent_ids], self.functions)
+        position = {k: i for i, k in enumerate(parent_ids)}
+        keys, p1, p2 = zip(*children)
+        # Generador nuevo en cada generación con semilla de `random`: random.seed() hace
+        # reproducible la evolución y, como el estado de `random` va en los checkpoints,
+        # una ejecución reanudada genera los mismos hijos que la original
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        offspring = batch.crossover([position[k] for k in p1], [position[k] for k in p2], keys, self.rng)
+        offspring.mutate(genome_config, self.rng)
+        self.functions = offspring.functions
+        return offspring.to_genomes(genome_config, genome_config_type(genome_config))
+
+
+def genome_config_type(genome_config):
+    """Tipo de genoma que corresponde a una configuración (DefaultGenome salvo subclases)."""
+    return getattr(genome_config, "genome_type", neat.DefaultGenome)
+
+
+def use_array_reproduction(config):
+    """
+    Cambia la reproducción de un neat.Config ya cargado por ArrayReproduction.
+
+    Usa los mismos parámetros que DefaultReproduction, así que el fichero de
+    configuración no cambia.
+    """
+    config.reproduction_type = ArrayReproduction
+    config.genome_config.genome_type = config.genome_type
+    return config
+
+
+# --- Benchmark sobre XOR ---
+
+XOR_INPUTS = [(0.0, 0.0), (0.0, 1.0), (1.0, 0.0), (1.0, 1.0)]
+XOR_OUTPUTS = [0.0, 1.0, 1.0, 0.0]
+
+
+def _eval_xor(genomes, config):
+    for _, genome in genomes:
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        genome.fitness = 4.0 - sum((net.activate(x)[0] - y) ** 2 for x, y in zip(XOR_INPUTS, XOR_OUTPUTS))
+
+
+def _timed_run(config_file, reproduction_type, pop_size, generations, seed):
+    """Evoluciona XOR midiendo el tiempo de reproduce; devuelve (tiempos, mejor fitness)."""
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, config_file)
+    config.pop_size = pop_size
+    config.no_fitness_termination = True
+    config.genome_config.genome_type = config.genome_type
+    times = []
+
+    class Timed(reproduction_type):
+        def reproduce(self, config, species, pop_size, generation):
+            start = time.perf_counter()
+            population = super().reproduce(config, species, pop_size, generation)
+            times.append(time.perf_counter() - start)
+            return population
+
+    config.reproduction_type = Timed
+    random.seed(seed)
+    p = neat.Population(config)
+    winner = p.run(_eval_xor, generations)
+    return times, winner.fitness
+
+
+def benchmark(config_file, pop_sizes, generations, seed=0):
+    print(f"{'población':>10}{'estándar (ms/gen)':>20}{'arrays (ms/gen)':>18}{'aceleración':>13}"
+          f"{'mejor estándar':>16}{'mejor arrays':>14}")
+    for pop_size in pop_sizes:
+        stock_times, stock_best = _timed_run(config_file, neat.DefaultReproduction, pop_size, generations, seed)
+        array_times, array_best = _timed_run(config_file, ArrayReproduction, pop_size, generations, seed)
+        stock_ms = 1000 * np.mean(stock_times)
+        array_ms = 1000 * np.mean(array_times)
+        print(f"{pop_size:>10}{stock_ms:>20.2f}{array_ms:>18.2f}{stock_ms / array_ms:>12.1f}x"
+              f"{stock_best:>16.3f}{array_best:>14.3f}")
+
+
+if __name__ == "__main__":
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark de reproducción con genomas en arrays sobre XOR")
+    parser.add_argument("--config", default=os.path.join(local_dir, "..", "config-feedforward.txt"))
+    parser.add_argument("--poblaciones", type=int, nargs="+", default=[150, 2000, 10000])
+    parser.add_argument("--generaciones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.config, args.poblaciones, args.generaciones, args.semilla)
@@ -1,6 +1,7 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
+import time
 from robobopy.Robobo import Robobo
 from robobopy.utils.IR import IR
 from robobopy.utils.BlobColor import BlobColor
@@ -14,12 +15,19 @@ class RoboboNEATEnv(gym.Env):
     """
     metadata = {"render_modes": ["human"]}
 
-    def __init__(self, max_steps=200, host="localhost"):
+    def __init__(self, max_steps=200, host="localhost", backend=None):
+        """
+        backend: par (robobo, sim) que sustituye a Robobo/RoboboSim, por
+        ejemplo tablas_sensores.table_backend(...) para entrenar sin simulador.
+        """
         super(RoboboNEATEnv, self).__init__()
         
         # Conexión con el robot
-        self.robobo = Robobo(host)
-        self.sim = RoboboSim(host) 
+        if backend is not None:
+            self.robobo, self.sim = backend
+        else:
+            self.robobo = Robobo(host)
+            self.sim = RoboboSim(host) 
         self.robobo.connect()
         self.sim.connect()
         
@@ -40,8 +48,10 @@ class RoboboNEATEnv(gym.Env):
 
         # Variables de estado
         self.state = None
+        self.raw_sensors = {}  # Última lectura sin procesar (ver _get_state)
         self.steps = 0
         self.max_steps = max_steps
+        self.sim_time = 0.0  # Segundos acumulados en reset/step (tiempo de simulador)
         
         # Constantes para detección
         self.OBSTACLE_THRESHOLD_FRONT = 30
@@ -53,6 +63,7 @@ class RoboboNEATEnv(gym.Env):
     def reset(self, *, seed=None):
         """Reinicia el entorno y retorna el estado inicial."""
         super().reset(seed=seed)
+        start = time.perf_counter()
         self.steps = 0
         
         # Reiniciar simulación
@@ -64,6 +75,26 @@ class RoboboNEATEnv(gym.Env):
         self.robobo.setActiveBlobs(red=True, green=False, blue=False, custom=False)
         
         self.state = self._get_state()
+        self.sim_time += time.perf_counter() - start
+        return self.state, {}
+
+    def save_state(self):
+        """
+        Instantánea del episodio en curso (mundo simulado, pasos y
+        observación). Solo con un backend local que lo permita, como el de
+        tablas_sensores.py: RoboboSim no puede guardar su estado.
+        """
+        if not hasattr(self.sim, "save_state"):
+            raise NotImplementedError("El simulador no permite guardar su estado; usa un backend local (tablas_sensores.py)")
+        return {"sim": self.sim.save_state(), "steps": self.steps, "state": self.state}
+
+    def load_state(self, snapshot):
+        """Continúa desde una instantánea de save_state (en lugar de reset); devuelve (obs, info)."""
+        start = time.perf_counter()
+        self.sim.load_state(snapshot["sim"])
+        self.steps = snapshot["steps"]
+        self.state = snapshot["state"]
+        self.sim_time += time.perf_counter() - start
         return self.state, {}
 
     def _get_state(self):
@@ -78,6 +109,15 @@ class RoboboNEATEnv(gym.Env):
         ir_front_c = self.robobo.readIRSensor(IR.FrontC)
         ir_front_l = self.robobo.readIRSensor(IR.FrontL)
         ir_front_r = self.robobo.readIRSensor(IR.FrontR)
+
+        # Lecturas tal cual las da el robot (step las devuelve en info)
+        self.raw_sensors = {
+            "blob_posx": float(blob.posx),
+            "blob_size": float(blob.size),
+            "ir_front_c": float(ir_front_c),
+            "ir_front_l": float(ir_front_l),
+            "ir_front_r": float(ir_front_r),
+        }
         
         # Normalizar posición X del blob (0-100)
         blob_x = blob.posx if blob.size > 0 else 50.0  # Centro si no hay blob
@@ -121,6 +161,7 @@ class RoboboNEATEnv(gym.Env):
         4: Girar derecha (fuerte)
         5: Giro 180°
         """
+        start = time.perf_counter()
         self.steps += 1
         # Ejecutar acción
         if action == 0:  # Avanzar
@@ -156,7 +197,12 @@ class RoboboNEATEnv(gym.Env):
             print(f"⏱️ Tiempo máximo alcanzado ({self.max_steps} steps)")
             reward -= 50  # Penalización por no completar
 
-        return self.state, reward, terminated, truncated, {}
+        # Lecturas en bruto de los sensores (para registrar trayectorias): sin el
+        # centrado de blob_posx ni el límite de blob_size que aplica la observación
+        info = dict(self.raw_sensors)
+
+        self.sim_time += time.perf_counter() - start
+        return self.state, reward, terminated, truncated, info
 
     def _calculate_reward(self):
         """
@@ -201,6 +247,16 @@ class RoboboNEATEnv(gym.Env):
         
         return reward
 
+    def get_pose(self):
+        """
+        Pose del robot en el simulador: (x, z, orientación en grados).
+        En RoboboSim el eje y es vertical, el suelo es el plano x-z.
+        """
+        location = self.sim.getRobotLocation(0)
+        position = location["position"]
+        rotation = location["rotation"]
+        return float(position["x"]), float(position["z"]), float(rotation["y"])
+
     def render(self):
         """Muestra información del estado actual."""
         blob = self.robobo.readColorBlob(BlobColor.RED)
@@ -0,0 +1,353 @@
+"""
+Evaluación distribuida de genomas NEAT sobre TCP.
+
+Un coordinador reparte los genomas de cada generación entre nodos
+evaluadores remotos, cada uno junto a su propio RoboboSim. Los trabajadores
+mandan latidos mientras evalúan; si un préstamo (lease) caduca sin latidos,
+el genoma se reasigna a otro trabajador. Al final de cada generación se
+muestran el rendimiento y los rezagados de cada trabajador.
+
+Los mensajes van serializados con pickle: usar solo en una red de confianza.
+
+Uso:
+    python neat_distribuido.py coordinador [--puerto 5555] [-g 10]
+    python neat_distribuido.py trabajador <ip_coordinador> [--puerto 5555] [--sim localhost]
+"""
+import argparse
+import os
+import pickle
+import socket
+import statistics
+import struct
+import threading
+import time
+from collections import deque
+
+import neat
+
+HEADER = struct.Struct("!I")
+
+
+def send_msg(sock, msg, lock=None):
+    """Envía un mensaje como [longitud de 4 bytes][pickle]."""
+    data = pickle.dumps(msg, protocol=pickle.HIGHEST_PROTOCOL)
+    if lock is None:
+        sock.sendall(HEADER.pack(len(data)) + data)
+    else:
+        with lock:
+            sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Conexión cerrada")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def recv_msg(sock):
+    (length,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return pickle.loads(_recv_exact(sock, length))
+
+
+class WorkerStats:
+    """Contadores de un trabajador para la generación actual."""
+
+    def __init__(self):
+        self.times = []
+        self.expired = 0
+
+    def reset(self):
+        self.times = []
+        self.expired = 0
+
+
+class Coordinator:
+    """
+    Servidor que reparte genomas y agrega resultados.
+
+    Args:
+        port: Puerto TCP de escucha
+        lease_timeout: Segundos sin latido tras los que se reasigna un genoma
+        max_attempts: Reasignaciones máximas antes de dar el genoma por fallido
+    """
+
+    def __init__(self, port=5555, bind="0.0.0.0", lease_timeout=30.0, max_attempts=3):
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Condition()
+        self._pending = deque()      # task_id pendientes de asignar
+        self._tasks = {}             # task_id -> genoma
+        self._attempts = {}          # task_id -> número de asignaciones
+        self._leases = {}            # task_id -> (trabajador, fecha límite)
+        self._results = {}           # task_id -> fitness
+        self._stats = {}             # trabajador -> WorkerStats
+        self._stop = False
+
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((bind, port))
+        self._server.listen()
+        self.port = self._server.getsockname()[1]
+
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._lease_monitor, daemon=True).start()
+        print(f"🛰️ Coordinador escuchando en el puerto {self.port}")
+
+    # --- Red ---
+
+    def _accept_loop(self):
+        while not self._stop:
+            try:
+                conn, addr = self._server.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(conn, addr), daemon=True).start()
+
+    def _handle(self, conn, addr):
+        name = f"{addr[0]}:{addr[1]}"
+        try:
+            while True:
+                msg = recv_msg(conn)
+                kind = msg["type"]
+                if kind == "hello":
+                    name = f"{msg['name']}@{addr[0]}:{addr[1]}"
+                    with self._lock:
+                        self._stats.setdefault(name, WorkerStats())
+                    print(f"🔌 Trabajador conectado: {name}")
+                elif kind == "ready":
+                    send_msg(conn, self._next_task(name))
+                elif kind == "heartbeat":
+                    self._renew(msg["task_id"], name)
+                elif kind == "result":
+                    self._complete(msg["task_id"], name, msg["fitness"], msg["elapsed"])
+        except (ConnectionError, OSError, EOFError):
+            pass
+        finally:
+            conn.close()
+            self._release_worker(name)
+
+    # --- Cola de tareas ---
+
+    def _next_task(self, worker):
+        with self._lock:
+            self._lock.wait_for(lambda: self._pending or self._stop, timeout=1.0)
+            if self._stop:
+                return {"type": "shutdown"}
+            # Saltar tareas ya resueltas por un resultado que llegó tarde
+            while self._pending and self._pending[0] in self._results:
+                self._pending.popleft()
+            if not self._pending:
+                return {"type": "wait"}
+            task_id = self._pending.popleft()
+            self._attempts[task_id] += 1
+            self._leases[task_id] = (worker, time.time() + self.lease_timeout)
+            return {"type": "task", "task_id": task_id, "genome": self._tasks[task_id]}
+
+    def _renew(self, task_id, worker):
+        with self._lock:
+            lease = self._leases.get(task_id)
+            if lease is not None and lease[0] == worker:
+                self._leases[task_id] = (worker, time.time() + self.lease_timeout)
+
+    def _complete(self, task_id, worker, fitness, elapsed):
+        with self._lock:
+            self._stats.setdefault(worker, WorkerStats()).times.append(elapsed)
+            # Gana el primer resultado; los que llegan tarde se ignoran
+            if task_id in self._tasks and task_id not in self._results:
+                self._results[task_id] = fitness
+                self._leases.pop(task_id, None)
+                self._lock.notify_all()
+
+    def _expire(self, task_id, worker):
+        """Devuelve una tarea a la cola (o la da por fallida). Requiere el lock."""
+        self._leases.pop(task_id, None)
+        if worker in self._stats:
+            self._stats[worker].expired += 1
+        if self._attempts[task_id] >= self.max_attempts:
+            print(f"⚠️ Genoma {task_id} fallido tras {self._attempts[task_id]} intentos")
+            self._results[task_id] = None
+        else:
+            self._pending.appendleft(task_id)
+        self._lock.notify_all()
+
+    def _lease_monitor(self):
+        while not self._stop:
+            time.sleep(0.5)
+            now = time.time()
+            with self._lock:
+                for task_id, (worker, deadline) in list(self._leases.items()):
+                    if now > deadline:
+                        print(f"⏱️ Préstamo caducado: genoma {task_id} en {worker}, reasignando")
+                        self._expire(task_id, worker)
+
+    def _release_worker(self, worker):
+        with self._lock:
+            for task_id, (owner, _) in list(self._leases.items()):
+                if owner == worker:
+                    self._expire(task_id, worker)
+        print(f"🔌 Trabajador desconectado: {worker}")
+
+    # --- API para NEAT ---
+
+    def evaluate(self, genomes, failed_fitness=-100.0, on_result=None):
+        """
+        Evalúa una lista de (genome_id, genome) en los trabajadores conectados.
+        Los genomas que fallan en todos los intentos reciben `failed_fitness`.
+        Si se pasa on_result, se llama con cada genoma en cuanto tiene fitness.
+        """
+        with self._lock:
+            self._tasks = {gid: genome for gid, genome in genomes}
+            self._attempts = {gid: 0 for gid in self._tasks}
+            self._results = {}
+            self._leases = {}
+            self._pending = deque(self._tasks)
+            for s in self._stats.values():
+                s.reset()
+            self._lock.notify_all()
+
+        start = time.time()
+        by_id = dict(genomes)
+        done = set()
+        while len(done) < len(by_id):
+            with self._lock:
+                self._lock.wait_for(lambda: len(self._results) > len(done))
+                arrived = [(gid, f) for gid, f in self._results.items() if gid not in done]
+            # Fuera del lock: on_result escribe en disco
+            for gid, fitness in arrived:
+                genome = by_id[gid]
+                genome.fitness = failed_fitness if fitness is None else fitness
+                done.add(gid)
+                if on_result is not None:
+                    on_result(genome)
+        wall = time.time() - start
+
+        self.report(len(genomes), wall)
+
+    def report(self, n_genomes, wall):
+        """Rendimiento y rezagados de cada trabajador en la última generación."""
+        with self._lock:
+            stats = {name: (list(s.times), s.expired) for name, s in self._stats.items()}
+        all_times = [t for times, _ in stats.values() for t in times]
+        median = statistics.median(all_times) if all_times else 0.0
+
+        print(f"\n📡 Generación evaluada: {n_genomes} genomas en {wall:.1f} s "
+              f"({n_genomes / wall if wall > 0 else 0:.2f} genomas/s)")
+        print(f"{'Trabajador':<32}{'Genomas':>8}{'Media s':>9}{'Máx s':>8}{'Rezagos':>9}{'Caducados':>11}")
+        for name, (times, expired) in sorted(stats.items()):
+            mean = statistics.mean(times) if times else 0.0
+            worst = max(times) if times else 0.0
+            stragglers = sum(1 for t in times if median > 0 and t > 2 * median)
+            print(f"{name:<32}{len(times):>8}{mean:>9.2f}{worst:>8.2f}{stragglers:>9}{expired:>11}")
+
+    def eval_genomes(self, genomes, config, on_result=None):
+        """Función de evaluación compatible con neat.Population.run."""
+        self.evaluate(genomes, on_result=on_result)
+
+    def close(self):
+        with self._lock:
+            self._stop = True
+            self._lock.notify_all()
+        self._server.close()
+
+
+def run_worker(address, port=5555, config_path="./config-feedforward", sim_host="localhost",
+               eval_fn=None, heartbeat=5.0, name=None):
+    """
+    Nodo evaluador: pide genomas al coordinador y los evalúa en su simulador.
+
+    Args:
+        address: IP del coordinador
+        config_path: Configuración NEAT (la misma que usa el coordinador)
+        sim_host: Host del RoboboSim local de este nodo
+        eval_fn: Función (genome, config, host) -> fitness; por defecto neat_train.eval_genome
+        heartbeat: Segundos entre latidos mientras se evalúa
+    """
+    if eval_fn is None:
+        from neat_train import eval_genome
+        eval_fn = eval_genome
+
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_path
+    )
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+
+    sock = socket.create_connection((address, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    send_lock = threading.Lock()
+    send_msg(sock, {"type": "hello", "name": name}, send_lock)
+    print(f"🔌 Conectado al coordinador {address}:{port} como {name}")
+
+    evaluated = 0
+    try:
+        while True:
+            send_msg(sock, {"type": "ready"}, send_lock)
+            msg = recv_msg(sock)
+            if msg["type"] == "shutdown":
+                break
+            if msg["type"] == "wait":
+                continue
+
+            task_id = msg["task_id"]
+            done = threading.Event()
+
+            def beat():
+                while not done.wait(heartbeat):
+                    send_msg(sock, {"type": "heartbeat", "task_id": task_id}, send_lock)
+
+            beater = threading.Thread(target=beat, daemon=True)
+            beater.start()
+            start = time.time()
+            try:
+                fitness = eval_fn(msg["genome"], config, sim_host)
+            finally:
+                done.set()
+                beater.join()
+            send_msg(sock, {"type": "result", "task_id": task_id, "fitness": fitness,
+                            "elapsed": time.time() - start}, send_lock)
+            evaluated += 1
+    except (ConnectionError, OSError, EOFError):
+        print("🔌 Conexión con el coordinador cerrada")
+    finally:
+        sock.close()
+    print(f"✅ Trabajador {name} terminado ({evaluated} genomas evaluados)")
+    return evaluated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluación distribuida de NEAT")
+    sub = parser.add_subparsers(dest="rol", required=True)
+
+    p = sub.add_parser("coordinador")
+    p.add_argument("--puerto", type=int, default=5555)
+    p.add_argument("--config", default="./config-feedforward")
+    p.add_argument("-g", "--generations", type=int, default=10)
+    p.add_argument("--lease", type=float, default=30.0, help="Segundos de préstamo sin latido")
+
+    p = sub.add_parser("trabajador")
+    p.add_argument("coordinador", help="IP del coordinador")
+    p.add_argument("--puerto", type=int, default=5555)
+    p.add_argument("--config", default="./config-feedforward")
+    p.add_argument("--sim", default="localhost", help="Host del RoboboSim local")
+    p.add_argument("--latido", type=float, default=5.0)
+
+    args = parser.parse_args()
+
+    if args.rol == "coordinador":
+        from neat_train import run_neat
+        coordinator = Coordinator(port=args.puerto, lease_timeout=args.lease)
+        try:
+            run_neat(args.config, generations=args.generations, eval_function=coordinator.eval_genomes)
+        finally:
+            coordinator.close()
+    else:
+        run_worker(args.coordinador, args.puerto, args.config, args.sim, heartbeat=args.latido)
@@ -0,0 +1,335 @@
+"""
+NEAT con modelo de islas: varias poblaciones en procesos separados.
+
+Cada isla es un neat.Population independiente con su propio simulador (host)
+y cada G generaciones los k mejores genomas de cada isla migran a otras
+según una topología (anillo, todos con todos o aleatoria). Así se reparte
+NEAT entre núcleos y se mantiene la diversidad sin agrandar una población.
+
+Uso: python neat_islas.py --hosts localhost 192.168.1.20 [-g 30] [--cada 5] [-k 2]
+"""
+import argparse
+import copy
+import math
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import random
+from datetime import datetime
+from itertools import count
+
+import neat
+from neat.reporting import BaseReporter
+
+TOPOLOGIES = ("anillo", "todos", "aleatoria")
+
+
+class IslandReporter(BaseReporter):
+    """
+    Reporter de cada isla: guarda un resumen por generación y los k mejores
+    genomas evaluados (candidatos a emigrar).
+    """
+
+    def __init__(self, n_migrants):
+        self.n_migrants = n_migrants
+        self.history = []
+        self.top_genomes = []
+        self.best_genome = None
+        self.generation = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [g.fitness for g in population.values()]
+        mean = sum(fitnesses) / len(fitnesses)
+        variance = sum((f - mean) ** 2 for f in fitnesses) / len(fitnesses)
+
+        ranked = sorted(population.values(), key=lambda g: g.fitness, reverse=True)
+        self.top_genomes = [copy.deepcopy(g) for g in ranked[:self.n_migrants]]
+        if self.best_genome is None or best_genome.fitness > self.best_genome.fitness:
+            self.best_genome = copy.deepcopy(best_genome)
+
+        self.history.append({
+            "generation": self.generation,
+            "n": len(fitnesses),
+            "mean": mean,
+            "stdev": math.sqrt(variance),
+            "best": copy.deepcopy(best_genome),
+            "species": {sid: len(s.members) for sid, s in species.species.items()},
+        })
+
+    def pop_history(self):
+        history, self.history = self.history, []
+        return history
+
+
+class IslandStatistics:
+    """
+    Vista combinada de todas las islas con la misma interfaz que usan
+    visualize.plot_stats y visualize.plot_species de StatisticsReporter.
+    """
+
+    def __init__(self, n_islands):
+        self.n_islands = n_islands
+        self.islands = [[] for _ in range(n_islands)]
+        self.most_fit_genomes = []
+
+    def add(self, island_id, history):
+        self.islands[island_id].extend(history)
+        # Recalcular el mejor genoma global de las generaciones ya completas en todas las islas
+        n_complete = min(len(h) for h in self.islands)
+        while len(self.most_fit_genomes) < n_complete:
+            g = len(self.most_fit_genomes)
+            best = max((h[g]["best"] for h in self.islands), key=lambda c: c.fitness)
+            self.most_fit_genomes.append(best)
+
+    def _generations(self):
+        return range(len(self.most_fit_genomes))
+
+    def get_fitness_mean(self):
+        """Media de fitness de todas las islas juntas por generación."""
+        means = []
+        for g in self._generations():
+            entries = [h[g] for h in self.islands]
+            total = sum(e["n"] for e in entries)
+            means.append(sum(e["mean"] * e["n"] for e in entries) / total)
+        return means
+
+    def get_fitness_stdev(self):
+        """Desviación típica combinada (agrupando las varianzas de cada isla)."""
+        stdevs = []
+        for g, mean in zip(self._generations(), self.get_fitness_mean()):
+            entries = [h[g] for h in self.islands]
+            total = sum(e["n"] for e in entries)
+            pooled = sum(e["n"] * (e["stdev"] ** 2 + (e["mean"] - mean) ** 2) for e in entries) / total
+            stdevs.append(math.sqrt(pooled))
+        return stdevs
+
+    def get_island_best(self, island_id):
+        return [e["best"].fitness for e in self.islands[island_id]]
+
+    def get_species_sizes(self):
+        """Tamaño de cada especie (isla, id) por generación, como StatisticsReporter."""
+        keys = sorted({(i, sid) for i, h in enumerate(self.islands)
+                       for e in h for sid in e["species"]})
+        sizes = []
+        for g in self._generations():
+            sizes.append([self.islands[i][g]["species"].get(sid, 0) for i, sid in keys])
+        return sizes
+
+    def print_summary(self):
+        print(f"\n{'='*60}")
+        print("📊 RESUMEN POR ISLA")
+        print(f"{'='*60}")
+        for i, h in enumerate(self.islands):
+            if not h:
+                continue
+            best = max(e["best"].fitness for e in h)
+            print(f"Isla {i}: mejor {best:.2f} - media final {h[-1]['mean']:.2f} - "
+                  f"especies {len(h[-1]['species'])}")
+
+
+def migration_sources(topology, n_islands, rng):
+    """Devuelve, para cada isla, la lista de islas de las que recibe migrantes."""
+    if n_islands < 2:
+        return [[] for _ in range(n_islands)]
+    if topology == "anillo":
+        return [[(i - 1) % n_islands] for i in range(n_islands)]
+    if topology == "todos":
+        return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    if topology == "aleatoria":
+        return [[rng.choice([j for j in range(n_islands) if j != i])] for i in range(n_islands)]
+    raise ValueError(f"Topología desconocida: {topology}")
+
+
+def insert_migrants(population, config, migrants, rng):
+    """
+    Sustituye genomas de la nueva generación (no élite) por los migrantes
+    y vuelve a especiar la población.
+    """
+    if not migrants:
+        return
+    candidates = [key for key, g in population.population.items() if g.fitness is None]
+    if len(candidates) < len(migrants):
+        candidates = list(population.population)
+    for key, migrant in zip(rng.sample(candidates, len(migrants)), migrants):
+        del population.population[key]
+        genome = copy.deepcopy(migrant)
+        # Nueva clave en esta isla para no chocar con los ids locales
+        genome.key = next(population.reproduction.genome_indexer)
+        genome.fitness = None
+        population.population[genome.key] = genome
+        population.reproduction.ancestors[genome.key] = tuple()
+
+    # Los migrantes traen ids de nodos ocultos de su isla: el contador de
+    # nodos de esta isla tiene que seguir por encima de todos ellos
+    gc = config.genome_config
+    next_key = next(gc.node_indexer) if gc.node_indexer is not None else 0
+    max_node = max(k for g in population.population.values() for k in g.nodes)
+    gc.node_indexer = count(max(next_key, max_node + 1))
+    population.species.speciate(config, population.population, population.generation)
+
+
+def _island_main(island_id, config_path, host, generations, interval, n_migrants,
+                 seed, eval_fn, models_dir, out_queue, in_queue):
+    """Proceso de una isla: evoluciona por tramos de `interval` generaciones."""
+    random.seed(seed)
+    rng = random.Random(seed)
+
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_path
+    )
+    p = neat.Population(config)
+    tracker = IslandReporter(n_migrants)
+    p.add_reporter(tracker)
+    p.add_reporter(neat.Checkpointer(5, filename_prefix=f'{models_dir}isla{island_id}-neat-checkpoint-'))
+
+    def eval_genomes(genomes, config):
+        for genome_id, genome in genomes:
+            genome.fitness = eval_fn(genome, config, host)
+
+    done = 0
+    while done < generations:
+        n = min(interval, generations - done)
+        p.run(eval_genomes, n)
+        done += n
+        out_queue.put((island_id, tracker.pop_history(), tracker.top_genomes))
+        if done < generations:
+            insert_migrants(p, config, in_queue.get(), rng)
+
+    out_queue.put((island_id, None, tracker.best_genome))
+
+
+def _get_from_islands(out_queue, processes, pending, poll=5.0):
+    """
+    Siguiente mensaje de las islas. Si alguna isla pendiente ha muerto sin
+    terminar, se paran todas y se lanza RuntimeError en vez de esperar para siempre.
+    """
+    while True:
+        try:
+            return out_queue.get(timeout=poll)
+        except queue.Empty:
+            dead = [i for i in pending if processes[i].exitcode not in (None, 0)]
+            if dead:
+                for proc in processes:
+                    if proc.is_alive():
+                        proc.terminate()
+                codes = ", ".join(f"isla {i}: código {processes[i].exitcode}" for i in dead)
+                raise RuntimeError(f"Islas terminadas con error ({codes})")
+
+
+def run_islands(config_file, hosts, generations=30, interval=5, n_migrants=2,
+                topology="anillo", eval_fn=None, seed=None, log_dir=None):
+    """
+    Ejecuta NEAT con una isla por host.
+
+    Args:
+        config_file: Configuración NEAT (la misma que neat_train.py)
+        hosts: Un host de RoboboSim por isla
+        generations: Generaciones totales por isla
+        interval: Generaciones entre migraciones (G)
+        n_migrants: Genomas que emigra cada isla (k)
+        topology: "anillo", "todos" o "aleatoria"
+        eval_fn: Función (genome, config, host) -> fitness; por defecto neat_train.eval_genome
+
+    Returns:
+        (mejor genoma global, config, IslandStatistics)
+    """
+    if eval_fn is None:
+        from neat_train import eval_genome
+        eval_fn = eval_genome
+
+    if log_dir is None:
+        log_dir = f"./neat_logs_2.1/{datetime.now().strftime('%Y%m%d_%H%M%S')}_islas/"
+    models_dir = f"{log_dir}models/"
+    os.makedirs(models_dir, exist_ok=True)
+    print(f"Directorio de logs: {log_dir}")
+
+    rng = random.Random(seed)
+    n_islands = len(hosts)
+    out_queue = mp.Queue()
+    in_queues = [mp.Queue() for _ in hosts]
+    processes = [
+        mp.Process(target=_island_main,
+                   args=(i, config_file, host, generations, interval, n_migrants,
+                         rng.randrange(2 ** 32), eval_fn, models_dir, out_queue, in_queues[i]))
+        for i, host in enumerate(hosts)
+    ]
+
+    print(f"\n🏝️ Iniciando {n_islands} islas ({topology}), migración cada {interval} generaciones")
+    for proc in processes:
+        proc.start()
+
+    stats = IslandStatistics(n_islands)
+    finals = {}
+    active = set(range(n_islands))
+    epoch = 0
+    while active:
+        # Barrera: esperar a que cada isla activa termine el tramo (o acabe)
+        emigrants = {}
+        pending = set(active)
+        while pending:
+            island_id, history, payload = _get_from_islands(out_queue, processes, pending)
+            pending.discard(island_id)
+            if history is None:
+                finals[island_id] = payload
+                active.discard(island_id)
+            else:
+                stats.add(island_id, history)
+                emigrants[island_id] = payload
+        if not emigrants:
+            continue
+
+        epoch += 1
+        best = stats.most_fit_genomes[-1].fitness if stats.most_fit_genomes else float('nan')
+        print(f"🔁 Tramo {epoch}: mejor fitness global {best:.2f}")
+
+        # Las islas solo esperan migrantes si les quedan generaciones
+        if epoch * interval < generations:
+            sources = migration_sources(topology, n_islands, rng)
+            for i, src in enumerate(sources):
+                incoming = [g for j in src for g in emigrants.get(j, [])]
+                incoming.sort(key=lambda g: g.fitness, reverse=True)
+                in_queues[i].put(incoming[:n_migrants])
+
+    for proc in processes:
+        proc.join()
+
+    winner = max(finals.values(), key=lambda g: g.fitness)
+    with open(f'{models_dir}best_genome.pkl', 'wb') as f:
+        pickle.dump(winner, f)
+    with open(f'{log_dir}island_stats.pkl', 'wb') as f:
+        pickle.dump(stats, f)
+
+    stats.print_summary()
+    print(f"\n🏆 Mejor fitness global: {winner.fitness:.2f}")
+    print(f"💾 Mejor genoma: {models_dir}best_genome.pkl")
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+    return winner, config, stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="NEAT con modelo de islas")
+    parser.add_argument("--hosts", nargs="+", default=["localhost"])
+    parser.add_argument("--config", default="./config-feedforward")
+    parser.add_argument("-g", "--generations", type=int, default=30)
+    parser.add_argument("--cada", type=int, default=5, help="Generaciones entre migraciones")
+    parser.add_argument("-k", "--migrantes", type=int, default=2)
+    parser.add_argument("--topologia", choices=TOPOLOGIES, default="anillo")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        print(f"❌ Error: No se encuentra el archivo {args.config}")
+        exit(1)
+
+    run_islands(args.config, args.hosts, generations=args.generations, interval=args.cada,
+                n_migrants=args.migrantes, topology=args.topologia, seed=args.seed)
@@ -3,12 +3,17 @@ Script SIMPLE para probar modelos NEAT entrenados
 Uso básico: python neat_test.py path/al/genoma.pkl
 """
 
+import os
+import sys
 import neat
 import pickle
 import gzip
 import numpy as np
 from main_neat import RoboboNEATEnv
 
+# evaluacion_lotes.py y tablas_sensores.py están en la raíz del repositorio
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
 
 def load_genome(genome_path):
     """
@@ -172,6 +177,53 @@ def test_genome_simple(genome_path, num_episodes=3):
     print(f"{'='*60}\n")
 
 
+def test_genome_batched(genome_path, num_episodes=3, hosts=("localhost",), sensor_table=None, robots=1,
+                        max_steps=200):
+    """
+    Prueba un genoma con varios robots a la vez (evaluacion_lotes.py): en
+    cada tick la red evalúa las observaciones de todos los robots activos en
+    una sola pasada (red_vectorizada.py) y los robots se mueven en paralelo.
+
+    Args:
+        hosts: Un RoboboSim por robot
+        sensor_table: Si se indica, `robots` entornos locales con la tabla de
+            tablas_sensores.py en lugar de los simuladores de hosts
+    """
+    from evaluacion_lotes import run_batched, print_batched_summary
+    from red_vectorizada import BatchedNetwork
+
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        './practica2/config-feedforward'
+    )
+    genome = load_genome(genome_path)
+    net = BatchedNetwork.create(genome, config)
+
+    if sensor_table is not None:
+        from tablas_sensores import table_backend
+        envs = [RoboboNEATEnv(max_steps=max_steps, backend=table_backend(sensor_table, seed=i))
+                for i in range(robots)]
+    else:
+        envs = [RoboboNEATEnv(max_steps=max_steps, host=host) for host in hosts]
+
+    def report(result):
+        status = "✅ ÉXITO" if result["success"] else "❌ FALLO"
+        print(f"[robot {result['env']}] episodio {result['episode'] + 1}: {status}, "
+              f"reward {result['reward']:.2f}, steps {result['steps']}")
+
+    try:
+        results, stats = run_batched(envs, lambda obs: net.activate_batch(obs).argmax(axis=1),
+                                     num_episodes, max_steps=max_steps, on_episode=report)
+    finally:
+        for env in envs:
+            env.close()
+    print_batched_summary(results, stats, len(envs))
+    return results
+
+
 if __name__ == '__main__':
     import sys
     
@@ -1,10 +1,19 @@
+import functools
+import multiprocessing
 import neat
 import pickle
 import os
+import sys
 import numpy as np
 from datetime import datetime
-import matplotlib.pyplot as plt
+from itertools import count
 from main_neat import RoboboNEATEnv
+from estadisticas import StreamingStatisticsReporter
+from diario import EvaluationJournal, JournalCheckpointer
+
+# supervisor.py y registro.py están en la raíz del repositorio
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from supervisor import SimulatorSupervisor
 
 # Configuración de directorios
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -12,32 +21,67 @@ log_dir = f"./neat_logs_2.1/{timestamp}/"
 models_dir = f"{log_dir}models/"
 graphs_dir = f"{log_dir}graphs/"
 
-os.makedirs(log_dir, exist_ok=True)
-os.makedirs(models_dir, exist_ok=True)
-os.makedirs(graphs_dir, exist_ok=True)
-
-print(f"Directorio de logs: {log_dir}")
-
 # Variables globales para seguimiento
 best_genome_ever = None
 best_fitness_ever = -float('inf')
+sim_time_total = 0.0  # Segundos en reset/step de todos los genomas evaluados aquí
+journal = None  # Diario de evaluaciones de la ejecución en curso (diario.py)
+supervisors = {}  # host -> SimulatorSupervisor (conexión persistente con plazos y reconexión)
+sensor_table = None  # Directorio de tablas_sensores.py: si se indica, se entrena sin simulador
+
+
+def make_env(host):
+    """Entorno de evaluación: contra el simulador de `host` o contra la tabla de sensores."""
+    if sensor_table is not None:
+        from tablas_sensores import table_backend
+        return RoboboNEATEnv(max_steps=50, backend=table_backend(sensor_table))
+    return RoboboNEATEnv(max_steps=50, host=host)
+
+
+def get_supervisor(host):
+    """Supervisor de la conexión con el simulador de `host` (se crea la primera vez)."""
+    supervisor = supervisors.get(host)
+    if supervisor is None:
+        supervisor = supervisors[host] = SimulatorSupervisor(lambda: make_env(host))
+    return supervisor
+
 
-def eval_genome(genome, config):
+def simulator_counters():
+    """Suma de los contadores de todos los supervisores (plazos vencidos, reconexiones...)."""
+    totals = {}
+    for supervisor in supervisors.values():
+        for name, value in supervisor.counters().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def close_supervisors():
+    for supervisor in supervisors.values():
+        supervisor.close()
+    supervisors.clear()
+
+
+def eval_genome(genome, config, host="localhost", stats=None, snapshot=None):
     """
     Evalúa un genoma individual ejecutándolo en el entorno.
+    Si el simulador falla o no responde a tiempo se reconecta y se repite el
+    episodio (supervisor.py); solo si fallan todos los reintentos se asigna
+    la penalización de -100.
+    Si se pasa un diccionario en stats, se rellena con los pasos, el tiempo
+    de simulador, si hubo error y los plazos vencidos, reconexiones y
+    reintentos del episodio.
+    Con snapshot (de env.save_state) el episodio continúa desde esa
+    instantánea en lugar de empezar con reset.
     """
     # Crear red neuronal desde el genoma
     net = neat.nn.FeedForwardNetwork.create(genome, config)
-    
-    # Crear entorno
-    env = RoboboNEATEnv(max_steps=50)
-    
-    obs, _ = env.reset()
-    total_reward = 0.0
-    done = False
-    steps = 0
-    
-    try:
+
+    def episode(env):
+        sim_start = env.sim_time
+        obs, _ = env.reset() if snapshot is None else env.load_state(snapshot)
+        total_reward = 0.0
+        done = False
+        steps = 0
         while not done and steps < env.max_steps:
             # La red toma las observaciones y produce salidas
             output = net.activate(obs)
@@ -51,18 +95,29 @@ def eval_genome(genome, config):
             
             done = terminated or truncated
             steps += 1
-            
-    except Exception as e:
+        return total_reward, steps, env.sim_time - sim_start
+
+    supervisor = get_supervisor(host)
+    before = supervisor.counters()
+    error = False
+    try:
+        total_reward, steps, sim_time = supervisor.run_episode(episode)
+    except Exception as e:  # EpisodeFailed o un error del propio episodio
         print(f"Error evaluando genoma: {e}")
-        total_reward = -100  # Penalización por error
-    
-    finally:
-        env.close()
+        total_reward, steps, sim_time = -100, 0, 0.0  # Penalización por error
+        error = True
+
+    global sim_time_total
+    sim_time_total += sim_time
+    if stats is not None:
+        after = supervisor.counters()
+        stats.update(steps=steps, sim_time=sim_time, error=error,
+                     **{name: after[name] - before[name] for name in ("timeouts", "reconnects", "retries")})
     
     return total_reward
 
 
-def eval_genomes(genomes, config):
+def eval_genomes(genomes, config, snapshot=None):
     """
     Evalúa todos los genomas de una generación.
     Esta función es requerida por NEAT.
@@ -70,8 +125,15 @@ def eval_genomes(genomes, config):
     global best_genome_ever, best_fitness_ever
     
     for genome_id, genome in genomes:
-        fitness = eval_genome(genome, config)
-        genome.fitness = fitness
+        # Genomas ya evaluados antes de una interrupción (ver diario.py)
+        if journal is not None and journal.replay(genome):
+            fitness = genome.fitness
+        else:
+            stats = {}
+            fitness = eval_genome(genome, config, stats=stats, snapshot=snapshot)
+            genome.fitness = fitness
+            if journal is not None:
+                journal.record(genome, **stats)
         
         # Actualizar mejor genoma
         if fitness > best_fitness_ever:
@@ -80,34 +142,201 @@ def eval_genomes(genomes, config):
             print(f"🏆 ¡Nuevo mejor fitness: {fitness:.2f}!")
 
 
-def run_neat(config_file, generations=30):
+def snapshot_target_in_view(env, max_turns=24):
+    """
+    Instantánea con el cilindro ya a la vista: tras reset, gira a la
+    izquierda hasta que la cámara lo ve. Necesita un backend local.
+    """
+    obs, _ = env.reset()
+    for _ in range(max_turns):
+        if obs[1] > env.BLOB_SIZE_MIN:
+            break
+        obs, *_ = env.step(3)
+    else:
+        print(f"⚠️ El objetivo no apareció tras {max_turns} giros; se guarda el estado igualmente")
+    # La instantánea empieza con el contador de pasos a cero
+    env.steps = 0
+    return env.save_state()
+
+
+def _eval_from_snapshot(genome, config, snapshot, table_dir):
+    """Evaluación en un proceso del pool (cada proceso crea su propio entorno)."""
+    global sensor_table
+    sensor_table = table_dir
+    return eval_genome(genome, config, snapshot=snapshot)
+
+
+def _eval_job(eval_function, job):
+    gid, genome, config = job
+    return gid, eval_function(genome, config)
+
+
+class UnorderedParallelEvaluator:
+    """
+    Como neat.ParallelEvaluator, pero recoge los resultados con
+    imap_unordered: on_result recibe cada genoma en cuanto termina, sin
+    esperar al resto de la generación (así el diario no pierde nada si se corta).
+    """
+
+    def __init__(self, num_workers, eval_function):
+        self.eval_function = eval_function
+        self.pool = multiprocessing.Pool(num_workers)
+
+    def evaluate(self, genomes, config, on_result=None):
+        by_id = dict(genomes)
+        jobs = [(gid, genome, config) for gid, genome in genomes]
+        for gid, fitness in self.pool.imap_unordered(functools.partial(_eval_job, self.eval_function), jobs):
+            by_id[gid].fitness = fitness
+            if on_result is not None:
+                on_result(by_id[gid])
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+def run_neat(config_file, generations=30, eval_function=None, cached_speciation=False,
+             array_reproduction=False, resume=None, sensor_table_dir=None, snapshot=None, workers=1,
+             surrogate_fraction=None):
     """
     Ejecuta el algoritmo NEAT.
+    Por defecto evalúa con eval_genomes; se puede pasar otra función de
+    evaluación (por ejemplo, la distribuida de neat_distribuido.py).
+    Con cached_speciation se usa la especiación de especiacion.py y con
+    array_reproduction la reproducción en bloque de genoma_arrays.py.
+
+    Cada evaluación se anota en <log_dir>/journal.jsonl. Con resume (ruta de
+    un neat-checkpoint-*) se continúa en la carpeta de ese checkpoint y no se
+    vuelven a simular los genomas que ya están en el diario; la configuración
+    (y con ella cached_speciation/array_reproduction) es la guardada en el
+    checkpoint.
+
+    Con sensor_table_dir (una tabla de tablas_sensores.py) los IR y el blob
+    salen de la tabla precalculada en lugar del simulador.
+
+    Con snapshot (de env.save_state, por ejemplo snapshot_target_in_view)
+    todos los genomas empiezan desde esa instantánea en vez de reset; con
+    workers > 1 se evalúan en ese número de procesos (UnorderedParallelEvaluator),
+    cada uno con su entorno local cargando la misma instantánea.
+
+    Con surrogate_fraction solo se simula esa fracción de cada generación
+    (la de mejor fitness predicho por sustituto.py); el resto recibe el
+    fitness predicho. Al reanudar se restaura el filtro guardado en el
+    checkpoint, con sus datos y su modelo.
     """
-    # Cargar configuración
-    config = neat.Config(
-        neat.DefaultGenome,
-        neat.DefaultReproduction,
-        neat.DefaultSpeciesSet,
-        neat.DefaultStagnation,
-        config_file
-    )
-    
-    # Crear población
-    p = neat.Population(config)
+    global log_dir, models_dir, graphs_dir, journal, sensor_table
+    if workers > 1 and (snapshot is None or eval_function is not None):
+        raise ValueError("workers > 1 solo se admite al evaluar desde una instantánea (snapshot) "
+                         "con la evaluación por defecto")
+    sensor_table = sensor_table_dir
+    if resume is not None:
+        log_dir = os.path.dirname(os.path.dirname(os.path.abspath(resume))) + "/"
+        models_dir = f"{log_dir}models/"
+        graphs_dir = f"{log_dir}graphs/"
+
+    # Los directorios se crean al entrenar, no al importar el módulo
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(models_dir, exist_ok=True)
+    os.makedirs(graphs_dir, exist_ok=True)
+    print(f"Directorio de logs: {log_dir}")
+
+    if resume is not None:
+        # Población, especies y estado de random tal como quedaron en el checkpoint
+        p = neat.Checkpointer.restore_checkpoint(resume)
+        config = p.config
+        # restore_checkpoint crea una reproducción nueva que volvería a numerar los genomas desde 1
+        p.reproduction.genome_indexer = count(max(p.population) + 1)
+        print(f"Reanudando desde {resume} (generación {p.generation})")
+    else:
+        # Cargar configuración
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            config_file
+        )
+        if cached_speciation:
+            from especiacion import use_cached_speciation
+            use_cached_speciation(config)
+        if array_reproduction:
+            from genoma_arrays import use_array_reproduction
+            use_array_reproduction(config)
+
+        # Crear población
+        p = neat.Population(config)
     
     # Añadir reportes
     p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
+    # Estadísticas en disco por columnas (no guarda un genoma por generación en memoria)
+    stats = StreamingStatisticsReporter(f'{log_dir}stats/')
+    if resume is not None:
+        # Las generaciones posteriores al checkpoint se repiten: fuera sus filas
+        stats.truncate(p.generation)
     p.add_reporter(stats)
-    p.add_reporter(neat.Checkpointer(5, filename_prefix=f'{models_dir}neat-checkpoint-'))
+    journal = EvaluationJournal(f'{log_dir}journal.jsonl', resume_from=resume)
+    p.add_reporter(journal)
+    p.add_reporter(JournalCheckpointer(journal, 5, filename_prefix=f'{models_dir}neat-checkpoint-'))
+    evaluator = None
+    if eval_function is None and snapshot is not None and workers > 1:
+        evaluator = UnorderedParallelEvaluator(
+            workers, functools.partial(_eval_from_snapshot, snapshot=snapshot, table_dir=sensor_table))
+        eval_function = evaluator.evaluate
+    local_evaluation = eval_function is None
+    if eval_function is not None:
+        eval_function = journal.wrap(eval_function)
+    elif snapshot is not None:
+        eval_function = functools.partial(eval_genomes, snapshot=snapshot)
+    surrogate = None
+    if surrogate_fraction:
+        from sustituto import SurrogateFilter
+        # Al reanudar se sigue con el filtro del checkpoint: uno nuevo sin entrenar
+        # simularía otros genomas y la evolución no repetiría la original
+        surrogate = SurrogateFilter.from_population(p) if resume is not None else None
+        if surrogate is not None:
+            surrogate.resume(log_dir, p.generation, fraction=surrogate_fraction)
+            print(f"🔮 Sustituto restaurado del checkpoint ({len(surrogate.y)} evaluaciones)")
+        else:
+            surrogate = SurrogateFilter(log_dir, fraction=surrogate_fraction)
+        p.add_reporter(surrogate)
+        eval_function = surrogate.wrap(eval_function or eval_genomes)
+
+    # Registrar la ejecución
+    from registro import RunRegistry
+    registry = RunRegistry()
+    run_id = registry.start_run(
+        "neat", log_dir,
+        {"generations": generations, "pop_size": config.pop_size,
+         "eval_function": getattr(eval_function, "__name__", "eval_genomes"),
+         "cached_speciation": cached_speciation, "array_reproduction": array_reproduction,
+         "resume": resume, "sensor_table": sensor_table_dir, "snapshot": snapshot is not None,
+         "workers": workers, "surrogate_fraction": surrogate_fraction},
+        config_path=config_file,
+        artifacts={"models": os.path.abspath(models_dir), "stats": os.path.abspath(f"{log_dir}stats/"),
+                   "graphs": os.path.abspath(graphs_dir)},
+    )
     
     # Ejecutar evolución
     print("\n🚀 Iniciando evolución con NEAT...")
     print(f"Generaciones: {generations}")
     print(f"Tamaño población: {config.pop_size}")
     
-    winner = p.run(eval_genomes, generations)
+    try:
+        winner = p.run(eval_function or eval_genomes, generations)
+    except BaseException:
+        registry.end_run(run_id, status="error", sim_time=sim_time_total)
+        registry.close()
+        raise
+    finally:
+        journal.close()
+        if evaluator is not None:
+            evaluator.close()
+        counters = simulator_counters()
+        close_supervisors()
+        print(f"📓 Diario: {journal.recorded} evaluaciones nuevas, {journal.replayed} reutilizadas")
+        if counters:
+            print(f"🛰️ Simulador: {counters['timeouts']} plazos vencidos, {counters['reconnects']} reconexiones, "
+                  f"{counters['retries']} reintentos, {counters['failed_episodes']} episodios fallidos")
     
     # Guardar mejor genoma
     with open(f'{models_dir}best_genome.pkl', 'wb') as f:
@@ -116,10 +345,25 @@ def run_neat(config_file, generations=30):
     print(f"\n✅ Evolución completada!")
     print(f"🏆 Mejor fitness alcanzado: {winner.fitness:.2f}")
     
-    # Guardar estadísticas
+    # Guardar estadísticas (solo la ruta y el top-k; los datos ya están en stats/)
     with open(f'{log_dir}stats.pkl', 'wb') as f:
         pickle.dump(stats, f)
     
+    # Con evaluación remota o en otros procesos el tiempo de simulador y sus fallos no se miden en este proceso
+    metrics = {"best_fitness": winner.fitness, "generations_run": p.generation,
+               "final_mean_fitness": stats.get_fitness_mean()[-1],
+               "replayed_evaluations": journal.replayed}
+    if surrogate is not None:
+        metrics.update(surrogate_simulated=surrogate.simulated_total, surrogate_predicted=surrogate.predicted_total)
+    metrics.update({f"sim_{name}": value for name, value in counters.items() if name != "calls"})
+    registry.end_run(
+        run_id,
+        metrics=metrics,
+        artifacts={"best_genome": os.path.abspath(f"{models_dir}best_genome.pkl")},
+        sim_time=sim_time_total if local_evaluation else None,
+    )
+    registry.close()
+
     # Generar gráficas
     plot_stats(stats, winner, config)
     
@@ -130,6 +374,9 @@ def plot_stats(stats, winner, config):
     """
     Genera las gráficas requeridas para la memoria.
     """
+    # matplotlib solo se carga al final del entrenamiento
+    import matplotlib.pyplot as plt
+
     # 1. Gráfica de aprendizaje (fitness a lo largo de generaciones)
     generation = range(len(stats.most_fit_genomes))
     best_fitness = [g.fitness for g in stats.most_fit_genomes]
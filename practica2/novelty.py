@@ -0,0 +1,260 @@
+"""
+Búsqueda de novedad para NEAT - Práctica 2.1
+
+La recompensa de RoboboNEATEnv._calculate_reward es engañosa: premia ver el
+blob sin llegar a él y la evolución se estanca. Aquí cada episodio produce un
+descriptor de comportamiento (pose final y resumen de la trayectoria del
+blob) y el fitness es la novedad: distancia media a los k vecinos más
+cercanos en un archivo que crece generación a generación.
+
+Las búsquedas de vecinos usan un k-d tree (scipy.spatial.cKDTree) que se
+reconstruye de forma incremental, así archivos de 100k entradas siguen siendo
+rápidos.
+"""
+import numpy as np
+import neat
+from scipy.spatial import cKDTree
+
+# Escala de cada componente del descriptor para que todas pesen parecido
+DESCRIPTOR_SCALE = np.array([
+    1000.0,   # x final (mm)
+    1000.0,   # z final (mm)
+    180.0,    # orientación final (grados)
+    500.0,    # tamaño medio del blob
+    500.0,    # tamaño máximo del blob
+    500.0,    # tamaño final del blob
+    1.0,      # fracción de pasos con el blob visible
+    100.0,    # posición x media del blob
+], dtype=np.float64)
+
+
+def behaviour_descriptor(pose, blob_sizes, blob_xs):
+    """
+    Construye el descriptor de comportamiento de un episodio.
+
+    Args:
+        pose: (x, z, orientación) final del robot
+        blob_sizes: Tamaño del blob rojo en cada paso
+        blob_xs: Posición x del blob en cada paso (solo pasos con blob visible)
+    """
+    sizes = np.asarray(blob_sizes, dtype=np.float64)
+    visible = sizes > 0
+    descriptor = np.array([
+        pose[0],
+        pose[1],
+        pose[2],
+        sizes.mean() if len(sizes) else 0.0,
+        sizes.max() if len(sizes) else 0.0,
+        sizes[-1] if len(sizes) else 0.0,
+        visible.mean() if len(sizes) else 0.0,
+        np.mean(blob_xs) if len(blob_xs) else 50.0,
+    ])
+    return descriptor / DESCRIPTOR_SCALE
+
+
+class NoveltyArchive:
+    """
+    Archivo de descriptores con índice k-d tree reconstruido por tramos.
+
+    Los descriptores nuevos van primero a un búfer que se recorre por fuerza
+    bruta; cuando el búfer supera `rebuild_fraction` del tamaño indexado se
+    reconstruye el árbol con todo el archivo. El coste amortizado por inserción
+    es O(log n) y el búfer nunca crece más que una fracción del archivo.
+
+    Args:
+        k: Vecinos usados para calcular la novedad
+        add_threshold: Novedad mínima para entrar al archivo
+        add_probability: Probabilidad de añadir un descriptor aunque no supere el umbral
+        rebuild_fraction: Tamaño relativo del búfer que fuerza la reconstrucción
+        min_rebuild: Tamaño mínimo del búfer antes de reconstruir
+    """
+
+    def __init__(self, dim, k=15, add_threshold=0.3, add_probability=0.02,
+                 rebuild_fraction=0.1, min_rebuild=256, seed=None):
+        self.dim = dim
+        self.k = k
+        self.add_threshold = add_threshold
+        self.add_probability = add_probability
+        self.rebuild_fraction = rebuild_fraction
+        self.min_rebuild = min_rebuild
+        self.rng = np.random.default_rng(seed)
+
+        self._data = np.empty((1024, dim), dtype=np.float64)
+        self._size = 0
+        self._indexed = 0     # Entradas cubiertas por el árbol
+        self._tree = None
+        self.rebuilds = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def data(self):
+        return self._data[:self._size]
+
+    def add(self, descriptor):
+        if self._size == len(self._data):
+            grown = np.empty((2 * len(self._data), self.dim), dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = descriptor
+        self._size += 1
+
+        pending = self._size - self._indexed
+        if pending >= max(self.min_rebuild, self.rebuild_fraction * self._indexed):
+            self.rebuild()
+
+    def rebuild(self):
+        self._tree = cKDTree(self._data[:self._size])
+        self._indexed = self._size
+        self.rebuilds += 1
+
+    def knn_distances(self, points, k=None):
+        """
+        Distancias a los k vecinos más cercanos del archivo para cada punto.
+        Devuelve un array (n, k') con k' = min(k, len(archivo)), ordenado.
+        """
+        k = min(k or self.k, self._size)
+        points = np.atleast_2d(points)
+        if k == 0:
+            return np.empty((len(points), 0))
+
+        parts = []
+        if self._tree is not None:
+            d, _ = self._tree.query(points, k=min(k, self._indexed))
+            parts.append(d.reshape(len(points), -1))
+        if self._size > self._indexed:
+            buffer = self._data[self._indexed:self._size]
+            d = np.linalg.norm(points[:, None, :] - buffer[None, :, :], axis=2)
+            parts.append(d)
+        merged = np.sort(np.concatenate(parts, axis=1), axis=1)
+        return merged[:, :k]
+
+    def novelty(self, descriptors):
+        """
+        Novedad de cada descriptor de la generación actual: distancia media
+        a sus k vecinos entre el archivo y el resto de la población.
+        """
+        descriptors = np.atleast_2d(descriptors)
+        n = len(descriptors)
+
+        # Vecinos dentro de la población (pequeña, fuerza bruta)
+        pop_d = np.linalg.norm(descriptors[:, None, :] - descriptors[None, :, :], axis=2)
+        np.fill_diagonal(pop_d, np.inf)
+        pop_d = np.sort(pop_d, axis=1)[:, :min(self.k, n - 1)]
+
+        arch_d = self.knn_distances(descriptors)
+        merged = np.sort(np.concatenate([pop_d, arch_d], axis=1), axis=1)[:, :self.k]
+        if merged.shape[1] == 0:
+            return np.zeros(n)
+        return merged.mean(axis=1)
+
+    def update(self, descriptors, novelty):
+        """Añade al archivo los descriptores suficientemente novedosos."""
+        added = 0
+        for descriptor, score in zip(np.atleast_2d(descriptors), novelty):
+            if score > self.add_threshold or self.rng.random() < self.add_probability:
+                self.add(descriptor)
+                added += 1
+        return added
+
+
+def eval_genome_behaviour(genome, config, host="localhost", max_steps=50):
+    """
+    Ejecuta un episodio y devuelve (recompensa total, descriptor, objetivo alcanzado).
+    """
+    from main_neat import RoboboNEATEnv
+
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    env = RoboboNEATEnv(max_steps=max_steps, host=host)
+
+    total_reward = 0.0
+    blob_sizes, blob_xs = [], []
+    terminated = False
+    try:
+        obs, _ = env.reset()
+        done = False
+        steps = 0
+        while not done and steps < env.max_steps:
+            action = np.argmax(net.activate(obs))
+            obs, reward, terminated, truncated, _ = env.step(action)
+            total_reward += reward
+            # obs = [blob_x, blob_size, ir_c, ir_l, ir_r]
+            blob_sizes.append(obs[1])
+            if obs[1] > 0:
+                blob_xs.append(obs[0])
+            done = terminated or truncated
+            steps += 1
+        pose = env.get_pose()
+    except Exception as e:
+        print(f"Error evaluando genoma: {e}")
+        total_reward = -100
+        pose = (0.0, 0.0, 0.0)
+    finally:
+        env.close()
+
+    return total_reward, behaviour_descriptor(pose, blob_sizes, blob_xs), terminated
+
+
+class NoveltyEvaluator:
+    """
+    Función de evaluación para neat.Population.run con búsqueda de novedad.
+
+    Args:
+        archive: NoveltyArchive compartido entre generaciones
+        reward_weight: Peso de la recompensa original (0 = novedad pura)
+        eval_fn: Función (genome, config, host) -> (recompensa, descriptor, éxito)
+    """
+
+    def __init__(self, archive=None, reward_weight=0.0, eval_fn=None, host="localhost"):
+        self.archive = archive or NoveltyArchive(len(DESCRIPTOR_SCALE))
+        self.reward_weight = reward_weight
+        self.eval_fn = eval_fn or eval_genome_behaviour
+        self.host = host
+        self.best_reward = -float('inf')
+        self.best_reward_genome = None
+
+    def __call__(self, genomes, config):
+        rewards, descriptors = [], []
+        for genome_id, genome in genomes:
+            reward, descriptor, success = self.eval_fn(genome, config, self.host)
+            rewards.append(reward)
+            descriptors.append(descriptor)
+            # Guardar aparte el genoma con mejor recompensa real
+            if reward > self.best_reward:
+                self.best_reward = reward
+                self.best_reward_genome = genome
+                print(f"🏆 ¡Nueva mejor recompensa: {reward:.2f}!")
+            if success:
+                print(f"🎯 Genoma {genome_id} alcanzó el objetivo")
+
+        novelty = self.archive.novelty(np.array(descriptors))
+        rewards = np.array(rewards, dtype=np.float64)
+        if self.reward_weight > 0 and rewards.max() > rewards.min():
+            scaled = (rewards - rewards.min()) / (rewards.max() - rewards.min())
+            fitness = (1 - self.reward_weight) * novelty + self.reward_weight * scaled
+        else:
+            fitness = novelty
+
+        for (genome_id, genome), f in zip(genomes, fitness):
+            genome.fitness = float(f)
+
+        added = self.archive.update(np.array(descriptors), novelty)
+        print(f"🧭 Novedad media {novelty.mean():.3f} - archivo {len(self.archive)} (+{added})")
+
+
+if __name__ == '__main__':
+    import sys
+    from neat_train import run_neat
+
+    generations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    evaluator = NoveltyEvaluator()
+    try:
+        run_neat('./config-feedforward', generations=generations, eval_function=evaluator)
+    finally:
+        if evaluator.best_reward_genome is not None:
+            import pickle
+            from neat_train import models_dir
+            with open(f'{models_dir}best_reward_genome.pkl', 'wb') as f:
+                pickle.dump(evaluator.best_reward_genome, f)
+            print(f"💾 Genoma con mejor recompensa guardado en {models_dir}best_reward_genome.pkl")
@@ -0,0 +1,101 @@
+"""
+Red feed-forward de NEAT evaluada por lotes con NumPy.
+
+neat.nn.FeedForwardNetwork.activate procesa una observación cada vez y nodo
+a nodo en Python. BatchedNetwork compila el genoma por capas
+(neat.graphs.feed_forward_layers): cada capa es un producto de matrices
+sobre el lote entero de observaciones, así que el coste de Python se paga
+una vez por capa y no una vez por robot y nodo.
+
+Da las mismas salidas que FeedForwardNetwork (agregación "sum"). Las
+activaciones que no están en NUMPY_ACTIVATIONS se aplican elemento a
+elemento con la función de neat.
+
+Uso:
+    net = BatchedNetwork.create(genome, config)
+    outputs = net.activate_batch(observaciones)   # [n, salidas]
+"""
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+
+def _clamped(scale, fn):
+    # neat multiplica y satura el argumento en [-60, 60] antes de aplicar la función
+    return lambda z: fn(np.clip(scale * z, -60.0, 60.0))
+
+
+NUMPY_ACTIVATIONS = {
+    "sigmoid": _clamped(5.0, lambda z: 1.0 / (1.0 + np.exp(-z))),
+    "tanh": _clamped(2.5, np.tanh),
+    "relu": lambda z: np.maximum(z, 0.0),
+    "identity": lambda z: z,
+    "clamped": lambda z: np.clip(z, -1.0, 1.0),
+    "abs": np.abs,
+    "square": np.square,
+    "sin": _clamped(5.0, np.sin),
+    "gauss": lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+}
+
+
+class BatchedNetwork:
+    """Fenotipo de un genoma con una matriz de pesos por capa."""
+
+    def __init__(self, n_inputs, layers, output_columns):
+        self.n_inputs = n_inputs
+        self.layers = layers
+        self.output_columns = output_columns
+        self.n_values = n_inputs + sum(len(layer[0]) for layer in layers)
+
+    @staticmethod
+    def create(genome, config):
+        gc = config.genome_config
+        aggregations = {genome.nodes[k].aggregation for k in genome.nodes}
+        if aggregations - {"sum"}:
+            raise ValueError(f"BatchedNetwork solo admite agregación sum (el genoma usa {aggregations})")
+
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+        node_layers = feed_forward_layers(gc.input_keys, gc.output_keys, connections)
+
+        # Columna de cada nodo en la matriz de valores [n, entradas + nodos evaluados]
+        column = {key: i for i, key in enumerate(gc.input_keys)}
+        for layer in node_layers:
+            for key in sorted(layer):
+                column[key] = len(column)
+
+        incoming = {}
+        for (i, o) in connections:
+            incoming.setdefault(o, []).append((i, genome.connections[(i, o)].weight))
+
+        layers = []
+        for layer in node_layers:
+            keys = sorted(layer)
+            W = np.zeros((len(column), len(keys)))
+            for j, key in enumerate(keys):
+                for i, weight in incoming.get(key, ()):
+                    W[column[i], j] += weight
+            bias = np.array([genome.nodes[k].bias for k in keys])
+            response = np.array([genome.nodes[k].response for k in keys])
+            # Columnas de la capa agrupadas por función de activación
+            groups = {}
+            for j, key in enumerate(keys):
+                groups.setdefault(genome.nodes[key].activation, []).append(j)
+            activations = [(NUMPY_ACTIVATIONS.get(name) or np.vectorize(gc.activation_defs.get(name)),
+                            np.array(cols)) for name, cols in groups.items()]
+            layers.append((keys, column[keys[0]], W, bias, response, activations))
+
+        # Las salidas que no llegan a evaluarse (sin conexiones) valen 0, como en neat
+        output_columns = [column.get(k, -1) for k in gc.output_keys]
+        return BatchedNetwork(len(gc.input_keys), layers, output_columns)
+
+    def activate_batch(self, inputs):
+        """Salidas de la red para un lote de observaciones [n, entradas] -> [n, salidas]."""
+        inputs = np.asarray(inputs, dtype=np.float64).reshape(-1, self.n_inputs)
+        values = np.zeros((len(inputs), self.n_values + 1))   # La última columna queda a 0
+        values[:, :self.n_inputs] = inputs
+        for keys, start, W, bias, response, activations in self.layers:
+            z = bias + response * (values[:, :W.shape[0]] @ W)
+            out = np.empty_like(z)
+            for fn, cols in activations:
+                out[:, cols] = fn(z[:, cols])
+            values[:, start:start + len(keys)] = out
+        return values[:, self.output_columns]
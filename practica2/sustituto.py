@@ -0,0 +1,230 @@
+"""
+Modelo sustituto del fitness para filtrar la descendencia antes de simularla.
+
+La mayoría de los hijos de DefaultReproduction puntúan mal en eval_genome y
+cada uno cuesta un episodio entero. SurrogateFilter aprende el fitness a
+partir de rasgos baratos del genoma, con todas las evaluaciones anteriores:
+
+- número de nodos (totales y ocultos) y de conexiones activas e inactivas
+- media, desviación, mínimo y máximo de pesos y bias
+- salidas de la red compilada ante un lote fijo de observaciones de prueba
+
+El modelo es un conjunto de regresiones ridge sobre remuestreos bootstrap
+(solo numpy): la media es la predicción y la dispersión entre modelos, su
+incertidumbre. En cada generación se simula solo la fracción con mejor
+predicción (más una pequeña parte al azar para no sesgar los datos de
+entrenamiento); el resto recibe el fitness predicho y queda marcado con
+genome.surrogate = True y genome.surrogate_std. Los fitness predichos se
+limitan al peor fitness simulado de la generación, así que un genoma no
+simulado nunca pasa por delante de uno simulado (élites, mejor genoma,
+umbral de parada).
+
+La precisión se anota por generación en <dir>/surrogate.csv: correlación de
+rangos y error medio absoluto entre la predicción y el fitness simulado.
+
+Uso desde neat_train.py:
+    python robobo_cli.py evolve --sustituto 0.3
+"""
+import csv
+import os
+import random
+
+import numpy as np
+import neat
+from neat.reporting import BaseReporter
+
+# Límites del observation_space de RoboboNEATEnv: [blob_x, blob_size, ir_c, ir_l, ir_r]
+OBS_LOW = np.array([0.0, 0.0, 0.0, 0.0, 0.0])
+OBS_HIGH = np.array([100.0, 500.0, 1000.0, 1000.0, 1000.0])
+CSV_COLUMNS = ("generation", "simulated", "predicted", "training_samples", "spearman", "mae", "mean_std")
+
+
+def probe_batch(n=16, low=OBS_LOW, high=OBS_HIGH, seed=0):
+    """Lote fijo de observaciones de prueba (siempre el mismo para una semilla)."""
+    rng = np.random.default_rng(seed)
+    probes = rng.uniform(low, high, (n, len(low)))
+    # Casos típicos: nada a la vista, objetivo centrado lejos/cerca y obstáculo delante
+    probes[:4] = [[0, 0, 0, 0, 0], [50, 20, 0, 0, 0], [50, 300, 200, 0, 0], [0, 0, 900, 100, 100]]
+    return probes
+
+
+def genome_features(genome, config, probes):
+    """Vector de rasgos de un genoma (estructura, pesos y respuestas a las pruebas)."""
+    enabled = [c for c in genome.connections.values() if c.enabled]
+    weights = np.array([c.weight for c in enabled]) if enabled else np.zeros(1)
+    biases = np.array([n.bias for n in genome.nodes.values()]) if genome.nodes else np.zeros(1)
+    n_hidden = len(genome.nodes) - len(config.genome_config.output_keys)
+    structure = [len(genome.nodes), n_hidden, len(enabled), len(genome.connections) - len(enabled),
+                 weights.mean(), weights.std(), weights.min(), weights.max(), np.abs(weights).mean(),
+                 biases.mean(), biases.std()]
+
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    outputs = np.array([net.activate(obs) for obs in probes])
+    # Acción elegida en cada prueba (eval_genome usa argmax de las salidas)
+    chosen = np.zeros_like(outputs)
+    chosen[np.arange(len(outputs)), outputs.argmax(axis=1)] = 1.0
+    return np.concatenate([structure, outputs.ravel(), chosen.mean(axis=0)])
+
+
+def _spearman(a, b):
+    if len(a) < 3:
+        return float("nan")
+    ra = np.argsort(np.argsort(a)).astype(float)
+    rb = np.argsort(np.argsort(b)).astype(float)
+    if ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+class RidgeEnsemble:
+    """Regresiones ridge sobre remuestreos bootstrap de los datos (rasgos estandarizados)."""
+
+    def __init__(self, n_models=8, alpha=1.0, seed=0):
+        self.n_models = n_models
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+        self.coefs = None
+
+    def fit(self, X, y):
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        Z = np.hstack([(X - self.mean) / self.scale, np.ones((len(X), 1))])
+        penalty = self.alpha * np.eye(Z.shape[1])
+        penalty[-1, -1] = 0.0   # Sin regularizar el término independiente
+        coefs = []
+        for _ in range(self.n_models):
+            idx = self.rng.integers(0, len(Z), len(Z))
+            Zb, yb = Z[idx], y[idx]
+            coefs.append(np.linalg.solve(Zb.T @ Zb + penalty, Zb.T @ yb))
+        self.coefs = np.array(coefs).T   # [rasgo, modelo]
+
+    def predict(self, X):
+        """(media, desviación) de las predicciones de los modelos."""
+        Z = np.hstack([(X - self.mean) / self.scale, np.ones((len(X), 1))])
+        predictions = Z @ self.coefs
+        return predictions.mean(axis=1), predictions.std(axis=1)
+
+
+class SurrogateFilter(BaseReporter):
+    """
+    Args:
+        directory: Carpeta donde se escribe surrogate.csv
+        fraction: Fracción de cada generación que se simula (las mejores predicciones)
+        explore: Fracción adicional elegida al azar entre el resto
+        min_samples: Evaluaciones necesarias antes de empezar a filtrar
+        max_samples: Evaluaciones más recientes que se usan para entrenar
+        alpha: Regularización de las regresiones ridge
+    """
+
+    def __init__(self, directory, fraction=0.3, explore=0.05, min_samples=100, max_samples=5000,
+                 n_probes=16, alpha=10.0, seed=0):
+        self.fraction = fraction
+        self.explore = explore
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.probes = probe_batch(n_probes, seed=seed)
+        self.rng = random.Random(seed)
+        self.model = RidgeEnsemble(alpha=alpha, seed=seed)
+        self.trained = False
+        self.X = []
+        self.y = []
+        self.generation = None
+        self.history = []
+        self.simulated_total = 0
+        self.predicted_total = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "surrogate.csv")
+        if not os.path.exists(self.path):
+            with open(self.path, "w", newline="") as f:
+                csv.writer(f).writerow(CSV_COLUMNS)
+
+    @staticmethod
+    def from_population(population):
+        """Filtro guardado en un checkpoint (el species set serializa los reporters), o None."""
+        for reporter in population.species.reporters.reporters:
+            if isinstance(reporter, SurrogateFilter):
+                return reporter
+        return None
+
+    def resume(self, directory, generation, fraction=None):
+        """
+        Continúa con el modelo y los datos del checkpoint: las generaciones
+        desde `generation` se repiten, así que se quitan de surrogate.csv.
+        """
+        if fraction is not None:
+            self.fraction = fraction
+        self.path = os.path.join(directory, "surrogate.csv")
+        self.history = [row for row in self.history if row["generation"] < generation]
+        with open(self.path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows([row[c] for c in CSV_COLUMNS] for row in self.history)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def _train(self):
+        if len(self.y) < self.min_samples:
+            return
+        self.model.fit(np.array(self.X), np.array(self.y))
+        self.trained = True
+
+    def wrap(self, eval_function):
+        """Envuelve una función de evaluación por lotes para que solo simule los genomas elegidos."""
+        def eval_genomes(genomes, config):
+            features = np.array([genome_features(g, config, self.probes) for _, g in genomes])
+            if not self.trained:
+                selected, rest = list(range(len(genomes))), []
+                mean = std = None
+            else:
+                mean, std = self.model.predict(features)
+                order = list(np.argsort(-mean))
+                n_top = max(1, int(round(self.fraction * len(genomes))))
+                selected, rest = order[:n_top], order[n_top:]
+                n_explore = min(len(rest), int(round(self.explore * len(genomes))))
+                explored = self.rng.sample(rest, n_explore)
+                selected += explored
+                rest = [i for i in rest if i not in set(explored)]
+
+            eval_function([genomes[i] for i in selected], config)
+            for i in selected:
+                genome = genomes[i][1]
+                genome.surrogate = False
+                self.X.append(features[i])
+                self.y.append(genome.fitness)
+            # El filtro es un reporter y se serializa en cada checkpoint: solo lo que se usa
+            del self.X[:-self.max_samples]
+            del self.y[:-self.max_samples]
+
+            if rest:
+                floor = min(genomes[i][1].fitness for i in selected)
+                for i in rest:
+                    genome = genomes[i][1]
+                    genome.fitness = float(min(mean[i], floor))
+                    genome.surrogate = True
+                    genome.surrogate_std = float(std[i])
+            self._record(genomes, selected, rest, mean, std)
+            self._train()
+
+        eval_genomes.__name__ = getattr(eval_function, "__name__", "eval_genomes")
+        return eval_genomes
+
+    def _record(self, genomes, selected, rest, mean, std):
+        """Precisión de las predicciones sobre los genomas que sí se simularon."""
+        self.simulated_total += len(selected)
+        self.predicted_total += len(rest)
+        row = {"generation": self.generation, "simulated": len(selected), "predicted": len(rest),
+               "training_samples": len(self.y),
+               "spearman": float("nan"), "mae": float("nan"), "mean_std": float("nan")}
+        if mean is not None:
+            actual = np.array([genomes[i][1].fitness for i in selected])
+            row["spearman"] = _spearman(mean[selected], actual)
+            row["mae"] = float(np.abs(mean[selected] - actual).mean())
+            row["mean_std"] = float(std.mean())
+            print(f"🔮 Sustituto: {len(selected)} simulados, {len(rest)} predichos, "
+                  f"rho={row['spearman']:.2f}, MAE={row['mae']:.1f}")
+        self.history.append(row)
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([row[c] for c in CSV_COLUMNS])
@@ -0,0 +1,340 @@
+"""
+Registro local de ejecuciones en SQLite.
+
+Los entrenamientos acaban en carpetas con marca de tiempo
+(robobo_logs/<ts>/, neat_logs_2.1/<ts>/) con modelos, tensorboard,
+monitor.csv, evaluations.npz y pickles. Este registro guarda al empezar y al
+terminar cada ejecución sus hiperparámetros, el hash de la configuración, las
+rutas de los artefactos, las métricas finales y los tiempos de pared y de
+simulador, con índices para consultas del tipo "la mejor con gamma=0.9".
+
+Uso:
+    python registro.py list [--tipo ppo] [--param gamma=0.9]
+    python registro.py show <id>
+    python registro.py compare <id> <id> [...]
+    python registro.py best <métrica> [--tipo ppo] [--param gamma=0.9]
+    python registro.py index <carpeta_logs> [...]
+
+La base de datos por defecto es runs.sqlite junto a este fichero (o la ruta
+de la variable de entorno ROBOBO_REGISTRY).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+DEFAULT_PATH = os.environ.get(
+    "ROBOBO_REGISTRY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    log_dir TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    ended_at TEXT,
+    wall_time_s REAL,
+    sim_time_s REAL,
+    config_hash TEXT,
+    artifacts TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value TEXT,
+    value_num REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind ON runs(kind, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_hash ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS idx_params_lookup ON params(name, value, run_id);
+CREATE INDEX IF NOT EXISTS idx_params_num ON params(name, value_num, run_id);
+CREATE INDEX IF NOT EXISTS idx_metrics_lookup ON metrics(name, value, run_id);
+"""
+
+
+def config_hash(params, config_path=None):
+    """Hash estable de los hiperparámetros y, si hay, del fichero de configuración."""
+    h = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode())
+    if config_path is not None and os.path.exists(config_path):
+        with open(config_path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RunRegistry:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # --- Escritura ---
+
+    def start_run(self, kind, log_dir, params, config_path=None, artifacts=None):
+        """Registra el inicio de una ejecución y devuelve su id."""
+        log_dir = os.path.abspath(log_dir)
+        with self.conn:
+            # Volver a registrar una carpeta sustituye la entrada anterior
+            old = self.conn.execute("SELECT id FROM runs WHERE log_dir = ?", (log_dir,)).fetchone()
+            if old is not None:
+                for table, column in (("params", "run_id"), ("metrics", "run_id"), ("runs", "id")):
+                    self.conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (old["id"],))
+            cur = self.conn.execute(
+                "INSERT INTO runs (kind, log_dir, status, started_at, config_hash, artifacts) "
+                "VALUES (?, ?, 'en curso', ?, ?, ?)",
+                (kind, log_dir, datetime.now().isoformat(timespec="seconds"),
+                 config_hash(params, config_path), json.dumps(artifacts or {})))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO params (run_id, name, value, value_num) VALUES (?, ?, ?, ?)",
+                [(run_id, k, str(v), _as_number(v)) for k, v in params.items()])
+        return run_id
+
+    def end_run(self, run_id, status="completada", metrics=None, artifacts=None,
+                wall_time=None, sim_time=None):
+        """Registra el final de una ejecución con sus métricas y artefactos."""
+        row = self.conn.execute("SELECT started_at, artifacts FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if wall_time is None and row is not None:
+            wall_time = (datetime.now() - datetime.fromisoformat(row["started_at"])).total_seconds()
+        merged = json.loads(row["artifacts"] or "{}") if row is not None else {}
+        merged.update(artifacts or {})
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, ended_at = ?, wall_time_s = ?, sim_time_s = ?, artifacts = ? "
+                "WHERE id = ?",
+                (status, datetime.now().isoformat(timespec="seconds"), wall_time, sim_time,
+                 json.dumps(merged), run_id))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, k, _as_number(v)) for k, v in (metrics or {}).items()])
+
+    # --- Consultas ---
+
+    def find_runs(self, kind=None, params=None, metric=None, limit=None):
+        """
+        Ejecuciones que cumplen los filtros, ordenadas por `metric` (desc) si se indica.
+
+        Args:
+            kind: Tipo de ejecución ("ppo", "neat", ...)
+            params: {nombre: valor}; los valores numéricos se comparan como números
+        """
+        sql = "SELECT r.* FROM runs r"
+        args = []
+        where = []
+        if metric is not None:
+            sql += " JOIN metrics m ON m.run_id = r.id AND m.name = ?"
+            args.append(metric)
+        for i, (name, value) in enumerate((params or {}).items()):
+            num = _as_number(value)
+            if num is not None:
+                sql += f" JOIN params p{i} ON p{i}.run_id = r.id AND p{i}.name = ? AND p{i}.value_num = ?"
+                args += [name, num]
+            else:
+                sql += f" JOIN params p{i} ON p{i}.run_id = r.id AND p{i}.name = ? AND p{i}.value = ?"
+                args += [name, str(value)]
+        if kind is not None:
+            where.append("r.kind = ?")
+            args.append(kind)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.value DESC" if metric is not None else " ORDER BY r.started_at DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, args).fetchall()
+
+    def get_params(self, run_id):
+        return {r["name"]: r["value"] for r in
+                self.conn.execute("SELECT name, value FROM params WHERE run_id = ?", (run_id,))}
+
+    def get_metrics(self, run_id):
+        return {r["name"]: r["value"] for r in
+                self.conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,))}
+
+    def get_run(self, run_id):
+        return self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+
+def scan_log_dir(registry, log_dir):
+    """
+    Añade al registro una carpeta de ejecución antigua a partir de sus artefactos
+    (monitor.csv, evaluations.npz, modelos, stats.pkl). Devuelve None si la
+    carpeta no contiene nada reconocible.
+    """
+    log_dir = os.path.abspath(log_dir)
+    artifacts = {}
+    metrics = {}
+
+    monitor = os.path.join(log_dir, "monitor.csv")
+    if os.path.exists(monitor):
+        artifacts["monitor"] = monitor
+        rewards, lengths, times = [], [], []
+        with open(monitor) as f:
+            header = None
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                fields = line.strip().split(",")
+                if header is None:
+                    header = fields
+                    continue
+                row = dict(zip(header, fields))
+                rewards.append(float(row["r"]))
+                lengths.append(int(float(row["l"])))
+                times.append(float(row["t"]))
+        if rewards:
+            metrics["episodes"] = len(rewards)
+            metrics["mean_reward"] = sum(rewards) / len(rewards)
+            metrics["last_reward"] = rewards[-1]
+            metrics["total_steps"] = sum(lengths)
+            metrics["monitor_time_s"] = times[-1]
+
+    evaluations = os.path.join(log_dir, "evaluations.npz")
+    if os.path.exists(evaluations):
+        from eventos_tb import load_evaluations
+        artifacts["evaluations"] = evaluations
+        data = load_evaluations(evaluations)
+        if len(data["results"]):
+            metrics["best_mean_reward"] = float(data["results"].mean(axis=1).max())
+
+    models = sorted(glob.glob(os.path.join(log_dir, "**", "*.zip"), recursive=True))
+    models += sorted(glob.glob(os.path.join(log_dir, "**", "*.pkl"), recursive=True))
+    if models:
+        artifacts["models"] = models
+    from eventos_tb import find_event_files, load_run
+    tensorboard = find_event_files(log_dir)
+    if tensorboard:
+        artifacts["tensorboard"] = tensorboard
+        _, ep_rew_mean = load_run(log_dir, "rollout/ep_rew_mean")
+        if len(ep_rew_mean):
+            metrics["final_ep_rew_mean"] = float(ep_rew_mean[-1])
+
+    if not artifacts:
+        return None
+
+    kind = "neat" if glob.glob(os.path.join(log_dir, "**", "*genome*.pkl"), recursive=True) \
+        or glob.glob(os.path.join(log_dir, "**", "neat-checkpoint-*"), recursive=True) else "ppo"
+    started = datetime.fromtimestamp(os.path.getmtime(log_dir)).isoformat(timespec="seconds")
+
+    run_id = registry.start_run(kind, log_dir, {}, artifacts=artifacts)
+    with registry.conn:
+        registry.conn.execute("UPDATE runs SET started_at = ? WHERE id = ?", (started, run_id))
+    registry.end_run(run_id, status="importada", metrics=metrics)
+    # La fecha de fin real no se conoce: usar la duración de monitor.csv si la hay
+    with registry.conn:
+        registry.conn.execute("UPDATE runs SET ended_at = NULL, wall_time_s = ? WHERE id = ?",
+                              (metrics.get("monitor_time_s"), run_id))
+    return run_id
+
+
+def _parse_params(items):
+    params = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        params[name] = value
+    return params
+
+
+def _print_runs(rows, registry, metric=None):
+    print(f"{'id':>4}  {'tipo':<6}{'estado':<12}{'inicio':<21}{'pared s':>9}{'sim s':>9}  "
+          f"{metric or 'carpeta'}")
+    for r in rows:
+        extra = registry.get_metrics(r["id"]).get(metric) if metric else os.path.relpath(r["log_dir"])
+        wall = f"{r['wall_time_s']:.0f}" if r["wall_time_s"] is not None else "-"
+        sim = f"{r['sim_time_s']:.0f}" if r["sim_time_s"] is not None else "-"
+        print(f"{r['id']:>4}  {r['kind']:<6}{r['status']:<12}{r['started_at']:<21}{wall:>9}{sim:>9}  {extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registro de ejecuciones")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list")
+    p.add_argument("--tipo", default=None)
+    p.add_argument("--param", action="append", help="nombre=valor (se puede repetir)")
+
+    p = sub.add_parser("show")
+    p.add_argument("id", type=int)
+
+    p = sub.add_parser("compare")
+    p.add_argument("ids", type=int, nargs="+")
+
+    p = sub.add_parser("best")
+    p.add_argument("metric")
+    p.add_argument("--tipo", default=None)
+    p.add_argument("--param", action="append")
+    p.add_argument("-n", type=int, default=5)
+
+    p = sub.add_parser("index", help="Importar carpetas de ejecuciones ya existentes")
+    p.add_argument("dirs", nargs="+", help="Carpetas tipo robobo_logs/ o neat_logs_2.1/")
+
+    args = parser.parse_args()
+    registry = RunRegistry(args.db)
+
+    if args.command == "list":
+        _print_runs(registry.find_runs(args.tipo, _parse_params(args.param)), registry)
+    elif args.command == "best":
+        _print_runs(registry.find_runs(args.tipo, _parse_params(args.param), args.metric, args.n),
+                    registry, args.metric)
+    elif args.command == "show":
+        run = registry.get_run(args.id)
+        if run is None:
+            print(f"No existe la ejecución {args.id}")
+            raise SystemExit(1)
+        for key in run.keys():
+            value = run[key]
+            if key == "artifacts":
+                value = json.dumps(json.loads(value or "{}"), indent=2)
+            print(f"{key}: {value}")
+        print("params:", json.dumps(registry.get_params(args.id), indent=2))
+        print("metrics:", json.dumps(registry.get_metrics(args.id), indent=2))
+    elif args.command == "compare":
+        params = {i: registry.get_params(i) for i in args.ids}
+        metrics = {i: registry.get_metrics(i) for i in args.ids}
+        names = sorted({k for p in params.values() for k in p})
+        metric_names = sorted({k for m in metrics.values() for k in m})
+        print(f"{'':<24}" + "".join(f"{i:>14}" for i in args.ids))
+        for name in names:
+            values = [params[i].get(name, "-") for i in args.ids]
+            # Marcar los parámetros que difieren
+            mark = "*" if len(set(values)) > 1 else " "
+            print(f"{mark}{name:<23}" + "".join(f"{str(v):>14}" for v in values))
+        for name in metric_names:
+            values = [metrics[i].get(name) for i in args.ids]
+            print(f" {name:<23}" + "".join(f"{v:>14.3f}" if v is not None else f"{'-':>14}" for v in values))
+    elif args.command == "index":
+        start = time.time()
+        count = 0
+        for root in args.dirs:
+            for log_dir in sorted(glob.glob(os.path.join(root, "*"))):
+                if os.path.isdir(log_dir):
+                    run_id = scan_log_dir(registry, log_dir)
+                    if run_id is not None:
+                        print(f"{run_id:>4}  {log_dir}")
+                        count += 1
+        print(f"{count} ejecuciones importadas en {time.time() - start:.1f} s")
+    registry.close()
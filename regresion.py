@@ -0,0 +1,189 @@
+"""
+Pruebas de regresión de políticas sin simulador.
+
+Reproduce secuencias de observaciones grabadas con trayectorias.py a través
+de un genoma NEAT (neat.nn.FeedForwardNetwork) o de una política PPO (.zip de
+SB3 o .npz exportado con entrega_1/exportar_politica.py), compara las acciones
+elegidas con una línea base guardada e informa de las divergencias.
+
+Uso:
+    python regresion.py baseline <dir_trayectorias> <politica> <baseline.npz> [--max-pasos N]
+    python regresion.py check <baseline.npz> <politica> [--tolerancia 0.0]
+    python regresion.py check <dir_trayectorias> <politica> --grabadas
+
+<politica> puede ser un genoma .pkl, un modelo PPO .zip o una política .npz.
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_NEAT_CONFIG = os.path.join(ROOT_DIR, "practica2", "config-feedforward")
+
+
+class NeatPolicy:
+    """Política a partir de un genoma NEAT: argmax de las salidas de la red."""
+
+    def __init__(self, genome, config):
+        import neat
+        self.net = neat.nn.FeedForwardNetwork.create(genome, config)
+
+    def actions(self, observations):
+        return np.array([np.argmax(self.net.activate(obs)) for obs in observations], dtype=np.int64)
+
+
+class PPOPolicy:
+    """Política PPO (SB3 o NumpyPolicy) evaluada en un solo lote."""
+
+    def __init__(self, model, discrete):
+        self.model = model
+        self.discrete = discrete
+
+    def actions(self, observations):
+        obs = np.asarray(observations)
+        if self.discrete:
+            obs = obs.reshape(-1).astype(np.int64)
+        actions, _ = self.model.predict(obs, deterministic=True)
+        return np.asarray(actions, dtype=np.int64).reshape(-1)
+
+
+def load_policy(path, neat_config=DEFAULT_NEAT_CONFIG):
+    """Carga la política según la extensión del fichero."""
+    if path.endswith(".pkl"):
+        import neat
+        config = neat.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            neat_config
+        )
+        with open(path, "rb") as f:
+            genome = pickle.load(f)
+        return NeatPolicy(genome, config)
+
+    sys.path.insert(0, os.path.join(ROOT_DIR, "entrega_1"))
+    if path.endswith(".npz"):
+        from politica_numpy import NumpyPolicy
+        model = NumpyPolicy(path)
+        return PPOPolicy(model, discrete=model.obs_n > 0)
+
+    from gymnasium import spaces
+    from stable_baselines3 import PPO
+    model = PPO.load(path, device="cpu")
+    return PPOPolicy(model, discrete=isinstance(model.observation_space, spaces.Discrete))
+
+
+def obs_hash(observations):
+    return hashlib.sha1(np.ascontiguousarray(observations).tobytes()).hexdigest()
+
+
+def load_recorded(directory, max_steps=None):
+    """Observaciones, episodio/paso y acciones grabadas de un directorio de trayectorias."""
+    from trayectorias import TrajectoryStore
+    store = TrajectoryStore(directory)
+    n = len(store) if max_steps is None else min(max_steps, len(store))
+    return {
+        "obs": store.rows(0, n, "obs"),
+        "episode": store.rows(0, n, "episode"),
+        "step": store.rows(0, n, "step"),
+        "actions": store.rows(0, n, "action").astype(np.int64),
+    }
+
+
+def create_baseline(directory, policy, output, max_steps=None):
+    """Guarda las acciones de `policy` sobre las observaciones grabadas."""
+    data = load_recorded(directory, max_steps)
+    actions = policy.actions(data["obs"])
+    np.savez_compressed(
+        output,
+        obs=data["obs"],
+        episode=data["episode"],
+        step=data["step"],
+        actions=actions,
+        obs_sha1=np.array(obs_hash(data["obs"])),
+    )
+    print(f"Línea base guardada en {output} ({len(actions)} pasos)")
+    return output
+
+
+def compare(expected, got, episode, step, observations, max_report=10):
+    """
+    Compara acciones y muestra un informe de divergencias.
+
+    Returns:
+        Fracción de pasos en los que la acción difiere
+    """
+    diff = np.flatnonzero(expected != got)
+    rate = len(diff) / len(expected) if len(expected) else 0.0
+
+    print(f"\n{'='*50}")
+    print("REGRESIÓN DE POLÍTICA")
+    print(f"{'='*50}")
+    print(f"Pasos comparados: {len(expected)}")
+    print(f"Divergencias: {len(diff)} ({rate * 100:.2f}%)")
+
+    if len(diff):
+        episodes, counts = np.unique(episode[diff], return_counts=True)
+        print(f"Episodios afectados: {len(episodes)}")
+        for ep, c in sorted(zip(episodes, counts), key=lambda x: -x[1])[:5]:
+            print(f"  - episodio {ep}: {c} pasos")
+        print(f"\nPrimeras {min(max_report, len(diff))} divergencias:")
+        for i in diff[:max_report]:
+            print(f"  ep {episode[i]} paso {step[i]}: esperada {expected[i]}, "
+                  f"obtenida {got[i]} - obs {np.round(observations[i], 2).tolist()}")
+    return rate
+
+
+def check_baseline(baseline_path, policy):
+    data = np.load(baseline_path)
+    if obs_hash(data["obs"]) != str(data["obs_sha1"]):
+        print("Aviso: las observaciones de la línea base no coinciden con su hash")
+    got = policy.actions(data["obs"])
+    return compare(data["actions"], got, data["episode"], data["step"], data["obs"])
+
+
+def check_recorded(directory, policy, max_steps=None):
+    """Compara contra las acciones que se tomaron realmente al grabar."""
+    data = load_recorded(directory, max_steps)
+    got = policy.actions(data["obs"])
+    return compare(data["actions"], got, data["episode"], data["step"], data["obs"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regresión de políticas con observaciones grabadas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("baseline")
+    p.add_argument("trayectorias")
+    p.add_argument("politica")
+    p.add_argument("salida")
+    p.add_argument("--max-pasos", type=int, default=None)
+    p.add_argument("--config", default=DEFAULT_NEAT_CONFIG)
+
+    p = sub.add_parser("check")
+    p.add_argument("referencia", help="baseline.npz o directorio de trayectorias con --grabadas")
+    p.add_argument("politica")
+    p.add_argument("--grabadas", action="store_true", help="Comparar con las acciones grabadas")
+    p.add_argument("--tolerancia", type=float, default=0.0, help="Fracción de divergencias admitida")
+    p.add_argument("--max-pasos", type=int, default=None)
+    p.add_argument("--config", default=DEFAULT_NEAT_CONFIG)
+
+    args = parser.parse_args()
+    policy = load_policy(args.politica, args.config)
+
+    if args.command == "baseline":
+        create_baseline(args.trayectorias, policy, args.salida, args.max_pasos)
+    else:
+        if args.grabadas:
+            rate = check_recorded(args.referencia, policy, args.max_pasos)
+        else:
+            rate = check_baseline(args.referencia, policy)
+        ok = rate <= args.tolerancia
+        print(f"\n{'OK' if ok else 'FALLO'}: divergencia {rate * 100:.2f}% "
+              f"(tolerancia {args.tolerancia * 100:.2f}%)")
+        sys.exit(0 if ok else 1)
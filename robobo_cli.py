@@ -0,0 +1,244 @@
+"""
+Punto de entrada único para entrenar, probar y graficar.
+
+Cada subcomando importa solo los módulos pesados que necesita (torch,
+stable_baselines3, neat, matplotlib, robobopy...), así que arrancar un
+`test-neat` rápido no paga el coste de importar SB3 ni matplotlib.
+
+Uso:
+    python robobo_cli.py train-ppo
+    python robobo_cli.py test-ppo <modelo.zip|modelo.npz> [-n EPISODIOS]
+    python robobo_cli.py evolve [-g GENERACIONES] [--config RUTA] [--cached-speciation] [--array-reproduction]
+                                [--resume CHECKPOINT] [--tabla-sensores DIR [--objetivo-visible] [--procesos N]]
+                                [--sustituto FRACCION]
+    python robobo_cli.py test-neat <genoma.pkl> [-n EPISODIOS] [--lotes [--hosts H ...] [--tabla-sensores DIR --robots N]]
+    python robobo_cli.py plot <monitor.csv|stats.pkl>
+    python robobo_cli.py profile-imports <subcomando> [--top N]
+"""
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PPO_DIR = os.path.join(ROOT_DIR, "entrega_1")
+NEAT_DIR = os.path.join(ROOT_DIR, "practica2")
+
+
+def _add_path(path):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+# Importaciones de cada subcomando. Se separan de la ejecución para poder
+# medir el tiempo de arranque en frío con `profile-imports`.
+
+def _imports_train_ppo():
+    _add_path(PPO_DIR)
+    import stable_baselines3  # noqa: F401
+    import main  # noqa: F401
+
+
+def _imports_test_ppo():
+    _add_path(PPO_DIR)
+    import test
+    return test
+
+
+def _imports_evolve():
+    _add_path(NEAT_DIR)
+    import neat_train
+    return neat_train
+
+
+def _imports_test_neat():
+    _add_path(NEAT_DIR)
+    import neat_test
+    return neat_test
+
+
+def _imports_plot():
+    _add_path(ROOT_DIR)
+    import visualize
+    return visualize
+
+
+IMPORTERS = {
+    "train-ppo": _imports_train_ppo,
+    "test-ppo": _imports_test_ppo,
+    "evolve": _imports_evolve,
+    "test-neat": _imports_test_neat,
+    "plot": _imports_plot,
+}
+
+
+def cmd_train_ppo(args):
+    import runpy
+    _imports_train_ppo()
+    runpy.run_path(os.path.join(PPO_DIR, "ppo.py"), run_name="__main__")
+
+
+def cmd_test_ppo(args):
+    test = _imports_test_ppo()
+    test.test_model(args.model, n_episodes=args.episodes, render=not args.quiet)
+
+
+def cmd_evolve(args):
+    neat_train = _imports_evolve()
+    if args.procesos > 1 and not args.objetivo_visible:
+        sys.exit("--procesos solo reparte la evaluación desde una instantánea: úsalo con --objetivo-visible")
+    snapshot = None
+    if args.objetivo_visible:
+        if args.tabla_sensores is None:
+            sys.exit("--objetivo-visible necesita --tabla-sensores (RoboboSim no guarda su estado)")
+        from tablas_sensores import table_backend
+        env = neat_train.RoboboNEATEnv(max_steps=50, backend=table_backend(args.tabla_sensores, seed=0))
+        snapshot = neat_train.snapshot_target_in_view(env)
+        env.close()
+    neat_train.run_neat(args.config, generations=args.generations,
+                        cached_speciation=args.cached_speciation,
+                        array_reproduction=args.array_reproduction, resume=args.resume,
+                        sensor_table_dir=args.tabla_sensores, snapshot=snapshot, workers=args.procesos,
+                        surrogate_fraction=args.sustituto)
+
+
+def cmd_test_neat(args):
+    neat_test = _imports_test_neat()
+    if args.lotes:
+        neat_test.test_genome_batched(args.genome, args.episodes, hosts=args.hosts,
+                                      sensor_table=args.tabla_sensores, robots=args.robots)
+    else:
+        neat_test.test_genome_simple(args.genome, args.episodes)
+
+
+def cmd_plot(args):
+    if args.path.endswith(".csv"):
+        _add_path(os.path.join(PPO_DIR, "modelo"))
+        import sacargrafica
+        sacargrafica.plot_monitor(args.path)
+        return
+
+    import pickle
+    visualize = _imports_plot()
+    with open(args.path, "rb") as f:
+        stats = pickle.load(f)
+    out_dir = os.path.dirname(os.path.abspath(args.path))
+    visualize.plot_stats(stats, view=args.view, filename=os.path.join(out_dir, "avg_fitness.svg"))
+    visualize.plot_species(stats, view=args.view, filename=os.path.join(out_dir, "speciation.svg"))
+    print(f"Gráficas guardadas en {out_dir}")
+
+
+def parse_importtime(stderr):
+    """
+    Interpreta la salida de `python -X importtime`.
+
+    Returns:
+        Lista de (módulo, self_us, cumulative_us) en el orden en que se importaron
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        # Tras la barra hay un espacio; la sangría extra indica el nivel de anidamiento
+        rows.append((fields[2][1:].rstrip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def cmd_profile_imports(args):
+    """Mide en un proceso nuevo el coste de importar lo que usa un subcomando."""
+    import subprocess
+    import time
+
+    code = f"import robobo_cli; robobo_cli.IMPORTERS[{args.target!r}]()"
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+
+    rows = parse_importtime(result.stderr)
+    # Los módulos de primer nivel (sin sangría) suman el total
+    top_level = [r for r in rows if not r[0].startswith(" ")]
+    total_us = sum(r[2] for r in top_level)
+
+    print(f"\nPerfil de importación para '{args.target}'")
+    print(f"{'='*50}")
+    print(f"Tiempo total de importación: {total_us / 1000:.1f} ms")
+    print(f"Arranque del proceso (pared): {wall * 1000:.1f} ms")
+    print(f"Módulos importados: {len(rows)}")
+    print(f"\nTop {args.top} por tiempo acumulado:")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cum_us / 1000:9.1f} ms  {name.strip()}")
+
+    if result.returncode != 0:
+        print("\nAviso: la importación falló:")
+        print(result.stderr.strip().splitlines()[-1])
+    return total_us
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Herramientas de entrenamiento y prueba de Robobo")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train-ppo", help="Entrenar PPO (entrega_1/ppo.py)")
+    p.set_defaults(func=cmd_train_ppo)
+
+    p = sub.add_parser("test-ppo", help="Probar un modelo PPO")
+    p.add_argument("model")
+    p.add_argument("-n", "--episodes", type=int, default=5)
+    p.add_argument("-q", "--quiet", action="store_true", help="No llamar a env.render()")
+    p.set_defaults(func=cmd_test_ppo)
+
+    p = sub.add_parser("evolve", help="Entrenar con NEAT (practica2/neat_train.py)")
+    p.add_argument("-g", "--generations", type=int, default=10)
+    p.add_argument("--config", default=os.path.join(NEAT_DIR, "config-feedforward"))
+    p.add_argument("--cached-speciation", action="store_true",
+                   help="Especiación con caché de distancias (practica2/especiacion.py)")
+    p.add_argument("--array-reproduction", action="store_true",
+                   help="Cruce y mutación en bloque con genomas en arrays (practica2/genoma_arrays.py)")
+    p.add_argument("--resume", metavar="CHECKPOINT",
+                   help="Reanudar desde un neat-checkpoint-* sin repetir las evaluaciones del diario")
+    p.add_argument("--tabla-sensores", metavar="DIR",
+                   help="Evaluar con una tabla de sensores precalculada (tablas_sensores.py) en vez del simulador")
+    p.add_argument("--objetivo-visible", action="store_true",
+                   help="Evaluar todos los genomas desde una instantánea con el cilindro ya a la vista")
+    p.add_argument("--procesos", type=int, default=1,
+                   help="Procesos que evalúan en paralelo desde la instantánea")
+    p.add_argument("--sustituto", type=float, metavar="FRACCION",
+                   help="Simular solo esta fracción de cada generación según un modelo sustituto (practica2/sustituto.py)")
+    p.set_defaults(func=cmd_evolve)
+
+    p = sub.add_parser("test-neat", help="Probar un genoma NEAT")
+    p.add_argument("genome")
+    p.add_argument("-n", "--episodes", type=int, default=3)
+    p.add_argument("--lotes", action="store_true",
+                   help="Varios robots a la vez con la red evaluada por lotes (evaluacion_lotes.py)")
+    p.add_argument("--hosts", nargs="+", default=["localhost"], help="Un RoboboSim por robot (con --lotes)")
+    p.add_argument("--tabla-sensores", metavar="DIR",
+                   help="Con --lotes, robots locales con una tabla de tablas_sensores.py")
+    p.add_argument("--robots", type=int, default=4, help="Robots locales con --tabla-sensores")
+    p.set_defaults(func=cmd_test_neat)
+
+    p = sub.add_parser("plot", help="Graficar un monitor.csv o un stats.pkl de NEAT")
+    p.add_argument("path")
+    p.add_argument("--view", action="store_true")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser("profile-imports", help="Medir el tiempo de importación de un subcomando")
+    p.add_argument("target", choices=sorted(IMPORTERS))
+    p.add_argument("--top", type=int, default=15)
+    p.set_defaults(func=cmd_profile_imports)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,584 @@
+"""
+Servidor websocket que imita a Robobo y RoboboSim para pruebas locales.
+
+Habla lo suficiente del protocolo remoto para que robobopy.Robobo y
+robobosim.RoboboSim se conecten sin cambios (y con ellos RoboboEnv y
+RoboboNEATEnv):
+
+    Robobo     ws://<host>:40404 (+10 por robot_id)  MOVE(-BLOCKING), MOVETILT(-BLOCKING),
+               MOVEPAN(-BLOCKING), CONFIGURE-BLOBTRACKING...; envía IRS, BLOB, WHEELS,
+               PAN, TILT y los UNLOCK-* de las órdenes bloqueantes
+    RoboboSim  ws://<host>:50505                     RESET-SIM, SIM-LOCATION-SET; envía SIM-LOCATION
+
+Los sensores salen de un modelo sencillo (robot diferencial en una arena con
+el cilindro rojo) o de un guion: un directorio grabado con trayectorias.py
+cuyos pasos se reproducen en orden (un episodio por RESET-SIM).
+
+Cada dirección local es un mundo independiente: los entornos que se conectan
+a 127.0.0.1, 127.0.0.2... no se molestan entre sí, lo que permite lanzar
+muchos entornos a la vez contra un solo servidor. La latencia y el jitter se
+aplican a cada mensaje que envía el servidor; --escala-tiempo decide si las
+órdenes con duración (moveWheelsByTime) esperan su tiempo real (1), una
+fracción o nada (0).
+
+No depende de ninguna librería de websockets: el protocolo (RFC 6455) se
+implementa sobre asyncio.
+
+Uso:
+    python simulador_falso.py servir [--guion DIR] [--latencia 5] [--jitter 2] [--escala-tiempo 0]
+    python simulador_falso.py carga [--envs 16] [--pasos 50] [--latencia 5] [--jitter 2]
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROBOBO_PORT = 40404
+SIM_PORT = 50505
+UNLOCK_DELAY = 0.05     # Segundos mínimos antes de UNLOCK-MOVE/TILT/PAN (ver FakeRoboboServer._unlock)
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+IR_NAMES = ("Back-R", "Back-C", "Front-R", "Front-RR", "Front-C", "Front-L", "Front-LL", "Back-L")
+BLOB_COLORS = ("red", "green", "blue", "custom")
+
+
+# --- Websocket mínimo (lado servidor) ---
+
+async def _handshake(reader, writer):
+    request = await reader.readuntil(b"\r\n\r\n")
+    headers = {}
+    for line in request.decode("latin-1").split("\r\n")[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    accept = base64.b64encode(hashlib.sha1(headers["sec-websocket-key"].encode() + WS_GUID).digest())
+    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+    await writer.drain()
+
+
+async def _read_message(reader, writer):
+    """Siguiente mensaje de texto/binario; None si el cliente cierra."""
+    fragments = []
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        opcode = b1 & 0x0F
+        length = b2 & 0x7F
+        if length == 126:
+            (length,) = struct.unpack(">H", await reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack(">Q", await reader.readexactly(8))
+        mask = await reader.readexactly(4) if b2 & 0x80 else b"\0\0\0\0"
+        data = await reader.readexactly(length)
+        if length:
+            mask_array = np.frombuffer((mask * (length // 4 + 1))[:length], dtype=np.uint8)
+            data = (np.frombuffer(data, dtype=np.uint8) ^ mask_array).tobytes()
+        if opcode == 0x8:      # close
+            writer.write(_frame(data[:2], 0x8))
+            return None
+        if opcode == 0x9:      # ping
+            writer.write(_frame(data, 0xA))
+            continue
+        if opcode == 0xA:      # pong
+            continue
+        fragments.append(data)
+        if b1 & 0x80:
+            return b"".join(fragments).decode("utf-8")
+
+
+def _frame(payload, opcode=0x1):
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        header = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+# --- Mundos ---
+
+class ModelWorld:
+    """
+    Robot diferencial en una arena cuadrada (cm) con el cilindro rojo en
+    `target`. Los IR frontales miden la distancia a paredes y cilindro a lo
+    largo de su dirección; el blob rojo sale del ángulo y la distancia al
+    cilindro dentro del campo de visión de la cámara.
+    """
+
+    ARENA = 100.0           # Semilado de la arena
+    TARGET_RADIUS = 8.0
+    ROBOT_RADIUS = 8.0
+    SPEED_SCALE = 0.6       # cm/s por unidad de velocidad de rueda
+    WHEEL_BASE = 12.0
+    FOV = 30.0              # Semiapertura de la cámara (grados)
+    # Ángulo de cada IR respecto al rumbo (positivo = a la derecha)
+    IR_ANGLES = {"Front-C": 0.0, "Front-L": -25.0, "Front-R": 25.0, "Front-LL": -50.0, "Front-RR": 50.0,
+                 "Back-C": 180.0, "Back-L": -155.0, "Back-R": 155.0}
+
+    def __init__(self, rng, target=(0.0, 60.0)):
+        self.rng = rng
+        self.target = np.array(target)
+        self.pan = 0
+        self.tilt = 90
+        self.wheel_pos = [0, 0]
+        self.reset()
+
+    def reset(self):
+        self.position = np.array([self.rng.uniform(-20, 20), self.rng.uniform(-70, -50)])
+        self.heading = self.rng.uniform(-30, 30)   # Grados; 0 mira hacia +z
+        self.wheel_speed = [0, 0]
+
+    def get_state(self):
+        """Estado completo del mundo (se puede serializar con pickle)."""
+        return {"position": self.position.tolist(), "heading": self.heading, "pan": self.pan,
+                "tilt": self.tilt, "wheel_pos": list(self.wheel_pos), "wheel_speed": list(self.wheel_speed),
+                "rng": self.rng.getstate()}
+
+    def set_state(self, state):
+        self.position = np.array(state["position"], dtype=float)
+        self.heading = state["heading"]
+        self.pan = state["pan"]
+        self.tilt = state["tilt"]
+        self.wheel_pos = list(state["wheel_pos"])
+        self.wheel_speed = list(state["wheel_speed"])
+        self.rng.setstate(state["rng"])
+
+    def set_location(self, position, rotation):
+        if position:
+            self.position = np.array([float(position.get("x", self.position[0])),
+                                      float(position.get("z", self.position[1]))])
+        if rotation and "y" in rotation:
+            self.heading = float(rotation["y"])
+
+    def move(self, lspeed, rspeed, duration):
+        steps = max(1, int(duration * 20))
+        dt = duration / steps
+        for _ in range(steps):
+            v = (lspeed + rspeed) / 2 * self.SPEED_SCALE
+            # Rueda izquierda más rápida: giro a la derecha (rumbo creciente, hacia +x)
+            omega = math.degrees((lspeed - rspeed) * self.SPEED_SCALE / self.WHEEL_BASE)
+            self.heading = (self.heading + omega * dt + 180) % 360 - 180
+            rad = math.radians(self.heading)
+            new = self.position + v * dt * np.array([math.sin(rad), math.cos(rad)])
+            limit = self.ARENA - self.ROBOT_RADIUS
+            new = np.clip(new, -limit, limit)
+            if np.linalg.norm(new - self.target) >= self.TARGET_RADIUS + self.ROBOT_RADIUS:
+                self.position = new
+        self.wheel_pos[0] += int(lspeed * duration * 10)
+        self.wheel_pos[1] += int(rspeed * duration * 10)
+
+    @classmethod
+    def sensor_model(cls, x, z, heading, pan, target=(0.0, 60.0)):
+        """
+        Lecturas del modelo para poses dadas como arrays (con broadcasting).
+
+        Returns:
+            {nombre del IR: valor, "bearing": ángulo del cilindro respecto a la
+             cámara (grados), "distance": distancia al borde del cilindro}
+        """
+        x, z, heading, pan = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (x, z, heading, pan)))
+        dx, dz = target[0] - x, target[1] - z
+        r2 = cls.TARGET_RADIUS ** 2
+        readings = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for name, angle in cls.IR_ANGLES.items():
+                # Distancia desde el borde del robot al primer obstáculo en la dirección del IR
+                rad = np.radians(heading + angle)
+                sx, sz = np.sin(rad), np.cos(rad)
+                wall_x = np.where(np.abs(sx) > 1e-9, (np.copysign(cls.ARENA, sx) - x) / sx, np.inf)
+                wall_z = np.where(np.abs(sz) > 1e-9, (np.copysign(cls.ARENA, sz) - z) / sz, np.inf)
+                along = dx * sx + dz * sz
+                perp2 = dx * dx + dz * dz - along ** 2
+                hit = (along > 0) & (perp2 < r2)
+                to_target = np.where(hit, along - np.sqrt(np.maximum(r2 - perp2, 0.0)), np.inf)
+                distance = np.maximum(0.0, np.minimum(np.minimum(wall_x, wall_z), to_target) - cls.ROBOT_RADIUS)
+                readings[name] = np.minimum(2000.0, 2000.0 * np.exp(-distance / 5.0))
+        readings["bearing"] = (np.degrees(np.arctan2(dx, dz)) - (heading + pan) + 180) % 360 - 180
+        readings["distance"] = np.maximum(1.0, np.hypot(dx, dz) - cls.TARGET_RADIUS)
+        return readings
+
+    @classmethod
+    def blob_reading(cls, bearing, distance):
+        """(posx, posy, size) del blob rojo a partir del ángulo y la distancia al cilindro."""
+        visible = np.abs(bearing) <= cls.FOV
+        posx = np.where(visible, np.round(50 + 50 * bearing / cls.FOV), 0)
+        size = np.where(visible, np.minimum(20000.0, 60000.0 / np.maximum(distance, 1.0) ** 1.5), 0)
+        return posx, np.where(visible, 50, 0), size
+
+    def _model(self):
+        return self.sensor_model(self.position[0], self.position[1], self.heading, self.pan, self.target)
+
+    def irs(self):
+        readings = self._model()
+        return {name: int(readings[name]) for name in self.IR_ANGLES}
+
+    def blob(self):
+        readings = self._model()
+        posx, posy, size = self.blob_reading(readings["bearing"], readings["distance"])
+        return {"posx": int(posx), "posy": int(posy), "size": int(size)}
+
+    def location(self):
+        return {"x": float(self.position[0]), "y": 0.0, "z": float(self.position[1]),
+                "ry": float(self.heading)}
+
+
+class ScriptedWorld(ModelWorld):
+    """
+    Reproduce los sensores grabados con trayectorias.py: cada movimiento
+    avanza un paso y cada reset salta al principio del siguiente episodio.
+    La pose se sigue integrando con el modelo para SIM-LOCATION.
+    """
+
+    def __init__(self, rng, store):
+        self.store = store
+        self.episodes = np.asarray(store.column("episode"))
+        self.starts = np.flatnonzero(np.r_[True, self.episodes[1:] != self.episodes[:-1]])
+        self.episode = -1
+        self.sensors = {key: np.asarray(store.sensor(key)) for key in
+                        ("blob_posx", "blob_size", "ir_front_c", "ir_front_l", "ir_front_r")
+                        if key in store.sensor_keys}
+        super().__init__(rng)
+        # ModelWorld.__init__ ya llama a reset: el primer RESET-SIM del entorno debe caer en el episodio 0
+        self.episode = -1
+        self.row = 0
+
+    def reset(self):
+        super().reset()
+        self.episode = (self.episode + 1) % len(self.starts)
+        self.row = int(self.starts[self.episode])
+
+    def move(self, lspeed, rspeed, duration):
+        super().move(lspeed, rspeed, duration)
+        if self.row + 1 < len(self.episodes) and self.episodes[self.row + 1] == self.episodes[self.row]:
+            self.row += 1
+
+    def _value(self, key, default):
+        column = self.sensors.get(key)
+        return default if column is None else float(column[self.row])
+
+    def irs(self):
+        irs = super().irs()
+        irs["Front-C"] = int(self._value("ir_front_c", irs["Front-C"]))
+        irs["Front-L"] = int(self._value("ir_front_l", irs["Front-L"]))
+        irs["Front-R"] = int(self._value("ir_front_r", irs["Front-R"]))
+        return irs
+
+    def blob(self):
+        size = int(self._value("blob_size", 0))
+        return {"posx": int(self._value("blob_posx", 0)) if size > 0 else 0, "posy": 50, "size": size}
+
+
+# --- Servidor ---
+
+class FakeRoboboServer:
+    """
+    Args:
+        host: Dirección de escucha (0.0.0.0 para aceptar 127.0.0.x)
+        script: Directorio de trayectorias.py a reproducir (None = modelo)
+        latency, jitter: Retraso de cada envío y su variación uniforme (s)
+        time_scale: Fracción del tiempo real que duran las órdenes con duración
+        status_hz: Frecuencia de envío periódico del estado (0 = solo tras cada orden)
+        n_robots: Puertos de Robobo que se abren (40404, 40414, ...)
+    """
+
+    def __init__(self, host="0.0.0.0", script=None, latency=0.0, jitter=0.0, time_scale=0.0,
+                 status_hz=10.0, n_robots=1, robobo_port=ROBOBO_PORT, sim_port=SIM_PORT, seed=0):
+        self.host = host
+        self.latency = latency
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self.status_hz = status_hz
+        self.n_robots = n_robots
+        self.robobo_port = robobo_port
+        self.sim_port = sim_port
+        self.rng = random.Random(seed)
+        self.store = None
+        if script is not None:
+            sys.path.insert(0, ROOT_DIR)
+            from trayectorias import TrajectoryStore
+            self.store = TrajectoryStore(script)
+        self.worlds = {}        # (dirección, robot) -> mundo
+        self.sim_clients = {}   # dirección -> [writer]
+        self.messages_in = 0
+        self.messages_out = 0
+        self.servers = []
+
+    def world(self, address, robot_id):
+        key = (address, robot_id)
+        if key not in self.worlds:
+            rng = random.Random(self.rng.random())
+            self.worlds[key] = ScriptedWorld(rng, self.store) if self.store is not None else ModelWorld(rng)
+        return self.worlds[key]
+
+    async def _send(self, writer, messages):
+        """Envía varios mensajes de estado juntos tras la latencia configurada."""
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if writer.is_closing():
+            return
+        writer.write(b"".join(_frame(json.dumps({"name": name, "value": value})) for name, value in messages))
+        self.messages_out += len(messages)
+        await writer.drain()
+
+    @staticmethod
+    def _status(world):
+        irs = world.irs()
+        blob = world.blob()
+        messages = [("IRS", {name: str(irs.get(name, 0)) for name in IR_NAMES})]
+        messages += [("BLOB", {"color": color, "posx": blob["posx"] if color == "red" else 0, "posy": blob["posy"]
+                               if color == "red" else 0, "size": blob["size"] if color == "red" else 0})
+                     for color in BLOB_COLORS]
+        messages += [("WHEELS", {"wheelPosR": world.wheel_pos[1], "wheelPosL": world.wheel_pos[0],
+                                 "wheelSpeedR": world.wheel_speed[1], "wheelSpeedL": world.wheel_speed[0]}),
+                     ("PAN", {"panPos": world.pan + 180}),
+                     ("TILT", {"tiltPos": world.tilt})]
+        return messages
+
+    async def _push_locations(self, address):
+        for writer in list(self.sim_clients.get(address, [])):
+            messages = []
+            for (addr, robot_id), world in self.worlds.items():
+                if addr == address:
+                    loc = world.location()
+                    messages.append(("SIM-LOCATION", {"id": robot_id, "tx": loc["x"], "ty": loc["y"], "tz": loc["z"],
+                                                      "rx": 0.0, "ry": loc["ry"], "rz": 0.0}))
+            if messages:
+                await self._send(writer, messages)
+
+    async def _duration(self, seconds):
+        if self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    async def _unlock(self, writer, name, blockid):
+        """
+        Desbloqueo de una orden bloqueante. robobopy activa wheelLock/tiltLock
+        después de enviar la orden: si el desbloqueo llega antes, se queda
+        esperando para siempre, así que nunca se responde antes de UNLOCK_DELAY.
+        """
+        await asyncio.sleep(UNLOCK_DELAY)
+        await self._send(writer, [(name, {"blockid": blockid})])
+
+    async def _robobo_command(self, world, address, writer, msg):
+        name = msg.get("name")
+        params = msg.get("parameters", {})
+        if name in ("MOVE", "MOVE-BLOCKING"):
+            lspeed, rspeed, duration = int(params["lspeed"]), int(params["rspeed"]), float(params["time"])
+            world.wheel_speed = [lspeed, rspeed]
+            await self._duration(duration)
+            world.move(lspeed, rspeed, duration)
+            world.wheel_speed = [0, 0]
+            # El estado va antes del desbloqueo: al volver moveWheelsByTime ya está actualizado
+            await self._send(writer, self._status(world))
+            await self._push_locations(address)
+            if name == "MOVE-BLOCKING":
+                await self._unlock(writer, "UNLOCK-MOVE", params.get("blockid", msg.get("id")))
+        elif name in ("MOVETILT", "MOVETILT-BLOCKING"):
+            world.tilt = int(params["pos"])
+            await self._send(writer, [("TILT", {"tiltPos": world.tilt})])
+            if name.endswith("BLOCKING"):
+                await self._unlock(writer, "UNLOCK-TILT", params.get("blockid"))
+        elif name in ("MOVEPAN", "MOVEPAN-BLOCKING"):
+            world.pan = int(params["pos"]) - 180
+            await self._send(writer, [("PAN", {"panPos": world.pan + 180})])
+            if name.endswith("BLOCKING"):
+                await self._unlock(writer, "UNLOCK-PAN", params.get("blockid"))
+        # El resto de órdenes (LEDs, blobs, cámara...) no cambian los sensores simulados
+
+    async def _session(self, reader, writer, on_message, on_open=None):
+        try:
+            await _handshake(reader, writer)
+            password = await _read_message(reader, writer)
+            if password is None:
+                return
+            if on_open is not None:
+                await on_open()
+            while True:
+                text = await _read_message(reader, writer)
+                if text is None:
+                    return
+                self.messages_in += 1
+                await on_message(json.loads(text))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+    def _robobo_handler(self, robot_id):
+        async def handler(reader, writer):
+            address = writer.get_extra_info("sockname")[0]
+            world = self.world(address, robot_id)
+
+            async def periodic():
+                while True:
+                    await asyncio.sleep(1.0 / self.status_hz)
+                    await self._send(writer, self._status(world))
+
+            tasks = []
+
+            async def on_open():
+                # El estado periódico empieza tras el handshake: antes el cliente no espera tramas
+                await self._send(writer, self._status(world))
+                if self.status_hz > 0:
+                    tasks.append(asyncio.create_task(periodic()))
+
+            try:
+                await self._session(reader, writer,
+                                    lambda msg: self._robobo_command(world, address, writer, msg), on_open)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return handler
+
+    async def _sim_handler(self, reader, writer):
+        address = writer.get_extra_info("sockname")[0]
+
+        async def on_message(msg):
+            name = msg.get("name")
+            params = msg.get("parameters", {})
+            if name == "RESET-SIM":
+                for (addr, _), world in self.worlds.items():
+                    if addr == address:
+                        world.reset()
+                await self._push_locations(address)
+            elif name == "SIM-LOCATION-SET":
+                world = self.world(address, int(params.get("id", 0)))
+                world.set_location(params.get("position"), params.get("rotation"))
+                await self._push_locations(address)
+
+        async def on_open():
+            self.sim_clients.setdefault(address, []).append(writer)
+            self.world(address, 0)
+            await self._push_locations(address)
+
+        try:
+            await self._session(reader, writer, on_message, on_open)
+        finally:
+            if writer in self.sim_clients.get(address, []):
+                self.sim_clients[address].remove(writer)
+
+    async def start(self):
+        for robot_id in range(self.n_robots):
+            self.servers.append(await asyncio.start_server(self._robobo_handler(robot_id), self.host,
+                                                           self.robobo_port + 10 * robot_id))
+        self.servers.append(await asyncio.start_server(self._sim_handler, self.host, self.sim_port))
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🤖 Robobo falso en {self.host}:{self.robobo_port} y RoboboSim en {self.host}:{self.sim_port} "
+              f"({'guion' if self.store is not None else 'modelo'}, latencia {1000 * self.latency:.1f}"
+              f"±{1000 * self.jitter:.1f} ms)")
+        await asyncio.gather(*(s.serve_forever() for s in self.servers))
+
+    def start_in_thread(self):
+        """Arranca el servidor en un hilo (daemon) con su propio bucle de eventos."""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, name="robobo-falso", daemon=True).start()
+        ready.wait()
+        return loop
+
+
+# --- Prueba de carga con los clientes reales ---
+
+def load_test(n_envs, steps, server=None, seed=0):
+    """
+    Lanza n_envs RoboboNEATEnv en hilos, cada uno contra su propio mundo
+    (127.0.0.1, 127.0.0.2...), con acciones al azar. Devuelve los tiempos de
+    cada paso (s) y el tiempo total.
+    """
+    sys.path.insert(0, os.path.join(ROOT_DIR, "practica2"))
+    from main_neat import RoboboNEATEnv
+
+    if server is not None:
+        server.start_in_thread()
+    step_times = [[] for _ in range(n_envs)]
+    errors = []
+
+    def worker(i):
+        rng = random.Random(seed + i)
+        try:
+            env = RoboboNEATEnv(max_steps=steps, host=f"127.0.0.{i + 1}")
+            env.reset()
+            for _ in range(steps):
+                start = time.perf_counter()
+                _, _, terminated, truncated, _ = env.step(rng.randrange(6))
+                step_times[i].append(time.perf_counter() - start)
+                if terminated or truncated:
+                    env.reset()
+            env.close()
+        except BaseException as e:
+            errors.append(f"env {i}: {e!r}")
+
+    start = time.perf_counter()
+    # Los entornos imprimen el estado en cada paso
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_envs)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    total = time.perf_counter() - start
+    for error in errors:
+        print(f"❌ {error}")
+    return np.array([t for times in step_times for t in times]), total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Robobo/RoboboSim falsos para pruebas locales")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("servir", "Arrancar el servidor"),
+                            ("carga", "Prueba de carga con RoboboNEATEnv contra un servidor en este proceso")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--guion", help="Directorio de trayectorias.py cuyos sensores se reproducen")
+        p.add_argument("--latencia", type=float, default=0.0, help="Latencia por mensaje (ms)")
+        p.add_argument("--jitter", type=float, default=0.0, help="Variación de la latencia (ms)")
+        p.add_argument("--escala-tiempo", type=float, default=0.0,
+                       help="Fracción del tiempo real que duran moveWheelsByTime y similares")
+        p.add_argument("--frecuencia", type=float, default=10.0, help="Envíos de estado por segundo")
+        p.add_argument("--semilla", type=int, default=0)
+    sub.choices["servir"].add_argument("--host", default="0.0.0.0")
+    sub.choices["servir"].add_argument("--robots", type=int, default=1)
+    sub.choices["carga"].add_argument("--envs", type=int, default=16)
+    sub.choices["carga"].add_argument("--pasos", type=int, default=50)
+    args = parser.parse_args()
+
+    server = FakeRoboboServer(host=getattr(args, "host", "0.0.0.0"), script=args.guion,
+                              latency=args.latencia / 1000, jitter=args.jitter / 1000,
+                              time_scale=args.escala_tiempo, status_hz=args.frecuencia,
+                              n_robots=getattr(args, "robots", 1), seed=args.semilla)
+    if args.command == "servir":
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        times, total = load_test(args.envs, args.pasos, server=server, seed=args.semilla)
+        if len(times):
+            p50, p95, p99 = 1000 * np.percentile(times, [50, 95, 99])
+            print(f"{args.envs} entornos, {len(times)} pasos en {total:.1f} s: {len(times) / total:.1f} pasos/s")
+            print(f"Latencia por paso: p50={p50:.1f} ms  p95={p95:.1f} ms  p99={p99:.1f} ms")
+            print(f"Mensajes: {server.messages_in} recibidos, {server.messages_out} enviados")
@@ -0,0 +1,258 @@
+"""
+Supervisión de las llamadas al simulador: plazos, reconexión y reintentos.
+
+Una llamada colgada de robobopy/robobosim (moveWheelsByTime, resetSimulation)
+bloquea el proceso para siempre, y eval_genome convierte cualquier error en
+un fitness falso de -100. SimulatorSupervisor envuelve un entorno (RoboboEnv,
+RoboboNEATEnv o cualquiera con atributos robobo y sim):
+
+- Todas las llamadas a env.robobo y env.sim se ejecutan en un hilo propio de
+  la conexión y el hilo que llama espera como máximo su plazo. Si se pasa,
+  se lanza SimulatorTimeout y la conexión se da por perdida; un hilo aparte
+  intenta cerrarla sin bloquear al resto.
+- Tras un fallo se crea un entorno nuevo con espera exponencial entre
+  intentos (backoff, 2·backoff, 4·backoff... hasta max_backoff).
+- run_episode repite el episodio desde reset hasta max_retries veces antes
+  de rendirse con EpisodeFailed.
+- counters() da los contadores de llamadas, plazos vencidos, errores,
+  reconexiones, reintentos y episodios fallidos.
+
+Los errores del propio episodio (por ejemplo, de la red neuronal) no se
+reintentan: solo los que vienen de una llamada al simulador.
+
+Uso:
+    supervisor = SimulatorSupervisor(lambda: RoboboNEATEnv(max_steps=50, host=host))
+    fitness = supervisor.run_episode(lambda env: run_policy(env))
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# Métodos cuyo plazo se alarga con la duración que reciben como argumento
+DURATION_ARGUMENT = {"moveWheelsByTime": 2, "wait": 0}
+SLOW_CALLS = ("resetSimulation", "connect")
+
+
+class SimulatorError(Exception):
+    """Fallo de una llamada al simulador (la causa original está en __cause__)."""
+
+
+class SimulatorTimeout(SimulatorError):
+    """Una llamada al simulador superó su plazo."""
+
+
+class EpisodeFailed(Exception):
+    """El episodio falló en todos los reintentos."""
+
+
+class _SimulatorThread:
+    """Hilo (daemon) que ejecuta en orden las llamadas de una conexión."""
+
+    def __init__(self, name):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def call(self, timeout, fn, *args, **kwargs):
+        future = Future()
+        self.queue.put((future, fn, args, kwargs))
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise SimulatorTimeout(f"{getattr(fn, '__name__', fn)} no respondió en {timeout:.1f} s") from None
+
+    def stop(self):
+        self.queue.put(None)
+
+
+class _DeadlineProxy:
+    """Sustituye a env.robobo/env.sim: cada método se ejecuta con plazo en el hilo de la conexión."""
+
+    def __init__(self, target, supervisor, worker):
+        self._target = target
+        self._supervisor = supervisor
+        self._worker = worker
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self._supervisor._call(self._worker, name, attr, args, kwargs)
+
+        return call
+
+
+class SimulatorSupervisor:
+    """
+    Args:
+        env_fn: Crea un entorno ya conectado (se vuelve a llamar al reconectar)
+        call_timeout: Plazo en segundos de una llamada normal
+        slow_timeout: Plazo de resetSimulation y de la conexión inicial
+        max_retries: Reintentos de un episodio tras un fallo del simulador
+        backoff, max_backoff: Espera inicial y máxima entre reconexiones
+        max_reconnects: Intentos seguidos de crear el entorno antes de rendirse
+    """
+
+    def __init__(self, env_fn, call_timeout=10.0, slow_timeout=60.0, max_retries=3,
+                 backoff=1.0, max_backoff=30.0, max_reconnects=8):
+        self.env_fn = env_fn
+        self.call_timeout = call_timeout
+        self.slow_timeout = slow_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_reconnects = max_reconnects
+
+        self.env = None
+        self._worker = None
+        self._connections = 0
+        self._failures = 0   # Fallos seguidos (para la espera exponencial)
+        self.stats = {"calls": 0, "timeouts": 0, "errors": 0, "reconnects": 0,
+                      "retries": 0, "failed_episodes": 0}
+
+    def counters(self):
+        """Copia de los contadores acumulados."""
+        return dict(self.stats)
+
+    # --- Llamadas con plazo ---
+
+    def deadline(self, name, args):
+        """Plazo de una llamada: el base más la duración que pide (moveWheelsByTime, wait)."""
+        if name in SLOW_CALLS:
+            return self.slow_timeout
+        timeout = self.call_timeout
+        index = DURATION_ARGUMENT.get(name)
+        if index is not None and len(args) > index:
+            try:
+                timeout += float(args[index])
+            except (TypeError, ValueError):
+                pass
+        return timeout
+
+    def _call(self, worker, name, fn, args, kwargs):
+        self.stats["calls"] += 1
+        try:
+            return worker.call(self.deadline(name, args), fn, *args, **kwargs)
+        except SimulatorTimeout:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            raise SimulatorError(f"{name}: {e}") from e
+
+    # --- Conexión ---
+
+    def connect(self):
+        """Crea el entorno con reintentos y espera exponencial; devuelve el entorno."""
+        delay = self.backoff
+        for _ in range(self.max_reconnects):
+            self._connections += 1
+            worker = _SimulatorThread(f"simulador-{self._connections}")
+            try:
+                env = worker.call(self.slow_timeout, self.env_fn)
+            except Exception as e:
+                worker.stop()
+                self.stats["timeouts" if isinstance(e, SimulatorTimeout) else "errors"] += 1
+                print(f"⚠️ No se pudo conectar con el simulador ({e}); reintento en {delay:.1f} s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            env.robobo = _DeadlineProxy(env.robobo, self, worker)
+            env.sim = _DeadlineProxy(env.sim, self, worker)
+            self.env, self._worker = env, worker
+            return env
+        raise SimulatorError(f"Sin conexión con el simulador tras {self.max_reconnects} intentos")
+
+    def disconnect(self):
+        """
+        Abandona la conexión actual. El cierre se hace en otro hilo: si el
+        simulador está colgado, close() también podría bloquearse.
+        """
+        env, worker = self._release()
+        if env is None:
+            return
+
+        def close():
+            try:
+                env.close()
+            except Exception:
+                pass
+            worker.stop()
+
+        threading.Thread(target=close, name="cierre-simulador", daemon=True).start()
+
+    def _release(self):
+        """Quita el entorno actual devolviendo sus conexiones originales (sin plazo)."""
+        env, worker = self.env, self._worker
+        self.env = self._worker = None
+        if env is not None:
+            env.robobo = env.robobo._target
+            env.sim = env.sim._target
+        return env, worker
+
+    def reconnect(self):
+        self.disconnect()
+        self.stats["reconnects"] += 1
+        time.sleep(min(self.backoff * 2 ** self._failures, self.max_backoff))
+        return self.connect()
+
+    # --- Episodios ---
+
+    def run_episode(self, episode_fn):
+        """
+        Ejecuta episode_fn(env) (que debe empezar con env.reset()) y devuelve su
+        resultado. Si falla una llamada al simulador, reconecta y repite el
+        episodio desde el principio hasta max_retries veces.
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self.stats["retries"] += 1
+                print(f"🔁 Reintentando el episodio ({attempt}/{self.max_retries}) tras: {last_error}")
+            try:
+                env = self.env if self.env is not None else self.connect()
+                result = episode_fn(env)
+                self._failures = 0
+                return result
+            except SimulatorError as e:
+                last_error = e
+                self._failures += 1
+                if attempt < self.max_retries:
+                    try:
+                        self.reconnect()
+                    except SimulatorError as e2:
+                        last_error = e2
+                else:
+                    self.disconnect()
+        self.stats["failed_episodes"] += 1
+        raise EpisodeFailed(f"Episodio fallido tras {self.max_retries} reintentos: {last_error}") from last_error
+
+    def close(self):
+        """Cierra la conexión esperando como mucho el plazo de una llamada lenta."""
+        env, worker = self._release()
+        if env is None:
+            return
+        try:
+            worker.call(self.slow_timeout, env.close)
+        except SimulatorError:
+            pass
+        except Exception as e:
+            print(f"❌ Error al cerrar el simulador: {e}")
+        worker.stop()
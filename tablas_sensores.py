@@ -0,0 +1,300 @@
+"""
+Tablas precalculadas de sensores sobre una rejilla de poses.
+
+En el escenario "cylinder" (arena fija con el cilindro rojo quieto) los IR y
+el blob rojo solo dependen de la pose del robot y del pan de la cámara. Esta
+herramienta evalúa el modelo de sensores de simulador_falso.py en una
+rejilla densa (x, z, rumbo, pan) y la guarda como .npy para abrirla con
+memoria mapeada:
+
+    <dir>/tabla.npy   float32 [nx, nz, n_rumbo, n_pan, canal]
+    <dir>/meta.json   ejes de la rejilla y nombres de los canales
+
+Canales: los 8 IR, seno y coseno del ángulo del cilindro respecto a la
+cámara y la distancia al cilindro. El ángulo se guarda como seno/coseno para
+interpolar sin el salto de ±180°; posx/size del blob se calculan después de
+interpolar, así el borde del campo de visión queda nítido.
+
+SensorTable.lookup interpola de forma multilineal (16 esquinas, el rumbo es
+periódico) en tiempo constante, sin depender de la complejidad de la escena.
+TableRobobo/TableSim imitan la parte de robobopy.Robobo y
+robobosim.RoboboSim que usan los entornos, así que RoboboNEATEnv puede
+entrenar sin simulador:
+
+    env = RoboboNEATEnv(max_steps=50, backend=table_backend("tablas/cylinder"))
+
+Como el mundo es local, TableSim también guarda y restaura su estado
+completo (save_state/load_state), que los entornos exponen para evaluar
+muchos genomas desde la misma situación.
+
+Uso:
+    python tablas_sensores.py construir <dir> [--paso 4] [--rumbos 72] [--pans -90 90 7]
+    python tablas_sensores.py comprobar <dir> [-n 10000]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulador_falso import ModelWorld
+
+TABLE_FILE = "tabla.npy"
+META_FILE = "meta.json"
+IR_CHANNELS = tuple(ModelWorld.IR_ANGLES)
+CHANNELS = IR_CHANNELS + ("bearing_sin", "bearing_cos", "distance")
+
+
+def build_table(directory, step=4.0, n_headings=72, pans=(-90.0, 90.0, 7), target=(0.0, 60.0)):
+    """
+    Rellena la tabla con el modelo de sensores, un rumbo cada vez para no
+    tener toda la rejilla de poses en memoria.
+    """
+    os.makedirs(directory, exist_ok=True)
+    limit = ModelWorld.ARENA - ModelWorld.ROBOT_RADIUS
+    n_xy = int(round(2 * limit / step)) + 1
+    axes = {
+        "x": [-limit, limit, n_xy],
+        "z": [-limit, limit, n_xy],
+        "heading": [0.0, 360.0 * (n_headings - 1) / n_headings, n_headings],
+        "pan": [float(pans[0]), float(pans[1]), int(pans[2])],
+    }
+    grid = {name: np.linspace(*axis) for name, axis in axes.items()}
+    shape = tuple(len(g) for g in grid.values()) + (len(CHANNELS),)
+
+    tmp = os.path.join(directory, TABLE_FILE + ".tmp")
+    table = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+    x, z, pan = np.meshgrid(grid["x"], grid["z"], grid["pan"], indexing="ij")
+    for k, heading in enumerate(grid["heading"]):
+        readings = ModelWorld.sensor_model(x, z, heading, pan, target)
+        bearing = np.radians(readings["bearing"])
+        readings["bearing_sin"] = np.sin(bearing)
+        readings["bearing_cos"] = np.cos(bearing)
+        table[:, :, k, :, :] = np.stack([readings[c] for c in CHANNELS], axis=-1)
+    table.flush()
+    del table
+    os.replace(tmp, os.path.join(directory, TABLE_FILE))
+
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump({"axes": axes, "channels": CHANNELS, "periodic": ["heading"], "target": list(target),
+                   "fov": ModelWorld.FOV}, f, indent=2)
+    return SensorTable(directory)
+
+
+class SensorTable:
+    """Tabla de sensores abierta con memoria mapeada."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.table = np.load(os.path.join(directory, TABLE_FILE), mmap_mode="r")
+        self.channels = {name: i for i, name in enumerate(self.meta["channels"])}
+        axes = [self.meta["axes"][name] for name in ("x", "z", "heading", "pan")]
+        self.start = np.array([a[0] for a in axes])
+        self.size = np.array([a[2] for a in axes])
+        self.step = np.array([(a[1] - a[0]) / (a[2] - 1) if a[2] > 1 else 1.0 for a in axes])
+        self.periodic = np.array([name in self.meta["periodic"] for name in ("x", "z", "heading", "pan")])
+        self.fov = self.meta["fov"]
+        # Desplazamientos de las 16 esquinas del hipercubo
+        self.corners = np.array(np.meshgrid(*[[0, 1]] * 4, indexing="ij")).reshape(4, -1).T
+
+    def lookup(self, x, z, heading, pan=0.0):
+        """
+        Canales interpolados para una o varias poses.
+
+        Returns:
+            Array [n, canal] (o [canal] para una sola pose)
+        """
+        pose = np.stack(np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (x, z, heading, pan))), -1)
+        single = pose.ndim == 1
+        pose = np.atleast_2d(pose)
+        pose[:, 2] %= 360.0
+
+        t = (pose - self.start) / self.step
+        # Ejes no periódicos: se satura en los bordes de la rejilla
+        t = np.where(self.periodic, t, np.clip(t, 0, self.size - 1))
+        i0 = np.floor(t).astype(np.int64)
+        i0 = np.where(self.periodic | (self.size == 1), i0, np.minimum(i0, self.size - 2))
+        frac = t - i0
+
+        idx = i0[:, None, :] + self.corners[None]                        # [n, 16, 4]
+        idx = np.where(self.periodic, idx % self.size, np.minimum(idx, self.size - 1))
+        weights = np.prod(np.where(self.corners[None], frac[:, None, :], 1 - frac[:, None, :]), axis=-1)
+        values = self.table[idx[..., 0], idx[..., 1], idx[..., 2], idx[..., 3]]   # [n, 16, canal]
+        result = np.einsum("nc,ncj->nj", weights, values)
+        return result[0] if single else result
+
+    def sensors(self, x, z, heading, pan=0.0):
+        """IR y blob rojo (posx, posy, size) como en ModelWorld, a partir de la tabla."""
+        values = self.lookup(x, z, heading, pan)
+        c = self.channels
+        readings = {name: values[..., c[name]] for name in IR_CHANNELS}
+        bearing = np.degrees(np.arctan2(values[..., c["bearing_sin"]], values[..., c["bearing_cos"]]))
+        readings["blob_posx"], readings["blob_posy"], readings["blob_size"] = \
+            ModelWorld.blob_reading(bearing, values[..., c["distance"]])
+        return readings
+
+
+# --- Backend para los entornos ---
+
+class TableRobobo:
+    """
+    Sustituto de robobopy.Robobo que responde desde una SensorTable. La pose
+    se integra con la cinemática de ModelWorld; las esperas no duermen.
+    """
+
+    def __init__(self, table, world):
+        self.table = table
+        self.world = world
+        self._cache = None
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def wait(self, seconds):
+        pass
+
+    def setActiveBlobs(self, red, green, blue, custom):
+        pass
+
+    def moveWheelsByTime(self, rSpeed, lSpeed, duration, wait=True):
+        self.world.move(lSpeed, rSpeed, duration)
+        self._cache = None
+
+    def moveTiltTo(self, degrees, speed, wait=True):
+        self.world.tilt = degrees
+
+    def movePanTo(self, degrees, speed, wait=True):
+        self.world.pan = degrees
+        self._cache = None
+
+    def _readings(self):
+        if self._cache is None:
+            w = self.world
+            self._cache = self.table.sensors(w.position[0], w.position[1], w.heading, w.pan)
+        return self._cache
+
+    def readIRSensor(self, ir):
+        return int(self._readings()[getattr(ir, "value", ir)])
+
+    def readAllIRSensor(self):
+        readings = self._readings()
+        return {name: int(readings[name]) for name in IR_CHANNELS}
+
+    def readColorBlob(self, color):
+        color = getattr(color, "value", color)
+        if color != "red":
+            return SimpleNamespace(color=color, posx=0, posy=0, size=0, frame_timestamp=0, status_timestamp=0)
+        r = self._readings()
+        return SimpleNamespace(color=color, posx=int(r["blob_posx"]), posy=int(r["blob_posy"]),
+                               size=int(r["blob_size"]), frame_timestamp=0, status_timestamp=0)
+
+
+class TableSim:
+    """Sustituto de robobosim.RoboboSim para el mismo mundo."""
+
+    def __init__(self, robobo):
+        self.robobo = robobo
+        self.world = robobo.world
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def wait(self, seconds):
+        pass
+
+    def resetSimulation(self):
+        self.world.reset()
+        self.robobo._cache = None
+
+    def getRobotLocation(self, robot_id):
+        loc = self.world.location()
+        return {"position": {"x": loc["x"], "y": loc["y"], "z": loc["z"]},
+                "rotation": {"x": 0.0, "y": loc["ry"], "z": 0.0}}
+
+    def setRobotLocation(self, robot_id, position=None, rotation=None):
+        self.world.set_location(position, rotation)
+        self.robobo._cache = None
+
+    def save_state(self):
+        """Instantánea del robot y del mundo (un diccionario que se puede enviar a otros procesos)."""
+        return self.world.get_state()
+
+    def load_state(self, state):
+        self.world.set_state(state)
+        self.robobo._cache = None
+
+
+def table_backend(directory, seed=None):
+    """(robobo, sim) que responden desde la tabla de `directory` (para el parámetro backend de los entornos)."""
+    table = SensorTable(directory)
+    world = ModelWorld(random.Random(seed), target=tuple(table.meta["target"]))
+    robobo = TableRobobo(table, world)
+    return robobo, TableSim(robobo)
+
+
+def check(directory, n=10000, seed=0):
+    """Error de la tabla frente al modelo y coste por consulta en poses al azar."""
+    table = SensorTable(directory)
+    rng = np.random.default_rng(seed)
+    limit = ModelWorld.ARENA - ModelWorld.ROBOT_RADIUS
+    axes = table.meta["axes"]
+    x, z = rng.uniform(-limit, limit, (2, n))
+    heading = rng.uniform(0, 360, n)
+    pan = rng.uniform(axes["pan"][0], axes["pan"][1], n)
+    target = tuple(table.meta["target"])
+
+    interpolated = table.sensors(x, z, heading, pan)
+    exact = ModelWorld.sensor_model(x, z, heading, pan, target)
+    exact["blob_posx"], exact["blob_posy"], exact["blob_size"] = \
+        ModelWorld.blob_reading(exact["bearing"], exact["distance"])
+    for name in IR_CHANNELS + ("blob_posx", "blob_size"):
+        error = np.abs(interpolated[name] - exact[name])
+        print(f"{name:<10} error medio={error.mean():8.2f}  p99={np.percentile(error, 99):8.2f}")
+    visible = (exact["blob_size"] > 0) == (interpolated["blob_size"] > 0)
+    print(f"Visibilidad del blob coincide en el {100 * visible.mean():.2f}% de las poses")
+
+    samples = min(n, 2000)
+    start = time.perf_counter()
+    for i in range(samples):
+        table.sensors(x[i], z[i], heading[i], pan[i])
+    table_us = 1e6 * (time.perf_counter() - start) / samples
+    start = time.perf_counter()
+    for i in range(samples):
+        ModelWorld.sensor_model(x[i], z[i], heading[i], pan[i], target)
+    model_us = 1e6 * (time.perf_counter() - start) / samples
+    print(f"Consulta individual: tabla {table_us:.1f} µs, modelo {model_us:.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tablas precalculadas de sensores")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("construir", help="Evaluar el modelo de sensores en la rejilla")
+    p.add_argument("directory")
+    p.add_argument("--paso", type=float, default=4.0, help="Separación de la rejilla en x/z (cm)")
+    p.add_argument("--rumbos", type=int, default=72, help="Número de rumbos (periódicos)")
+    p.add_argument("--pans", type=float, nargs=3, default=[-90.0, 90.0, 7], metavar=("MIN", "MAX", "N"))
+
+    p = sub.add_parser("comprobar", help="Comparar la tabla con el modelo en poses al azar")
+    p.add_argument("directory")
+    p.add_argument("-n", type=int, default=10000)
+
+    args = parser.parse_args()
+    if args.command == "construir":
+        start = time.perf_counter()
+        table = build_table(args.directory, args.paso, args.rumbos, args.pans)
+        size_mb = table.table.nbytes / 1e6
+        print(f"Tabla {table.table.shape} ({size_mb:.1f} MB) guardada en {args.directory} "
+              f"en {time.perf_counter() - start:.1f} s")
+    else:
+        check(args.directory, args.n)
@@ -0,0 +1,238 @@
+"""
+Grabación de trayectorias por columnas con almacenamiento en memoria mapeada.
+
+TrajectoryRecorder envuelve RoboboEnv o RoboboNEATEnv y guarda, paso a paso,
+observación, acción, recompensa, sensores en bruto (los del `info` de step) y
+tiempos en arrays NumPy preasignados por bloques. Cada bloque lleno se vuelca
+como un segmento de ficheros .npy (uno por columna) y se apunta en index.json.
+
+TrajectoryStore abre esos segmentos con np.load(mmap_mode="r"), así que las
+herramientas de análisis pueden recorrer millones de pasos sin cargarlos en RAM.
+
+Estructura en disco:
+    <dir>/index.json
+    <dir>/seg_00000/obs.npy, action.npy, reward.npy, ...
+"""
+import json
+import os
+import time
+
+import gymnasium as gym
+import numpy as np
+
+INDEX_FILE = "index.json"
+
+# Columnas fijas: nombre -> dtype
+BASE_COLUMNS = {
+    "episode": np.int32,
+    "step": np.int32,
+    "action": np.int16,
+    "reward": np.float32,
+    "terminated": np.bool_,
+    "truncated": np.bool_,
+    "step_time": np.float32,   # Duración de env.step (s)
+    "wall_time": np.float64,   # Marca de tiempo al terminar el paso
+}
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """
+    Wrapper que registra cada paso del entorno.
+
+    Args:
+        env: Entorno a envolver
+        directory: Carpeta de salida (se crea si no existe)
+        chunk_size: Pasos por segmento
+        sensor_keys: Claves del `info` a guardar; por defecto, todas las
+            numéricas del primer paso
+    """
+
+    def __init__(self, env, directory, chunk_size=10000, sensor_keys=None):
+        super().__init__(env)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.sensor_keys = list(sensor_keys) if sensor_keys is not None else None
+        os.makedirs(directory, exist_ok=True)
+
+        self._index = self._load_index()
+        self._episode = self._index["episodes"]
+        self._step = 0
+        self._buffers = None
+        self._n = 0
+        self._pending_obs = None
+
+    # --- Índice ---
+
+    def _load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                index = json.load(f)
+            if self.sensor_keys is None:
+                self.sensor_keys = index["sensor_keys"]
+            return index
+        return {"segments": [], "rows": 0, "episodes": 0, "sensor_keys": self.sensor_keys,
+                "obs_shape": None}
+
+    def _write_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp, path)
+
+    # --- Búferes ---
+
+    def _allocate(self, obs):
+        obs_shape = list(np.shape(obs))
+        self._index["obs_shape"] = obs_shape
+        self._index["sensor_keys"] = self.sensor_keys
+        self._buffers = {name: np.zeros(self.chunk_size, dtype=dtype)
+                         for name, dtype in BASE_COLUMNS.items()}
+        self._buffers["obs"] = np.zeros([self.chunk_size] + obs_shape, dtype=np.float32)
+        self._buffers["next_obs"] = np.zeros([self.chunk_size] + obs_shape, dtype=np.float32)
+        self._buffers["sensors"] = np.zeros((self.chunk_size, len(self.sensor_keys)), dtype=np.float32)
+
+    def flush(self):
+        """Vuelca el bloque actual como un nuevo segmento."""
+        if self._n == 0:
+            return
+        seg_name = f"seg_{len(self._index['segments']):05d}"
+        seg_dir = os.path.join(self.directory, seg_name)
+        os.makedirs(seg_dir, exist_ok=True)
+        for name, buf in self._buffers.items():
+            np.save(os.path.join(seg_dir, f"{name}.npy"), buf[:self._n])
+
+        episodes = self._buffers["episode"][:self._n]
+        self._index["segments"].append({
+            "name": seg_name,
+            "rows": int(self._n),
+            "first_episode": int(episodes[0]),
+            "last_episode": int(episodes[-1]),
+        })
+        self._index["rows"] += int(self._n)
+        # Cuenta también el episodio en curso: al reabrir la carpeta se sigue con uno nuevo
+        self._index["episodes"] = self._episode + (1 if self._step > 0 else 0)
+        self._write_index()
+        self._n = 0
+
+    # --- API de gym ---
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        # Un episodio cortado desde fuera (max_steps, reintento) no termina en el entorno
+        if self._step > 0:
+            self._episode += 1
+        self._step = 0
+        self._pending_obs = obs
+        return obs, info
+
+    def step(self, action):
+        start = time.perf_counter()
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        elapsed = time.perf_counter() - start
+
+        if self.sensor_keys is None:
+            self.sensor_keys = sorted(k for k, v in info.items() if np.isscalar(v))
+        if self._buffers is None:
+            self._allocate(obs)
+
+        i = self._n
+        b = self._buffers
+        b["episode"][i] = self._episode
+        b["step"][i] = self._step
+        b["action"][i] = int(action)
+        b["reward"][i] = reward
+        b["terminated"][i] = terminated
+        b["truncated"][i] = truncated
+        b["step_time"][i] = elapsed
+        b["wall_time"][i] = time.time()
+        b["obs"][i] = self._pending_obs
+        b["next_obs"][i] = obs
+        b["sensors"][i] = [info.get(k, np.nan) for k in self.sensor_keys]
+
+        self._n += 1
+        self._step += 1
+        self._pending_obs = obs
+        if terminated or truncated:
+            self._episode += 1
+            self._step = 0
+        if self._n == self.chunk_size:
+            self.flush()
+
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.flush()
+        return self.env.close()
+
+
+class TrajectoryStore:
+    """
+    Lector de un directorio grabado con TrajectoryRecorder.
+
+    Las columnas se devuelven como listas de arrays memmap (uno por segmento);
+    `column()` los concatena solo si se pide explícitamente.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.sensor_keys = self.index["sensor_keys"] or []
+        self.offsets = np.cumsum([0] + [s["rows"] for s in self.index["segments"]])
+
+    def __len__(self):
+        return int(self.index["rows"])
+
+    @property
+    def n_episodes(self):
+        return int(self.index["episodes"])
+
+    def segment(self, i, name):
+        seg = self.index["segments"][i]["name"]
+        return np.load(os.path.join(self.directory, seg, f"{name}.npy"), mmap_mode="r")
+
+    def chunks(self, name):
+        """Itera sobre la columna segmento a segmento (memmap, sin copiar)."""
+        for i in range(len(self.index["segments"])):
+            yield self.segment(i, name)
+
+    def column(self, name):
+        """Columna completa en memoria (usar solo si cabe en RAM)."""
+        parts = list(self.chunks(name))
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def sensor(self, key):
+        """Serie de un sensor en bruto, p. ej. 'blob_size'."""
+        j = self.sensor_keys.index(key)
+        return np.concatenate([c[:, j] for c in self.chunks("sensors")]) if len(self) else np.empty(0)
+
+    def rows(self, start, stop, name):
+        """Filas [start, stop) de una columna, leyendo solo los segmentos necesarios."""
+        parts = []
+        first = int(np.searchsorted(self.offsets, start, side="right") - 1)
+        for i in range(max(first, 0), len(self.index["segments"])):
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+            if lo >= stop:
+                break
+            data = self.segment(i, name)
+            parts.append(np.asarray(data[max(start - lo, 0):min(stop, hi) - lo]))
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def episode(self, episode, name):
+        """Datos de un episodio concreto."""
+        parts = []
+        for i, seg in enumerate(self.index["segments"]):
+            if seg["first_episode"] <= episode <= seg["last_episode"]:
+                ep = self.segment(i, "episode")
+                mask = ep == episode
+                parts.append(np.asarray(self.segment(i, name)[mask]))
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def episode_returns(self):
+        """Recompensa total por episodio, acumulada segmento a segmento."""
+        totals = np.zeros(max(self.n_episodes, 1) + 1, dtype=np.float64)
+        for ep, rew in zip(self.chunks("episode"), self.chunks("reward")):
+            np.add.at(totals, ep, rew)
+        return totals[:self.n_episodes]
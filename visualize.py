@@ -1,12 +1,29 @@
 import warnings
 
-import graphviz
-import matplotlib.pyplot as plt
 import numpy as np
 
 
+def _import_plt():
+    """ Imports matplotlib only when a plot is actually requested. """
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        plt = None
+    return plt
+
+
+def _import_graphviz():
+    """ Imports graphviz only when a network is actually drawn. """
+    try:
+        import graphviz
+    except ImportError:
+        graphviz = None
+    return graphviz
+
+
 def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg'):
     """ Plots the population's average and best fitness. """
+    plt = _import_plt()
     if plt is None:
         warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
         return
@@ -38,6 +55,7 @@ def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg'):
 
 def plot_spikes(spikes, view=False, filename=None, title=None):
     """ Plots the trains for a single spiking neuron. """
+    plt = _import_plt()
     t_values = [t for t, I, v, u, f in spikes]
     v_values = [v for t, I, v, u, f in spikes]
     u_values = [u for t, I, v, u, f in spikes]
@@ -87,6 +105,7 @@ def plot_spikes(spikes, view=False, filename=None, title=None):
 
 def plot_species(statistics, view=False, filename='speciation.svg'):
     """ Visualizes speciation throughout evolution. """
+    plt = _import_plt()
     if plt is None:
         warnings.warn("This display is not available due to a missing optional dependency (matplotlib)")
         return
@@ -113,6 +132,7 @@ def plot_species(statistics, view=False, filename='speciation.svg'):
 def draw_net(config, genome, view=False, filename=None, node_names=None, show_disabled=True, prune_unused=False,
              node_colors=None, fmt='svg'):
     """ Receives a genome and draws a neural network with arbitrary topology. """
+    graphviz = _import_graphviz()
     # Attributes for network nodes.
     if graphviz is None:
         warnings.warn("This display is not available due to a missing optional dependency (graphviz)")